@@ -0,0 +1,28 @@
+"""add_email_outbox_claimed_at
+
+Revision ID: b5e2f8c1d7a4
+Revises: d4a8b6f2c913
+Create Date: 2026-10-18 14:02:37.215804
+
+Reserva das linhas da outbox pelo dispatcher: o lote é reservado numa
+transação curta e enviado sem bloqueios abertos.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e2f8c1d7a4'
+down_revision = 'd4a8b6f2c913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('email_outbox', sa.Column('claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('email_outbox') as batch_op:
+        batch_op.drop_column('claimed_at')
@@ -0,0 +1,74 @@
+"""move_reset_tokens_to_own_table
+
+Revision ID: c7f1d9e4a8b2
+Revises: 9e3c5a7d2b61
+Create Date: 2026-10-18 10:03:19.551204
+
+Os tokens de reset pendentes (não expirados) são copiados de users para
+password_reset_tokens já como SHA-256, e as colunas antigas são removidas.
+A cópia lê o banco, então a migração não roda em modo offline (--sql). No
+downgrade os tokens pendentes se perdem: só o hash foi guardado.
+
+"""
+import hashlib
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7f1d9e4a8b2'
+down_revision = '9e3c5a7d2b61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    password_reset_tokens = op.create_table('password_reset_tokens',
+    sa.Column('token_hash', sa.LargeBinary(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('token_hash')
+    )
+    op.create_index(op.f('ix_password_reset_tokens_expires_at'), 'password_reset_tokens', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_password_reset_tokens_user_id'), 'password_reset_tokens', ['user_id'], unique=False)
+
+    users = sa.table(
+        'users',
+        sa.column('id', sa.Integer()),
+        sa.column('reset_token', sa.String()),
+        sa.column('reset_token_expires', sa.DateTime()),
+    )
+    now = datetime.utcnow()
+    pending = op.get_bind().execute(
+        sa.select(users.c.id, users.c.reset_token, users.c.reset_token_expires)
+        .where(users.c.reset_token.isnot(None), users.c.reset_token_expires > now)
+    ).all()
+    if pending:
+        op.bulk_insert(password_reset_tokens, [
+            {
+                'token_hash': hashlib.sha256(token.encode('utf-8')).digest(),
+                'user_id': user_id,
+                'expires_at': expires_at,
+                'created_at': now,
+            }
+            for user_id, token, expires_at in pending
+        ])
+
+    # A restrição única de reset_token é removida junto com a coluna
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('reset_token_expires')
+        batch_op.drop_column('reset_token')
+
+
+def downgrade() -> None:
+    op.add_column('users', sa.Column('reset_token', sa.String(), nullable=True))
+    op.add_column('users', sa.Column('reset_token_expires', sa.DateTime(), nullable=True))
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.create_unique_constraint('users_reset_token_key', ['reset_token'])
+    op.drop_index(op.f('ix_password_reset_tokens_user_id'), table_name='password_reset_tokens')
+    op.drop_index(op.f('ix_password_reset_tokens_expires_at'), table_name='password_reset_tokens')
+    op.drop_table('password_reset_tokens')
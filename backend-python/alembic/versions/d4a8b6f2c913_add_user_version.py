@@ -0,0 +1,28 @@
+"""add_user_version
+
+Revision ID: d4a8b6f2c913
+Revises: c7f1d9e4a8b2
+Create Date: 2026-10-18 11:26:04.718392
+
+Contador de versão dos usuários (version_id_col do ORM), usado no ETag de
+/auth/me. As linhas existentes começam na versão 1.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8b6f2c913'
+down_revision = 'c7f1d9e4a8b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('version')
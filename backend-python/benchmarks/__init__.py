@@ -0,0 +1,26 @@
+"""
+Benchmarks do backend.
+
+Executar a partir de backend-python/, por exemplo:
+    python -m benchmarks.bench_jwt
+    python -m benchmarks.bench_hashing
+    python -m benchmarks.load --workers 1 2 4 --output resultado.json
+    python -m benchmarks.compare antes.json depois.json
+    python -m benchmarks.import_time --budget-ms 1500
+
+Dependências extras em benchmarks/requirements.txt.
+"""
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+# Valores padrão para que as configurações carreguem sem um .env
+os.environ.setdefault("PROJECT_NAME", "API")
+os.environ.setdefault("PROJECT_VERSION", "1.0.0")
+os.environ.setdefault("PROJECT_DESCRIPTION", "Benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+os.environ.setdefault("FRONTEND_URL", "http://localhost:4200")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
@@ -0,0 +1,77 @@
+"""
+Benchmark de renderização dos e-mails em massa.
+
+Renderiza N mensagens de reset de senha (padrão 100.000) e compara o
+caminho antigo (f-string + MessageSchema do fastapi-mail a cada chamada)
+com os templates Jinja2 pré-compilados.
+
+    python -m benchmarks.bench_email_templates [--count 100000] [--json]
+"""
+import argparse
+import json
+import time
+
+import benchmarks  # noqa: F401  (configura sys.path e variáveis de ambiente)
+from fastapi_mail import MessageSchema
+from app.services.email_templates import EmailTemplates, build_email_message
+
+def legacy_message(email: str, reset_link: str) -> MessageSchema:
+    return MessageSchema(
+        subject="Recuperação de Senha",
+        recipients=[email],
+        body=f"""
+            <html>
+                <body>
+                    <h2>Recuperação de Senha</h2>
+                    <p>Olá,</p>
+                    <p>Você solicitou a recuperação de senha da sua conta. Clique no link abaixo para redefinir sua senha:</p>
+                    <p><a href="{reset_link}">Redefinir Senha</a></p>
+                    <p>Se você não solicitou esta recuperação de senha, por favor ignore este e-mail.</p>
+                    <p>Este link expira em 24 horas.</p>
+                    <p>Atenciosamente,<br>Equipe do Sistema</p>
+                </body>
+            </html>
+            """,
+        subtype="html",
+    )
+
+def run(name: str, count: int, fn) -> dict:
+    start = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    return {"total_s": elapsed, "per_message_us": elapsed / count * 1e6, "messages_per_sec": count / elapsed}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    templates = EmailTemplates()
+    compile_s = time.perf_counter() - start
+
+    def link(i: int) -> str:
+        return f"http://localhost:4200/reset-password?token=token-{i}"
+
+    results = {
+        "legacy f-string + MessageSchema": run("legacy", args.count, lambda i: legacy_message(f"user{i}@example.com", link(i))),
+        "jinja2 render (html + texto + assunto)": run("render", args.count, lambda i: templates.render(
+            "reset_password", reset_link=link(i), expires_hours=24
+        )),
+        "jinja2 render + mensagem MIME": run("message", args.count, lambda i: build_email_message(
+            "app@example.com",
+            f"user{i}@example.com",
+            templates.render("reset_password", reset_link=link(i), expires_hours=24),
+        )),
+    }
+    if args.json:
+        print(json.dumps({"count": args.count, "compile_s": compile_s, "results": results}, indent=2))
+        return
+    print(f"{args.count} mensagens; compilação dos templates: {compile_s * 1000:.1f} ms")
+    for name, stats in results.items():
+        print(f"{name:<42} {stats['total_s']:>8.2f} s  {stats['per_message_us']:>8.1f} us/msg  {stats['messages_per_sec']:>10.0f} msg/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Micro-benchmark dos perfis de hash de senha.
+
+Para cada perfil mede hash, verificação e needs_update (a única parte do
+rehash que fica no caminho do login; o novo hash é calculado e gravado em
+segundo plano).
+
+    python -m benchmarks.bench_hash_profiles [--json] [--number N] [--repeat N]
+"""
+import argparse
+
+import benchmarks  # noqa: F401  (configura sys.path e variáveis de ambiente)
+from benchmarks.timing import measure, report
+from app.core.security.hashing import build_crypt_context
+
+PASSWORD = "Benchmark-Senha-123"
+
+PROFILES = {
+    "bcrypt rounds=10": {"scheme": "bcrypt", "bcrypt_rounds": 10},
+    "bcrypt rounds=12": {"scheme": "bcrypt", "bcrypt_rounds": 12},
+    "argon2id m=19MiB t=2": {"scheme": "argon2", "argon2_memory_kb": 19456, "argon2_time_cost": 2},
+    "argon2id m=64MiB t=3": {"scheme": "argon2", "argon2_memory_kb": 65536, "argon2_time_cost": 3},
+}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    parser.add_argument("--number", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Hash com custo antigo, que o perfil atual manda atualizar
+    outdated = build_crypt_context(scheme="bcrypt", bcrypt_rounds=11).hash(PASSWORD)
+    results = {}
+    for name, profile in PROFILES.items():
+        context = build_crypt_context(**profile)
+        hashed = context.hash(PASSWORD)
+        results[f"{name} / hash"] = measure(lambda: context.hash(PASSWORD), number=args.number, repeat=args.repeat)
+        results[f"{name} / verify"] = measure(lambda: context.verify(PASSWORD, hashed), number=args.number, repeat=args.repeat)
+        results[f"{name} / needs_update"] = measure(lambda: context.needs_update(outdated), number=10000, repeat=args.repeat)
+    report(results, as_json=args.json)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Micro-benchmark do hash de senhas (bcrypt).
+
+Mede as funções síncronas de app.services.auth (get_password_hash e
+verify_password) e a vazão do PasswordHasher com N verificações
+simultâneas, em threads e em processos.
+
+    python -m benchmarks.bench_hashing [--json] [--number N] [--concurrency N]
+"""
+import argparse
+import asyncio
+import time
+
+import benchmarks  # noqa: F401  (configura sys.path e variáveis de ambiente)
+from benchmarks.timing import measure, report
+from app.core.security.hashing import PasswordHasher
+from app.services.auth import get_password_hash, verify_password
+
+PASSWORD = "Benchmark-Senha-123"
+
+async def throughput(hasher: PasswordHasher, hashed: str, total: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(hasher.verify(PASSWORD, hashed) for _ in range(total)))
+    return time.perf_counter() - start
+
+def measure_hasher(use_processes: bool, hashed: str, concurrency: int, repeat: int):
+    hasher = PasswordHasher(queue_size=concurrency, use_processes=use_processes)
+    try:
+        # A primeira rodada inicia o executor e não entra na medição
+        asyncio.run(throughput(hasher, hashed, hasher.workers))
+        rounds = [asyncio.run(throughput(hasher, hashed, concurrency)) / concurrency for _ in range(repeat)]
+    finally:
+        hasher.shutdown()
+    best = min(rounds)
+    return {
+        "best_us": best * 1e6,
+        "median_us": sorted(rounds)[len(rounds) // 2] * 1e6,
+        "ops_per_sec": 1.0 / best,
+        "number": concurrency,
+        "repeat": repeat,
+        "workers": hasher.workers,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    parser.add_argument("--number", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=32, help="Verificações simultâneas no PasswordHasher")
+    args = parser.parse_args()
+
+    hashed = get_password_hash(PASSWORD)
+    results = {
+        "get_password_hash": measure(lambda: get_password_hash(PASSWORD), number=args.number, repeat=args.repeat),
+        "verify_password": measure(lambda: verify_password(PASSWORD, hashed), number=args.number, repeat=args.repeat),
+        "PasswordHasher.verify / threads": measure_hasher(False, hashed, args.concurrency, args.repeat),
+        "PasswordHasher.verify / processos": measure_hasher(True, hashed, args.concurrency, args.repeat),
+    }
+    report(results, as_json=args.json)
+
+if __name__ == "__main__":
+    main()
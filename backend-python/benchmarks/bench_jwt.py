@@ -0,0 +1,52 @@
+"""
+Micro-benchmark da verificação de tokens JWT.
+
+Compara o caminho original (python-jose sem cache), o backend HMAC direto
+e o caminho com cache de tokens já verificados.
+
+    python -m benchmarks.bench_jwt [--json] [--number N]
+"""
+import argparse
+from datetime import timedelta
+
+import benchmarks  # noqa: F401  (configura sys.path e variáveis de ambiente)
+from benchmarks.timing import measure, report
+from app.core.cache import TTLCache
+from app.core.security.base import SecurityBase
+from app.core.security.jwt_backends import HMACBackend, JoseBackend
+
+def build(backend, cache_size: int) -> SecurityBase:
+    security = SecurityBase()
+    security.algorithm = "HS256"
+    security.jwt_backend = backend
+    security.token_cache = TTLCache(maxsize=cache_size, ttl=300)
+    return security
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    parser.add_argument("--number", type=int, default=5000)
+    args = parser.parse_args()
+
+    cases = {
+        "jose (sem cache)": build(JoseBackend(), 0),
+        "hmac (sem cache)": build(HMACBackend(), 0),
+        "jose + cache": build(JoseBackend(), 1024),
+        "hmac + cache": build(HMACBackend(), 1024),
+    }
+    claims = {"sub": "42"}
+    token = cases["jose (sem cache)"].create_access_token(claims, timedelta(minutes=30))
+
+    results = {}
+    for name, security in cases.items():
+        security.verify_token(token)
+        results[f"verify_token / {name}"] = measure(lambda: security.verify_token(token), number=args.number)
+    for name in ("jose (sem cache)", "hmac (sem cache)"):
+        security = cases[name]
+        results[f"create_access_token / {name}"] = measure(
+            lambda: security.create_access_token(claims), number=args.number
+        )
+    report(results, as_json=args.json)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Overhead da instrumentação Prometheus.
+
+Compara, com e sem instrumentação:
+- uma requisição ASGI a uma rota trivial (MetricsMiddleware);
+- um comando SQL no SQLite em memória (eventos de instrument_engine).
+
+    python -m benchmarks.bench_metrics [--json] [--number N]
+"""
+import argparse
+import asyncio
+
+import benchmarks  # noqa: F401  (configura sys.path e variáveis de ambiente)
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from benchmarks.timing import measure, report
+from app.core.instrumentation import MetricsMiddleware, instrument_engine
+
+def build_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+def asgi_request(app: FastAPI, loop: asyncio.AbstractEventLoop):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/items/1",
+        "raw_path": b"/items/1",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    def call():
+        loop.run_until_complete(app(dict(scope), receive, send))
+    return call
+
+def sql_statement(instrumented: bool):
+    engine = create_engine("sqlite://")
+    if instrumented:
+        instrument_engine(engine, label="benchmark")
+    conn = engine.connect()
+    return lambda: conn.exec_driver_sql("SELECT 1").fetchall()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    parser.add_argument("--number", type=int, default=5000)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    results = {}
+    for instrumented in (False, True):
+        suffix = "com métricas" if instrumented else "sem métricas"
+        call = asgi_request(build_app(instrumented), loop)
+        call()
+        results[f"requisição ASGI / {suffix}"] = measure(call, number=args.number)
+    for instrumented in (False, True):
+        suffix = "com métricas" if instrumented else "sem métricas"
+        results[f"SELECT 1 / {suffix}"] = measure(sql_statement(instrumented), number=args.number)
+    loop.close()
+    report(results, as_json=args.json)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Micro-benchmark da serialização das respostas JSON.
+
+Chama diretamente a aplicação ASGI (sem rede nem banco) para três formatos
+de resposta do /auth: usuário (/me), tokens (/login) e mensagem fixa.
+Compara:
+
+- legado: response_class=JSONResponse explícito, que força a validação
+  pelo response_model, o jsonable_encoder e o json.dumps;
+- orjson: ORJSONResponse (só se o orjson estiver instalado);
+- fastapi: response_model com a classe de resposta padrão, serializado
+  pelo pydantic-core;
+- direto: model_response, sem passar pelo response_model.
+
+    python -m benchmarks.bench_responses [--json] [--number N]
+"""
+import argparse
+import asyncio
+import warnings
+from types import SimpleNamespace
+
+import benchmarks  # noqa: F401  (configura sys.path e variáveis de ambiente)
+from benchmarks.timing import measure, report
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from app.core.responses import model_response
+from app.schemas.user import Message, Token, UserInDBBase
+
+USER = SimpleNamespace(
+    id=42, email="usuario@example.com", username="usuario",
+    is_active=True, is_superuser=False, hashed_password="x",
+)
+TOKEN = Token(access_token="a" * 180, token_type="bearer", refresh_token="r" * 200)
+MESSAGE = "Se o email existir, você receberá instruções para redefinir sua senha"
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    user_model = UserInDBBase.model_validate(USER)
+    message_model = Message(message=MESSAGE)
+
+    # legado: objeto ORM / dict, revalidado e codificado com json.dumps
+    @app.get("/legado/me", response_model=UserInDBBase, response_class=JSONResponse)
+    async def legacy_me():
+        return USER
+
+    @app.get("/legado/login", response_model=Token, response_class=JSONResponse)
+    async def legacy_login():
+        return TOKEN
+
+    @app.get("/legado/message")
+    async def legacy_message():
+        return {"message": MESSAGE}
+
+    try:
+        from fastapi.responses import ORJSONResponse
+        import orjson  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        @app.get("/orjson/me", response_model=UserInDBBase, response_class=ORJSONResponse)
+        async def orjson_me():
+            return user_model
+
+        @app.get("/orjson/login", response_model=Token, response_class=ORJSONResponse)
+        async def orjson_login():
+            return TOKEN
+
+        @app.get("/orjson/message", response_model=Message, response_class=ORJSONResponse)
+        async def orjson_message():
+            return message_model
+
+    @app.get("/fastapi/me", response_model=UserInDBBase)
+    async def fastapi_me():
+        return user_model
+
+    @app.get("/fastapi/login", response_model=Token)
+    async def fastapi_login():
+        return TOKEN
+
+    @app.get("/fastapi/message", response_model=Message)
+    async def fastapi_message():
+        return message_model
+
+    @app.get("/direto/me", response_model=UserInDBBase)
+    async def direct_me():
+        return model_response(user_model)
+
+    @app.get("/direto/login", response_model=Token)
+    async def direct_login():
+        return model_response(TOKEN)
+
+    @app.get("/direto/message", response_model=Message)
+    async def direct_message():
+        return model_response(message_model)
+
+    return app
+
+def request(loop: asyncio.AbstractEventLoop, app: FastAPI, path: str) -> bytes:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 1), "server": ("testserver", 80),
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    loop.run_until_complete(app(scope, receive, send))
+    return b"".join(body)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    parser.add_argument("--number", type=int, default=5000)
+    args = parser.parse_args()
+    # O FastAPI avisa a cada resposta que o ORJSONResponse está obsoleto
+    warnings.filterwarnings("ignore", message="ORJSONResponse is deprecated")
+
+    app = build_app()
+    paths = {route.path for route in app.routes}
+    loop = asyncio.new_event_loop()
+    try:
+        results = {}
+        for endpoint in ("me", "login", "message"):
+            for case in ("legado", "orjson", "fastapi", "direto"):
+                path = f"/{case}/{endpoint}"
+                if path not in paths:
+                    continue
+                request(loop, app, path)
+                results[f"{endpoint} / {case}"] = measure(
+                    lambda: request(loop, app, path), number=args.number
+                )
+    finally:
+        loop.close()
+    report(results, as_json=args.json)
+
+if __name__ == "__main__":
+    main()
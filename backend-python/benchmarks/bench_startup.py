@@ -0,0 +1,191 @@
+"""
+Benchmark do tempo de inicialização da API.
+
+Mede, em processos novos:
+- import: tempo para importar app.services.main;
+- cold start: do início do processo à primeira resposta 200 (uvicorn, 1 worker);
+- serve: do início do python -m app.serve até todos os workers prontos;
+- respawn: do SIGKILL de um worker até o substituto concluir o startup.
+
+    python -m benchmarks.bench_startup [--runs 5] [--workers 4] [--json]
+
+Usa um SQLite temporário com o esquema já criado (DB_SCHEMA_CHECK=none);
+passe --database-url para medir contra um Postgres migrado.
+"""
+import argparse
+import json
+import os
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks import SRC_DIR
+from benchmarks.load import free_port
+
+STARTUP_COMPLETE = re.compile(r"\[(\d+)\] \[INFO\] Application startup complete")
+
+def server_env(database_url: str, extra: Dict[str, str]) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": database_url,
+        "DB_SCHEMA_CHECK": "none",
+        "ACCESS_LOG_SAMPLE_RATE": "0",
+        "LOG_LEVEL": "INFO",
+        "EMAIL_DELIVERY": "outbox",
+    })
+    env.update(extra)
+    return env
+
+def stats(samples: List[float]) -> Dict[str, float]:
+    return {
+        "runs": len(samples),
+        "min_ms": min(samples) * 1000,
+        "median_ms": statistics.median(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+def wait_ok(url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("O servidor terminou durante a inicialização")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    raise RuntimeError("O servidor não respondeu a tempo")
+
+def stop(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def measure_import(env: Dict[str, str]) -> float:
+    code = "import time; t = time.perf_counter(); import app.services.main; print(time.perf_counter() - t)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=SRC_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+def measure_cold_start(env: Dict[str, str]) -> float:
+    port = free_port()
+    start = time.monotonic()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.services.main:app", "--port", str(port), "--no-access-log"],
+        cwd=SRC_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ok(f"http://127.0.0.1:{port}/", process)
+        return time.monotonic() - start
+    finally:
+        stop(process)
+
+class ServeProcess:
+    """
+    python -m app.serve com leitura do log para detectar workers prontos.
+    """
+
+    def __init__(self, env: Dict[str, str], workers: int):
+        self.port = free_port()
+        self.workers = workers
+        env = dict(env, SERVER_PORT=str(self.port), SERVER_WORKERS=str(workers), SERVER_HOST="127.0.0.1")
+        self.ready: Dict[int, float] = {}
+        self._condition = threading.Condition()
+        self.started_at = time.monotonic()
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "app.serve"],
+            cwd=SRC_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        threading.Thread(target=self._read_log, daemon=True).start()
+
+    def _read_log(self) -> None:
+        for line in self.process.stderr:
+            match = STARTUP_COMPLETE.search(line)
+            if match:
+                with self._condition:
+                    self.ready[int(match.group(1))] = time.monotonic()
+                    self._condition.notify_all()
+
+    def wait_ready(self, count: int, exclude: Optional[set] = None, timeout: float = 60.0) -> float:
+        """
+        Espera count workers prontos (fora de exclude) e retorna o instante
+        em que o último ficou pronto.
+        """
+        exclude = exclude or set()
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                pids = [pid for pid in self.ready if pid not in exclude]
+                if len(pids) >= count:
+                    return max(self.ready[pid] for pid in pids)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self.process.poll() is not None:
+                    raise RuntimeError("Workers não ficaram prontos a tempo")
+                self._condition.wait(remaining)
+
+    def stop(self) -> None:
+        stop(self.process)
+
+def measure_serve(env: Dict[str, str], workers: int) -> Dict[str, float]:
+    server = ServeProcess(env, workers)
+    try:
+        all_ready = server.wait_ready(workers) - server.started_at
+        wait_ok(f"http://127.0.0.1:{server.port}/", server.process)
+        victim = next(iter(server.ready))
+        killed_at = time.monotonic()
+        os.kill(victim, signal.SIGKILL)
+        respawn = server.wait_ready(1, exclude=set(server.ready)) - killed_at
+        return {"serve": all_ready, "respawn": respawn}
+    finally:
+        server.stop()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2, help="Workers do python -m app.serve")
+    parser.add_argument("--database-url", help="Banco já migrado; padrão é um SQLite temporário")
+    parser.add_argument("--env", action="append", default=[], metavar="CHAVE=VALOR", help="Variável extra para o servidor")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = args.database_url or f"sqlite:///{os.path.join(directory, 'startup.db')}"
+        env = server_env(database_url, dict(item.split("=", 1) for item in args.env))
+        if not args.database_url:
+            subprocess.run(
+                [sys.executable, "-c", "from app.core.init_db import init_db; init_db()"],
+                cwd=SRC_DIR, env=env, check=True, stdout=subprocess.DEVNULL,
+            )
+
+        samples: Dict[str, List[float]] = {"import": [], "cold start": [], "serve": [], "respawn": []}
+        for _ in range(args.runs):
+            samples["import"].append(measure_import(env))
+            samples["cold start"].append(measure_cold_start(env))
+            serve = measure_serve(env, args.workers)
+            samples["serve"].append(serve["serve"])
+            samples["respawn"].append(serve["respawn"])
+
+    results = {name: stats(values) for name, values in samples.items()}
+    results["serve"]["workers"] = args.workers
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+        return
+    print(f"{'caso':<12}  {'mínimo (ms)':>12}  {'mediana (ms)':>12}  {'máximo (ms)':>12}")
+    for name, values in results.items():
+        print(f"{name:<12}  {values['min_ms']:>12.1f}  {values['median_ms']:>12.1f}  {values['max_ms']:>12.1f}")
+
+if __name__ == "__main__":
+    main()
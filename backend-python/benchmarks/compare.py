@@ -0,0 +1,44 @@
+"""
+Compara dois resultados JSON do teste de carga (benchmarks.load).
+
+    python -m benchmarks.compare antes.json depois.json
+
+Para cada quantidade de workers e endpoint presentes nos dois arquivos,
+mostra p50/p95/p99 e requisições por segundo com a variação percentual.
+"""
+import argparse
+import json
+from typing import Dict, List, Optional
+
+METRICS = ("rps", "p50_ms", "p95_ms", "p99_ms")
+
+def load_runs(path: str) -> Dict[int, Dict]:
+    with open(path) as f:
+        document = json.load(f)
+    return {run["workers"]: run for run in document["runs"]}
+
+def delta(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args(argv)
+
+    before_runs, after_runs = load_runs(args.before), load_runs(args.after)
+    print(f"{'workers':>7}  {'endpoint':<16} " + " ".join(f"{m:>22}" for m in METRICS))
+    for workers in sorted(set(before_runs) & set(after_runs)):
+        before = dict(before_runs[workers]["endpoints"], **{"(total)": before_runs[workers]["total"]})
+        after = dict(after_runs[workers]["endpoints"], **{"(total)": after_runs[workers]["total"]})
+        for endpoint in [name for name in before if name in after]:
+            cells = [
+                f"{before[endpoint][m]:>8.1f} → {after[endpoint][m]:>8.1f} {delta(before[endpoint][m], after[endpoint][m]):>7}"
+                for m in METRICS
+            ]
+            print(f"{workers:>7}  {endpoint:<16} " + " ".join(f"{cell:>22}" for cell in cells))
+
+if __name__ == "__main__":
+    main()
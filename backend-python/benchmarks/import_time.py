@@ -0,0 +1,87 @@
+"""
+Orçamento de tempo de importação da API.
+
+Importa app.services.main em processos novos com "python -X importtime",
+reporta a mediana do tempo acumulado e os módulos mais caros, e termina com
+código 1 quando a mediana passa do orçamento ou quando algum módulo que
+deveria ser carregado sob demanda aparece na importação.
+
+    python -m benchmarks.import_time [--runs 5] [--budget-ms 1500] [--top 15]
+
+Roda no CI a cada mudança em backend-python
+(.github/workflows/backend-import-time.yml).
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from benchmarks import SRC_DIR
+
+MODULE = "app.services.main"
+
+# Carregados apenas no primeiro uso (e-mail, assinatura assimétrica de JWT)
+LAZY_MODULES = ("fastapi_mail", "jinja2", "aiosmtplib", "jose.jwt", "cryptography")
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+def import_times() -> Dict[str, Tuple[int, int]]:
+    """
+    Importa o módulo em um processo novo.
+
+    Returns:
+        Dict[str, Tuple[int, int]]: Módulo -> (tempo próprio, tempo acumulado) em µs
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True,
+    )
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            times[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return times
+
+def top_packages(times: Dict[str, Tuple[int, int]], count: int) -> List[Tuple[str, int]]:
+    """
+    Soma o tempo próprio por pacote de primeiro nível.
+    """
+    packages: Dict[str, int] = {}
+    for name, (own, _) in times.items():
+        package = name.split(".", 1)[0]
+        packages[package] = packages.get(package, 0) + own
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:count]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="Mediana máxima aceita")
+    parser.add_argument("--top", type=int, default=15, help="Quantidade de pacotes listados")
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    median_ms = statistics.median(times[MODULE][1] for times in runs) / 1000
+
+    print(f"{MODULE}: mediana {median_ms:.1f} ms em {args.runs} execuções (orçamento {args.budget_ms:.0f} ms)")
+    print(f"\n{'pacote':<24}  {'tempo próprio (ms)':>18}")
+    for package, own in top_packages(runs[-1], args.top):
+        print(f"{package:<24}  {own / 1000:>18.1f}")
+
+    failed = False
+    eager = sorted(
+        name for name in runs[-1]
+        if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+    )
+    if eager:
+        print(f"\nMódulos que deveriam ser importados sob demanda: {', '.join(eager)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"\nOrçamento excedido em {median_ms - args.budget_ms:.1f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
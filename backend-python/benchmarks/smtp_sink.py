@@ -0,0 +1,102 @@
+"""
+Servidor SMTP local que apenas conta e descarta as mensagens recebidas.
+
+Substitui o servidor de e-mail real em desenvolvimento, testes manuais e
+benchmarks:
+
+    python -m benchmarks.smtp_sink --port 1025
+
+Configure a API com MAIL_SERVER=localhost, MAIL_PORT=1025,
+MAIL_STARTTLS=false e MAIL_USE_CREDENTIALS=false.
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional
+from aiosmtpd.controller import Controller
+
+class CountingHandler:
+    """
+    Handler do aiosmtpd que registra as mensagens recebidas.
+    """
+
+    def __init__(self, keep: int = 100, delay: float = 0.0):
+        self.count = 0
+        self.keep = keep
+        self.delay = delay
+        self.messages: List[bytes] = []
+        # Última mensagem e total recebido por destinatário
+        self.latest: Dict[str, bytes] = {}
+        self.received: Dict[str, int] = {}
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.count += 1
+        if len(self.messages) < self.keep:
+            self.messages.append(envelope.content)
+        for recipient in envelope.rcpt_tos:
+            self.latest[recipient] = envelope.content
+            self.received[recipient] = self.received.get(recipient, 0) + 1
+        return "250 OK"
+
+class SMTPSink:
+    """
+    Sink SMTP que roda em uma thread própria (aiosmtpd Controller).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 1025, delay: float = 0.0):
+        self.handler = CountingHandler(delay=delay)
+        self.controller = Controller(self.handler, hostname=host, port=port)
+
+    @property
+    def count(self) -> int:
+        return self.handler.count
+
+    def received(self, recipient: str) -> int:
+        return self.handler.received.get(recipient, 0)
+
+    def latest(self, recipient: str) -> Optional[bytes]:
+        return self.handler.latest.get(recipient)
+
+    def start(self) -> "SMTPSink":
+        self.controller.start()
+        return self
+
+    def stop(self) -> None:
+        self.controller.stop()
+
+    def wait_for(self, count: int, timeout: float = 10.0) -> bool:
+        """
+        Espera até receber count mensagens.
+        """
+        deadline = time.monotonic() + timeout
+        while self.count < count:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def __enter__(self) -> "SMTPSink":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--delay", type=float, default=0.0, help="Atraso artificial por mensagem (s)")
+    args = parser.parse_args(argv)
+    with SMTPSink(args.host, args.port, args.delay) as sink:
+        print(f"SMTP sink em {args.host}:{args.port} (Ctrl+C para sair)")
+        try:
+            while True:
+                time.sleep(5)
+                print(f"mensagens recebidas: {sink.count}")
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
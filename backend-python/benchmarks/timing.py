@@ -0,0 +1,70 @@
+import json
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+def measure(fn: Callable[[], Any], number: int = 1000, repeat: int = 5) -> Dict[str, float]:
+    """
+    Mede o tempo por chamada de fn.
+
+    Args:
+        fn: Função sem argumentos a ser medida
+        number: Chamadas por rodada
+        repeat: Número de rodadas
+
+    Returns:
+        Dict[str, float]: Melhor tempo, mediana (em microssegundos) e chamadas por segundo
+    """
+    rounds: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number)
+    best = min(rounds)
+    return {
+        "best_us": best * 1e6,
+        "median_us": statistics.median(rounds) * 1e6,
+        "ops_per_sec": 1.0 / best if best else float("inf"),
+        "number": number,
+        "repeat": repeat,
+    }
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """
+    Percentil pelo método nearest-rank sobre amostras já ordenadas.
+    """
+    if not sorted_samples:
+        return 0.0
+    rank = max(int(round(pct / 100.0 * len(sorted_samples) + 0.5)) - 1, 0)
+    return sorted_samples[min(rank, len(sorted_samples) - 1)]
+
+def summarize(latencies: List[float], duration: float) -> Dict[str, float]:
+    """
+    Resume as latências (em segundos) de uma execução de carga.
+
+    Returns:
+        Dict[str, float]: Contagem, requisições por segundo e percentis em ms
+    """
+    samples = sorted(latencies)
+    return {
+        "count": len(samples),
+        "rps": len(samples) / duration if duration else 0.0,
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": samples[-1] * 1000 if samples else 0.0,
+    }
+
+def report(results: Dict[str, Dict[str, float]], as_json: bool = False) -> None:
+    """
+    Imprime os resultados em tabela ou em JSON.
+    """
+    if as_json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+        return
+    width = max(len(name) for name in results)
+    print(f"{'caso':<{width}}  {'melhor (us)':>12}  {'mediana (us)':>12}  {'ops/s':>12}")
+    for name, stats in results.items():
+        print(f"{name:<{width}}  {stats['best_us']:>12.2f}  {stats['median_us']:>12.2f}  {stats['ops_per_sec']:>12.0f}")
@@ -1,30 +1,4 @@
-from pydantic_settings import BaseSettings
-from typing import Optional
+# As configurações ficam em config.config; este módulo só as reexporta
+from config.config import Settings, get_settings, settings
 
-class Settings(BaseSettings):
-    PROJECT_NAME: str = "Modelo"
-    VERSION: str = "1.0.0"
-    API_V1_STR: str = "/api/v1"
-    
-    POSTGRES_SERVER: str
-    POSTGRES_USER: str
-    POSTGRES_PASSWORD: str
-    POSTGRES_DB: str
-    SQLALCHEMY_DATABASE_URI: Optional[str] = None
-
-    @property
-    def get_database_url(self) -> str:
-        if self.SQLALCHEMY_DATABASE_URI:
-            return self.SQLALCHEMY_DATABASE_URI
-        return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
-
-    # Configurações de segurança
-    SECRET_KEY: str
-    ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
-
-    class Config:
-        case_sensitive = True
-        env_file = ".env"
-
-settings = Settings() 
\ No newline at end of file
+__all__ = ["Settings", "get_settings", "settings"]
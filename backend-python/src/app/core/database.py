@@ -1,15 +1,117 @@
+import os
+from typing import Any, Callable, Dict, TypeVar, Union
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+from app.core.instrumentation import instrument_engine
+from app.core.profiling import capture_sql
+from app.core.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from app.core.replicas import Replica, ReplicaSet, RoutingSession
 from config.config import settings
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def engine_options(url: str, async_mode: bool = False) -> Dict[str, Any]:
+    """
+    Monta os parâmetros do engine a partir das configurações do pool.
+
+    Args:
+        url: URL do banco de dados
+        async_mode: Se o engine é assíncrono
+
+    Returns:
+        Dict[str, Any]: Argumentos para create_engine/create_async_engine
+    """
+    options: Dict[str, Any] = {
+        "poolclass": InstrumentedAsyncQueuePool if async_mode else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    timeout = settings.DB_STATEMENT_TIMEOUT_MS
+    if timeout > 0 and make_url(url).get_backend_name() == "postgresql":
+        # O timeout é aplicado pelo servidor em todas as sessões do pool
+        if async_mode:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(timeout)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+def create_replica(index: int, url: str) -> Replica:
+    """
+    Cria o engine de uma réplica de leitura, com pool e métricas próprios
+    (rótulo "replica<n>").
+    """
+    label = f"replica{index}"
+    if settings.DATABASE_ASYNC:
+        replica_engine = create_async_engine(url, **engine_options(url, async_mode=True))
+        sync_engine = replica_engine.sync_engine
+    else:
+        replica_engine = sync_engine = create_engine(url, **engine_options(url))
+    sync_engine.pool.metrics_label = label
+    if settings.METRICS_ENABLED:
+        instrument_engine(sync_engine, label)
+    if settings.PROFILING_ENABLED:
+        capture_sql(sync_engine)
+    return Replica(label, replica_engine)
+
+# Réplicas de leitura; vazio quando DATABASE_REPLICA_URLS não está definido
+replicas = ReplicaSet(
+    [create_replica(index, url) for index, url in enumerate(settings.replica_urls)],
+    settings.DB_REPLICA_HEALTH_CHECK_SECONDS,
+)
+RoutingSession.replicas = replicas
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+if settings.PROFILING_ENABLED:
+    capture_sql(engine)
+
+# Engine assíncrono, criado apenas quando DATABASE_ASYNC está habilitado
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    async_engine = create_async_engine(
+        settings.async_database_url,
+        **engine_options(settings.async_database_url, async_mode=True),
+    )
+    # Rótulo próprio: o engine síncrono continua em uso (tarefas em segundo
+    # plano, CLIs) e as séries dos dois pools não podem se sobrescrever
+    async_engine.sync_engine.pool.metrics_label = "primary_async"
+    if settings.METRICS_ENABLED:
+        instrument_engine(async_engine.sync_engine, "primary_async")
+    if settings.PROFILING_ENABLED:
+        capture_sql(async_engine.sync_engine)
+    # expire_on_commit=False evita lazy loads (I/O implícito) após o commit
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        sync_session_class=RoutingSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+def _dispose_pools_in_child() -> None:
+    # Conexões abertas no processo mestre (ex.: gunicorn com preload) não
+    # podem ser usadas pelos filhos; cada worker abre as suas
+    engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+    replicas.dispose(close=False)
+
+os.register_at_fork(after_in_child=_dispose_pools_in_child)
 
 Base = declarative_base()
 
+DBSession = Union[Session, AsyncSession]
+T = TypeVar("T")
+
 def get_db():
     """
     Função para obter uma sessão do banco de dados.
@@ -20,4 +122,87 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """
+    Função para obter uma sessão assíncrona do banco de dados.
+    Yields:
+        AsyncSession: Sessão assíncrona do banco de dados
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_read_db():
+    """
+    Sessão para dependências somente leitura: as consultas vão a uma réplica
+    (se houver) até a sessão escrever ou ser fixada no primário.
+    Yields:
+        Session: Sessão do banco de dados
+    """
+    db = SessionLocal(info={"read_only": True})
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db():
+    """
+    Versão assíncrona de get_read_db.
+    Yields:
+        AsyncSession: Sessão assíncrona do banco de dados
+    """
+    async with AsyncSessionLocal(info={"read_only": True}) as db:
+        yield db
+
+# Dependências usadas pelas rotas; o modo é escolhido por DATABASE_ASYNC
+get_session = get_async_db if settings.DATABASE_ASYNC else get_db
+get_read_session = get_async_read_db if settings.DATABASE_ASYNC else get_read_db
+
+async def run_db(db: DBSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Executa uma função síncrona que recebe uma Session sem bloquear o event loop.
+
+    Com AsyncSession a função roda via run_sync sobre o driver assíncrono;
+    com Session síncrona ela é enviada ao threadpool.
+
+    Args:
+        db: Sessão síncrona ou assíncrona
+        fn: Função no formato fn(session, *args, **kwargs)
+
+    Returns:
+        O valor retornado por fn
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+def pin_primary(db: DBSession) -> None:
+    """
+    Faz a sessão de leitura consultar o primário daqui em diante
+    (read-your-writes).
+    """
+    db.info["primary"] = True
+
+async def run_read(db: DBSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Como run_db, para leituras que podem ir à réplica. Um resultado vazio é
+    aceito como está: buscas por valores arbitrários do cliente (e-mail,
+    token de reset) não devem gerar uma segunda consulta no primário.
+    """
+    return await run_db(db, fn, *args, **kwargs)
+
+async def run_read_your_writes(db: DBSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Como run_read, para buscas cujo alvo deve existir (ex.: o usuário de um
+    token já validado): se a réplica não encontrar nada, por atraso de
+    replicação, repete a consulta no primário.
+
+    Use apenas quando a chave já foi autenticada, para que um cliente não
+    consiga forçar consultas no primário com valores inexistentes.
+    """
+    result = await run_db(db, fn, *args, **kwargs)
+    if result is None and db.info.get("replica") is not None and not db.info.get("primary"):
+        pin_primary(db)
+        result = await run_db(db, fn, *args, **kwargs)
+    return result
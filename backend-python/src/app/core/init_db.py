@@ -1,10 +1,106 @@
-from app.core.database import Base, engine
+import asyncio
+import logging
+import os
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+from app.core.database import Base, async_engine, engine
 from app.models.user import User
+from app.models.email_outbox import EmailOutbox
+from app.models.refresh_token_family import RefreshTokenFamily
+from app.models.token_revocation import RevokedToken, UserTokenRevocation
+from app.models.password_reset_token import PasswordResetToken
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+# backend-python/alembic, ao lado do diretório src
+DEFAULT_ALEMBIC_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    "alembic",
+)
 
 def init_db():
     # Cria todas as tabelas
     Base.metadata.create_all(bind=engine)
     print("Banco de dados inicializado com sucesso!")
 
+def check_alembic_head() -> None:
+    """
+    Verifica se o banco está na revisão mais recente das migrações.
+
+    Raises:
+        RuntimeError: Se o banco não estiver migrado até o head do Alembic
+    """
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    config = Config()
+    config.set_main_option("script_location", settings.ALEMBIC_SCRIPT_LOCATION or DEFAULT_ALEMBIC_DIR)
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+    with engine.connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+    if current != heads:
+        raise RuntimeError(
+            f"Banco de dados na revisão {sorted(current) or 'nenhuma'}, esperado {sorted(heads)}; "
+            "execute 'alembic upgrade head'"
+        )
+
+def prepare_database() -> None:
+    """
+    Prepara o esquema conforme DB_SCHEMA_CHECK:
+
+    - "alembic": apenas confere se o banco está no head das migrações;
+    - "create_all": cria as tabelas ausentes (desenvolvimento local);
+    - "none": não faz nada.
+    """
+    mode = settings.DB_SCHEMA_CHECK
+    if mode == "alembic":
+        check_alembic_head()
+    elif mode == "create_all":
+        init_db()
+    elif mode != "none":
+        raise ValueError(f"DB_SCHEMA_CHECK inválido: {mode}")
+
+def _warm_sync_pool(connections: int) -> None:
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = engine.connect()
+            opened.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in opened:
+            connection.close()
+
+async def _warm_async_pool(connections: int) -> None:
+    async def open_one():
+        connection = await async_engine.connect()
+        await connection.execute(text("SELECT 1"))
+        return connection
+
+    results = await asyncio.gather(*(open_one() for _ in range(connections)), return_exceptions=True)
+    await asyncio.gather(*(r.close() for r in results if not isinstance(r, BaseException)))
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+async def warm_pool(connections: int) -> None:
+    """
+    Abre conexões antecipadamente para que as primeiras requisições não
+    paguem o handshake com o banco.
+
+    Args:
+        connections: Número de conexões a abrir (limitado ao tamanho do pool)
+    """
+    connections = min(connections, settings.DB_POOL_SIZE)
+    if connections <= 0:
+        return
+    if async_engine is not None:
+        await _warm_async_pool(connections)
+    else:
+        await run_in_threadpool(_warm_sync_pool, connections)
+    logger.info(f"Pool de conexões aquecido com {connections} conexões")
+
 if __name__ == "__main__":
-    init_db() 
\ No newline at end of file
+    init_db()
@@ -0,0 +1,116 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+from anyio import to_thread
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.logs import route_template
+from app.core.metrics import (
+    DB_QUERIES_PER_REQUEST,
+    DB_QUERY_SECONDS,
+    DB_TIME_PER_REQUEST,
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    THREADPOOL_IN_USE,
+    THREADPOOL_SIZE,
+    THREADPOOL_WAITING,
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+class QueryStats:
+    """
+    Acumula os comandos SQL executados durante uma requisição.
+    """
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+# O objeto é criado pelo middleware; o threadpool e o greenlet do SQLAlchemy
+# assíncrono herdam o contexto, então os eventos do engine somam nele
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def instrument_engine(engine: Engine, label: str = "primary") -> None:
+    """
+    Registra eventos no engine para medir a latência de cada comando SQL e
+    somar contagem e tempo na requisição corrente.
+
+    Args:
+        engine: Engine síncrono (para AsyncEngine, use async_engine.sync_engine)
+        label: Valor do rótulo "engine" das métricas
+    """
+    histogram = DB_QUERY_SECONDS.labels(label)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        histogram.observe(elapsed)
+        stats = _query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # Comandos com erro não chegam ao after_cursor_execute
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+def _sample_threadpool() -> None:
+    statistics = to_thread.current_default_thread_limiter().statistics()
+    THREADPOOL_IN_USE.set(statistics.borrowed_tokens)
+    THREADPOOL_SIZE.set(statistics.total_tokens)
+    THREADPOOL_WAITING.set(statistics.tasks_waiting)
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que publica latência por rota, requisições em andamento,
+    contagem/tempo de SQL por requisição e a ocupação do threadpool.
+
+    O rótulo de rota é o template (ex.: "/auth/me"); requisições que não
+    casam com nenhuma rota usam "unmatched", mantendo a cardinalidade fixa.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats = QueryStats()
+        token = _query_stats.set(stats)
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _query_stats.reset(token)
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = route_template(scope) or UNMATCHED_ROUTE
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.labels(method, route).observe(elapsed)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            DB_QUERIES_PER_REQUEST.labels(route).observe(stats.count)
+            DB_TIME_PER_REQUEST.labels(route).observe(stats.seconds)
+            _sample_threadpool()
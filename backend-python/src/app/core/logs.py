@@ -0,0 +1,141 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+from config.config import settings
+
+access_logger = logging.getLogger("app.access")
+
+_listener: Optional[QueueListener] = None
+
+# Atributos padrão de LogRecord, que não entram como campos extras no JSON
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formata cada registro como uma linha JSON, incluindo os campos extras.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+def setup_logging() -> None:
+    """
+    Configura o logging do processo.
+
+    Os handlers da raiz são substituídos por um QueueHandler: o event loop só
+    coloca o registro em uma fila, e a formatação e a escrita em stderr ficam
+    com a thread do QueueListener.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if settings.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JSONFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+def _restart_logging_in_child() -> None:
+    # A thread do QueueListener não sobrevive ao fork (ex.: gunicorn com
+    # preload); o processo filho precisa da sua própria
+    global _listener
+    if _listener is not None:
+        _listener = None
+        setup_logging()
+
+os.register_at_fork(after_in_child=_restart_logging_in_child)
+
+def stop_logging() -> None:
+    """
+    Esvazia a fila e encerra a thread de escrita dos logs.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def route_template(scope) -> Optional[str]:
+    """
+    Retorna o template da rota atendida (ex.: "/auth/me"), já com o prefixo
+    do router incluído, ou None se nenhuma rota casou.
+    """
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None:
+        return context.path_format
+    return getattr(scope.get("route"), "path", None)
+
+class RequestLoggingMiddleware:
+    """
+    Middleware ASGI que emite uma linha estruturada por requisição
+    (método, caminho, rota, status, duração e id do usuário).
+
+    Apenas uma fração ACCESS_LOG_SAMPLE_RATE das requisições é registrada;
+    respostas 5xx são sempre registradas.
+    """
+
+    def __init__(self, app, sample_rate: float = 1.0):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not access_logger.isEnabledFor(logging.INFO):
+            await self.app(scope, receive, send)
+            return
+
+        # Garante que o estado da requisição (ex.: user_id) seja visível aqui
+        state = scope.setdefault("state", {})
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if status_code >= 500 or self.sample_rate >= 1.0 or random.random() < self.sample_rate:
+                access_logger.info(
+                    "request",
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "route": route_template(scope),
+                        "status": status_code,
+                        "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                        "user_id": state.get("user_id"),
+                    },
+                )
@@ -0,0 +1,260 @@
+import os
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from fastapi import Response
+
+# Com vários workers (uvicorn --workers / gunicorn) cada processo grava suas
+# métricas em arquivos neste diretório, agregados no momento do scrape
+MULTIPROCESS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Métricas HTTP (rótulo "route" é o template da rota, nunca o caminho bruto)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "Requisições HTTP concluídas por rota e status",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requisições HTTP em andamento",
+    multiprocess_mode="livesum",
+)
+
+# Threadpool do anyio, usado pelas dependências e rotas síncronas
+THREADPOOL_IN_USE = Gauge(
+    "threadpool_threads_in_use",
+    "Threads do threadpool padrão ocupadas",
+    multiprocess_mode="livesum",
+)
+THREADPOOL_SIZE = Gauge(
+    "threadpool_threads_total",
+    "Limite de threads do threadpool padrão",
+    multiprocess_mode="livesum",
+)
+THREADPOOL_WAITING = Gauge(
+    "threadpool_tasks_waiting",
+    "Tarefas aguardando uma thread livre no threadpool padrão",
+    multiprocess_mode="livesum",
+)
+
+# Tokens JWT
+JWT_SECONDS = Histogram(
+    "jwt_seconds",
+    "Tempo de assinatura/verificação de tokens JWT",
+    ["operation"],
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01),
+)
+JWT_VERIFY_CACHE = Counter(
+    "jwt_verify_cache_total",
+    "Verificações de token atendidas pelo cache (hit) ou decodificadas (miss)",
+    ["result"],
+)
+JWT_REVOKED = Counter(
+    "jwt_revoked_total",
+    "Tokens com assinatura válida recusados por revogação",
+)
+
+# Consultas ao banco
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Latência de cada comando SQL executado",
+    ["engine"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "Número de comandos SQL executados por requisição",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Tempo total em comandos SQL por requisição",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Métricas do pool de conexões do SQLAlchemy (rótulo "engine" identifica o engine)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Tamanho configurado do pool de conexões",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Conexões atualmente emprestadas pelo pool",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Conexões de overflow abertas além do tamanho do pool",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Tempo de espera para obter uma conexão do pool",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+DB_POOL_CHECKOUT_FAILURES = Counter(
+    "db_pool_checkout_failures_total",
+    "Falhas ao obter uma conexão do pool (timeout ou erro de conexão)",
+    ["engine"],
+)
+
+# Réplicas de leitura
+DB_REPLICA_HEALTHY = Gauge(
+    "db_replica_healthy",
+    "Réplica de leitura no rodízio (1) ou fora do ar (0)",
+    ["engine"],
+    multiprocess_mode="livemin",
+)
+DB_READ_ROUTING = Counter(
+    "db_read_sessions_total",
+    "Sessões de leitura por destino (replica ou primary, sem réplica disponível)",
+    ["target"],
+)
+
+# Hash de senhas (app.core.security.hashing)
+PASSWORD_HASH_IN_FLIGHT = Gauge(
+    "password_hash_in_flight",
+    "Operações de hash aceitas e ainda não concluídas",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth",
+    "Operações de hash aguardando um worker livre",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "Tempo de CPU gasto no hash/verificação de senha",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0),
+)
+PASSWORD_HASH_WAIT_SECONDS = Histogram(
+    "password_hash_wait_seconds",
+    "Tempo de espera na fila do executor de hash",
+    ["operation"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "Operações de hash recusadas por fila cheia",
+    ["operation"],
+)
+PASSWORD_REHASH = Counter(
+    "password_rehash_total",
+    "Hashes atualizados para o perfil atual após um login (updated, skipped ou failed)",
+    ["result"],
+)
+
+# Limitador de requisições (app.core.rate_limit)
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions_total",
+    "Decisões do limitador por rota e chave (allowed, rejected ou error)",
+    ["route", "key", "result"],
+)
+
+# Refresh tokens (app.services.token_families)
+REFRESH_TOKENS = Counter(
+    "refresh_tokens_total",
+    "Refreshes por resultado (rotated, reused, replayed ou invalid)",
+    ["result"],
+)
+
+# Revogação de tokens (app.services.token_revocation)
+TOKEN_REVOCATIONS = Counter(
+    "token_revocations_total",
+    "Revogações gravadas por tipo (token ou user)",
+    ["kind"],
+)
+REVOCATION_SYNC = Counter(
+    "token_revocation_sync_total",
+    "Atualizações da cópia em memória das revogações por origem (notify, poll, full ou error)",
+    ["source"],
+)
+
+# Tokens de reset de senha (app.services.password_reset_tokens)
+RESET_TOKENS = Gauge(
+    "password_reset_tokens",
+    "Linhas na tabela de tokens de reset, medidas após cada varredura",
+    multiprocess_mode="mostrecent",
+)
+RESET_TOKENS_SWEPT = Counter(
+    "password_reset_tokens_swept_total",
+    "Tokens de reset expirados apagados pelo sweeper",
+)
+RESET_TOKEN_SWEEP_SECONDS = Histogram(
+    "password_reset_token_sweep_seconds",
+    "Duração de cada varredura completa dos tokens de reset expirados",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+# Fila de e-mails em memória (app.services.mailer)
+EMAIL_QUEUE_DEPTH = Gauge(
+    "email_queue_depth",
+    "Mensagens aguardando envio na fila em memória",
+    multiprocess_mode="livesum",
+)
+EMAIL_SEND_SECONDS = Histogram(
+    "email_send_seconds",
+    "Tempo de envio de uma mensagem pelo SMTP (sem o handshake)",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+EMAIL_CONNECT_SECONDS = Histogram(
+    "email_connect_seconds",
+    "Tempo de conexão SMTP (connect, STARTTLS e AUTH)",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+EMAIL_SENT = Counter(
+    "email_sent_total",
+    "Mensagens processadas pelo mailer",
+    ["result"],
+)
+
+# Dispatcher da outbox de e-mails (app.services.outbox_dispatcher)
+OUTBOX_DISPATCHED = Counter(
+    "email_outbox_dispatched_total",
+    "E-mails processados pelo dispatcher da outbox",
+    ["result"],
+)
+OUTBOX_BATCH_SECONDS = Histogram(
+    "email_outbox_batch_seconds",
+    "Duração de cada lote (reserva, envio e gravação do resultado)",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+def metrics_response() -> Response:
+    """
+    Gera a resposta no formato de exposição do Prometheus.
+
+    Em modo multiprocesso agrega os arquivos de todos os workers, para que
+    o resultado não dependa de qual worker atendeu o scrape.
+
+    Returns:
+        Response: Métricas em texto para o scrape
+    """
+    if MULTIPROCESS_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+def mark_process_dead(pid: int) -> None:
+    """
+    Remove os gauges "live" de um worker encerrado (modo multiprocesso).
+    """
+    if MULTIPROCESS_DIR:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,50 @@
+import time
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_FAILURES,
+    DB_POOL_CHECKOUT_SECONDS,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SIZE,
+)
+
+class InstrumentedPoolMixin:
+    """
+    Mixin que publica métricas de uso do pool de conexões.
+    Mede o tempo de checkout, as falhas e o número de conexões emprestadas.
+    """
+
+    metrics_label = "primary"
+
+    def _update_gauges(self) -> None:
+        DB_POOL_SIZE.labels(self.metrics_label).set(self.size())
+        DB_POOL_CHECKED_OUT.labels(self.metrics_label).set(self.checkedout())
+        DB_POOL_OVERFLOW.labels(self.metrics_label).set(max(self.overflow(), 0))
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except Exception:
+            DB_POOL_CHECKOUT_FAILURES.labels(self.metrics_label).inc()
+            raise
+        DB_POOL_CHECKOUT_SECONDS.labels(self.metrics_label).observe(time.perf_counter() - start)
+        self._update_gauges()
+        return record
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        self._update_gauges()
+
+    def recreate(self):
+        # Mantém o rótulo quando o engine recria o pool (ex.: engine.dispose())
+        pool = super().recreate()
+        pool.metrics_label = self.metrics_label
+        return pool
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
@@ -0,0 +1,245 @@
+import argparse
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from anyio import to_thread
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.logs import route_template
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+# Comandos SQL da requisição em perfilamento (None fora de um perfil)
+_profile_statements: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("profile_statements", default=None)
+
+def sign_profile_request(secret: str, path: str, ttl: int = 300) -> str:
+    """
+    Gera o valor do cabeçalho X-Profile para um caminho.
+
+    O valor tem o formato "<expira_em>.<assinatura>", em que a assinatura é
+    o HMAC-SHA256 de "<expira_em>:<caminho>" com PROFILING_SECRET.
+
+    Args:
+        secret: PROFILING_SECRET do servidor
+        path: Caminho da requisição (ex.: "/auth/login")
+        ttl: Validade da assinatura em segundos
+
+    Returns:
+        str: Valor do cabeçalho
+    """
+    expires = int(time.time()) + ttl
+    signature = hmac.new(secret.encode("utf-8"), f"{expires}:{path}".encode("utf-8"), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+def verify_profile_header(secret: str, path: str, value: str) -> bool:
+    """
+    Valida a assinatura e a expiração de um cabeçalho X-Profile.
+    """
+    expires, _, signature = value.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(secret.encode("utf-8"), f"{expires}:{path}".encode("utf-8"), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+def capture_sql(engine: Engine) -> None:
+    """
+    Registra eventos no engine que anexam os comandos SQL ao perfil da
+    requisição corrente; fora de um perfil o custo é uma leitura de ContextVar.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _profile_statements.get() is not None:
+            conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements = _profile_statements.get()
+        if statements is not None and conn.info.get("profile_start"):
+            start = conn.info["profile_start"].pop()
+            statements.append({
+                "statement": statement,
+                "executemany": executemany,
+                "started_at": start,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+            })
+
+class ProfileStore:
+    """
+    Diretório local de perfis com rotação pelo número de arquivos.
+
+    Cada perfil gera dois arquivos: "<id>.speedscope.json" (abre direto no
+    speedscope.app como flame graph) e "<id>.sql.json" com os metadados da
+    requisição e os comandos SQL executados.
+    """
+
+    def __init__(self, directory: str, max_profiles: int):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def profile_id(method: str, route: str) -> str:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%f")
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_")[:60] or "root"
+        return f"{stamp}-{method.lower()}-{slug}"
+
+    def save(self, profile_id: str, speedscope: str, details: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, profile_id)
+        with open(base + ".speedscope.json", "w") as f:
+            f.write(speedscope)
+        with open(base + ".sql.json", "w") as f:
+            json.dump(details, f, ensure_ascii=False, indent=2, default=str)
+        self.rotate()
+
+    def rotate(self) -> None:
+        with self._lock:
+            profiles = sorted(
+                name[: -len(".speedscope.json")]
+                for name in os.listdir(self.directory)
+                if name.endswith(".speedscope.json")
+            )
+            for profile_id in profiles[: max(len(profiles) - self.max_profiles, 0)]:
+                for suffix in (".speedscope.json", ".sql.json"):
+                    try:
+                        os.remove(os.path.join(self.directory, profile_id + suffix))
+                    except FileNotFoundError:
+                        pass
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI que perfila requisições selecionadas com o pyinstrument.
+
+    Uma requisição é perfilada quando traz um cabeçalho X-Profile assinado
+    (veja sign_profile_request) ou quando cai na amostra aleatória de 1 em
+    PROFILING_SAMPLE_RATE. Apenas um perfil roda por vez em cada processo;
+    as demais requisições seguem sem perfil. O id do perfil volta no
+    cabeçalho X-Profile-Id.
+    """
+
+    def __init__(self, app, store: ProfileStore, secret: Optional[str] = None,
+                 sample_rate: int = 0, interval: float = 0.001):
+        self.app = app
+        self.store = store
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self._active = threading.Lock()
+
+    def _selected(self, scope) -> bool:
+        if self.secret:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return verify_profile_header(self.secret, scope["path"], value.decode("latin-1"))
+        return self.sample_rate > 0 and random.random() * self.sample_rate < 1
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+        if not self._active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            self._active.release()
+
+    async def _profile(self, scope, receive, send):
+        from pyinstrument import Profiler
+        from pyinstrument.renderers import SpeedscopeRenderer
+
+        profile_id = self.store.profile_id(scope["method"], scope["path"])
+        statements: List[Dict[str, Any]] = []
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER, profile_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        token = _profile_statements.set(statements)
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            duration = time.perf_counter() - start
+            _profile_statements.reset(token)
+            for statement in statements:
+                statement["started_at"] = round((statement["started_at"] - start) * 1000, 3)
+            details = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route_template(scope),
+                "status": status_code,
+                "duration_ms": round(duration * 1000, 3),
+                "sql_count": len(statements),
+                "sql_ms": round(sum(s["duration_ms"] for s in statements), 3),
+                "statements": statements,
+            }
+            try:
+                speedscope = profiler.output(SpeedscopeRenderer())
+                await to_thread.run_sync(self.store.save, profile_id, speedscope, details)
+                logger.info("Perfil gravado", extra={"profile_id": profile_id, "duration_ms": details["duration_ms"]})
+            except Exception:
+                logger.exception("Falha ao gravar o perfil %s", profile_id)
+
+def install_profiling(app) -> bool:
+    """
+    Instala o ProfilingMiddleware conforme as configurações.
+
+    Sem PROFILING_ENABLED o middleware não é instalado (custo zero).
+
+    Returns:
+        bool: True se o middleware foi instalado
+    """
+    if not settings.PROFILING_ENABLED:
+        return False
+    try:
+        import pyinstrument  # noqa: F401
+    except ImportError:
+        logger.warning("PROFILING_ENABLED ativo, mas o pyinstrument não está instalado")
+        return False
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES),
+        secret=settings.PROFILING_SECRET,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        interval=settings.PROFILING_INTERVAL,
+    )
+    return True
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Gera o cabeçalho X-Profile para perfilar uma requisição")
+    parser.add_argument("path", help="Caminho da requisição, ex.: /auth/login")
+    parser.add_argument("--ttl", type=int, default=300, help="Validade da assinatura em segundos")
+    args = parser.parse_args(argv)
+    if not settings.PROFILING_SECRET:
+        parser.error("PROFILING_SECRET não está configurado")
+    print(f"X-Profile: {sign_profile_request(settings.PROFILING_SECRET, args.path, args.ttl)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+Limite de requisições por IP, e-mail e rota.
+
+Usa janela deslizante aproximada (duas janelas fixas ponderadas): a
+contagem estimada é a da janela atual somada à da anterior proporcional ao
+tempo que ainda resta dela sobreposto à janela deslizante. O estado de cada
+chave são dois contadores, o que permite uma única ida ao Redis
+(INCR/EXPIRE/GET em MULTI) e mantém o mesmo comportamento no backend em
+memória.
+
+As dependências criadas por rate_limit() rodam antes das demais dependências
+da rota: uma requisição recusada não abre sessão no banco nem calcula hash
+de senha, e recebe 429 com o cabeçalho Retry-After.
+"""
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple, Optional, Tuple
+from fastapi import HTTPException, Request, status
+
+from app.core.metrics import RATE_LIMIT_DECISIONS
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+class Rate(NamedTuple):
+    limit: int
+    period: float
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    retry_after: float
+
+def parse_rate(value: Optional[str]) -> Optional[Rate]:
+    """
+    Converte um limite no formato "<quantidade>/<período>".
+
+    O período pode ser second, minute, hour, day ou um número de segundos
+    (ex.: "5/minute", "100/3600").
+
+    Args:
+        value: Limite configurado; vazio desabilita
+
+    Returns:
+        Optional[Rate]: O limite ou None se desabilitado
+
+    Raises:
+        ValueError: Se o formato for inválido
+    """
+    if not value or not value.strip():
+        return None
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\w+(?:\.\d+)?)\s*", value)
+    if not match:
+        raise ValueError(f"Limite inválido: {value!r}")
+    limit, period = int(match.group(1)), match.group(2).lower().rstrip("s")
+    seconds = PERIODS.get(period)
+    if seconds is None:
+        try:
+            seconds = float(match.group(2))
+        except ValueError:
+            raise ValueError(f"Período inválido: {value!r}") from None
+    if limit <= 0 or seconds <= 0:
+        raise ValueError(f"Limite inválido: {value!r}")
+    return Rate(limit, seconds)
+
+def sliding_window(rate: Rate, previous: int, current: int, elapsed: float) -> RateLimitResult:
+    """
+    Decide a requisição a partir dos contadores já incrementados.
+
+    Args:
+        rate: Limite aplicado
+        previous: Contagem da janela anterior
+        current: Contagem da janela atual, incluindo esta requisição
+        elapsed: Segundos decorridos desde o início da janela atual
+
+    Returns:
+        RateLimitResult: Se a requisição é aceita e, se não, em quantos
+        segundos uma nova tentativa seria aceita
+    """
+    period = rate.period
+    weight = 1 - elapsed / period
+    if previous * weight + current <= rate.limit:
+        return RateLimitResult(True, 0.0)
+    # Tentativas recusadas também contam; o Retry-After indica quando a
+    # próxima tentativa (que soma mais uma) volta a caber no limite
+    if current < rate.limit:
+        allowed_at = period * (1 - (rate.limit - current - 1) / previous)
+        return RateLimitResult(False, max(allowed_at - elapsed, 0.0))
+    allowed_at = period * (1 - (rate.limit - 1) / current) if current > 1 else 0.0
+    return RateLimitResult(False, period - elapsed + allowed_at)
+
+class MemoryRateLimitBackend:
+    """
+    Contadores em memória, válidos apenas para o processo atual (com vários
+    workers o limite efetivo é multiplicado pelo número de workers).
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._data: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, window: int, period: float) -> Tuple[int, int]:
+        """
+        Incrementa a janela atual da chave.
+
+        Returns:
+            Tuple[int, int]: Contagens da janela anterior e da atual
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < window - 1:
+                entry = [window, 0, 0]
+            elif entry[0] == window - 1:
+                entry = [window, 0, entry[1]]
+            entry[1] += 1
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_keys:
+                self._data.popitem(last=False)
+            return entry[2], entry[1]
+
+    async def close(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+class RedisRateLimitBackend:
+    """
+    Contadores no Redis (ou compatível), compartilhados entre workers e
+    instâncias. Cada janela é uma chave com expiração de dois períodos.
+
+    O cliente é criado no primeiro uso, dentro do worker, para que a conexão
+    não seja herdada pelo fork do processo mestre.
+    """
+
+    def __init__(self, url: Optional[str] = None, client=None, prefix: str = "rl"):
+        self.url = url
+        self.prefix = prefix
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from redis.asyncio import Redis
+            self._client = Redis.from_url(self.url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        return self._client
+
+    async def hit(self, key: str, window: int, period: float) -> Tuple[int, int]:
+        current_key = f"{self.prefix}:{key}:{window}"
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.incr(current_key)
+            pipe.expire(current_key, math.ceil(period * 2))
+            pipe.get(f"{self.prefix}:{key}:{window - 1}")
+            current, _, previous = await pipe.execute()
+        return int(previous or 0), int(current)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+class RateLimiter:
+    """
+    Aplica limites sobre um backend de contadores.
+
+    Falhas do backend (ex.: Redis indisponível) liberam a requisição e são
+    registradas no log: o limitador não deve derrubar o login.
+    """
+
+    def __init__(self, backend, clock: Callable[[], float] = time.time):
+        self.backend = backend
+        self.clock = clock
+        self._last_error_log = 0.0
+
+    async def hit(self, name: str, identifier: str, rate: Rate) -> RateLimitResult:
+        """
+        Registra uma tentativa e decide se ela respeita o limite.
+
+        Args:
+            name: Nome do limite (rota e tipo da chave)
+            identifier: IP, e-mail etc.; é armazenado apenas como hash
+            rate: Limite aplicado
+        """
+        now = self.clock()
+        window = int(now // rate.period)
+        digest = hashlib.sha256(identifier.encode("utf-8")).hexdigest()[:32]
+        previous, current = await self.backend.hit(f"{name}:{digest}", window, rate.period)
+        return sliding_window(rate, previous, current, now - window * rate.period)
+
+    def log_error(self) -> None:
+        now = time.monotonic()
+        if now - self._last_error_log >= 60:
+            self._last_error_log = now
+            logger.exception("Falha no backend do limitador; requisições liberadas")
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+def build_rate_limiter() -> RateLimiter:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        if not settings.RATE_LIMIT_REDIS_URL:
+            raise ValueError("RATE_LIMIT_REDIS_URL é obrigatório com RATE_LIMIT_BACKEND=redis")
+        return RateLimiter(RedisRateLimitBackend(settings.RATE_LIMIT_REDIS_URL))
+    if settings.RATE_LIMIT_BACKEND != "memory":
+        raise ValueError(f"RATE_LIMIT_BACKEND inválido: {settings.RATE_LIMIT_BACKEND}")
+    return RateLimiter(MemoryRateLimitBackend())
+
+rate_limiter = build_rate_limiter()
+
+def client_ip(request: Request) -> Optional[str]:
+    """
+    IP do cliente; atrás de proxy depende de SERVER_FORWARDED_ALLOW_IPS.
+    """
+    return request.client.host if request.client else None
+
+async def request_email(request: Request) -> Optional[str]:
+    """
+    E-mail informado no corpo: campo "username" do formulário de login ou
+    "email" do JSON. O corpo já foi lido pelo FastAPI e fica em cache no
+    Request, então não há leitura adicional.
+    """
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith(("application/x-www-form-urlencoded", "multipart/form-data")):
+            value = (await request.form()).get("username")
+        else:
+            body = await request.json()
+            value = body.get("email") if isinstance(body, dict) else None
+    except ValueError:
+        return None
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return value.strip().lower()
+
+def rate_limit(route: str, by_ip: Optional[str] = None, by_email: Optional[str] = None,
+               limiter: Optional[RateLimiter] = None):
+    """
+    Cria a dependência que aplica os limites de uma rota.
+
+    Use em dependencies=[Depends(...)] no decorador da rota, para que rode
+    antes das dependências de banco e hash.
+
+    Args:
+        route: Nome da rota nas chaves e métricas (ex.: "login")
+        by_ip: Limite por IP, ex.: "30/minute" (vazio desabilita)
+        by_email: Limite por e-mail informado no corpo (vazio desabilita)
+        limiter: Limitador usado; padrão é o do processo
+
+    Raises:
+        HTTPException: 429 com Retry-After quando um limite é excedido
+    """
+    rules = [
+        (kind, rate, extract)
+        for kind, rate, extract in (
+            ("ip", parse_rate(by_ip), client_ip),
+            ("email", parse_rate(by_email), request_email),
+        )
+        if rate is not None
+    ]
+    decisions = {
+        (kind, result): RATE_LIMIT_DECISIONS.labels(route, kind, result)
+        for kind, _, _ in rules
+        for result in ("allowed", "rejected", "error")
+    }
+
+    async def dependency(request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        active = limiter or rate_limiter
+        for kind, rate, extract in rules:
+            identifier = extract(request)
+            if kind == "email":
+                identifier = await identifier
+            if identifier is None:
+                continue
+            try:
+                result = await active.hit(f"{route}:{kind}", identifier, rate)
+            except Exception:
+                decisions[kind, "error"].inc()
+                active.log_error()
+                continue
+            if not result.allowed:
+                decisions[kind, "rejected"].inc()
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Muitas tentativas. Tente novamente mais tarde",
+                    headers={"Retry-After": str(max(math.ceil(result.retry_after), 1))},
+                )
+            decisions[kind, "allowed"].inc()
+
+    return dependency
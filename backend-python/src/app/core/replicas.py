@@ -0,0 +1,151 @@
+import asyncio
+import itertools
+import logging
+from typing import Any, List, Optional
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from starlette.concurrency import run_in_threadpool
+
+from app.core.metrics import DB_READ_ROUTING, DB_REPLICA_HEALTHY
+
+logger = logging.getLogger(__name__)
+
+_READ_REPLICA = DB_READ_ROUTING.labels("replica")
+_READ_PRIMARY = DB_READ_ROUTING.labels("primary")
+
+class Replica:
+    """
+    Uma réplica de leitura e o seu estado de saúde.
+    """
+
+    def __init__(self, label: str, engine: Any):
+        self.label = label
+        # Engine síncrono ou AsyncEngine; o Session sempre usa o síncrono
+        self.engine = engine
+        self.bind: Engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        self.healthy = True
+        self._gauge = DB_REPLICA_HEALTHY.labels(label)
+        self._gauge.set(1)
+
+        @event.listens_for(self.bind, "handle_error")
+        def handle_error(exception_context):
+            # Conexão perdida: sai do rodízio até a próxima verificação
+            if exception_context.is_disconnect:
+                self.mark_down(exception_context.original_exception)
+
+    def mark_down(self, error: Any) -> None:
+        if self.healthy:
+            logger.warning(f"Réplica {self.label} fora do rodízio: {error}")
+        self.healthy = False
+        self._gauge.set(0)
+
+    def mark_up(self) -> None:
+        if not self.healthy:
+            logger.info(f"Réplica {self.label} de volta ao rodízio")
+        self.healthy = True
+        self._gauge.set(1)
+
+    def _ping(self) -> None:
+        with self.bind.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    async def check(self) -> None:
+        try:
+            if isinstance(self.engine, AsyncEngine):
+                async with self.engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+            else:
+                await run_in_threadpool(self._ping)
+        except Exception as e:
+            self.mark_down(e)
+        else:
+            self.mark_up()
+
+class ReplicaSet:
+    """
+    Réplicas de leitura em round-robin, pulando as marcadas como fora do ar.
+    Uma tarefa por worker verifica todas periodicamente (SELECT 1).
+    """
+
+    def __init__(self, replicas: List[Replica], check_interval: float):
+        self.replicas = replicas
+        self.check_interval = check_interval
+        self._counter = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self) -> Optional[Engine]:
+        """
+        Próxima réplica saudável, ou None se nenhuma estiver disponível.
+        """
+        count = len(self.replicas)
+        for _ in range(count):
+            replica = self.replicas[next(self._counter) % count]
+            if replica.healthy:
+                return replica.bind
+        return None
+
+    async def check(self) -> None:
+        await asyncio.gather(*(replica.check() for replica in self.replicas))
+
+    async def start(self) -> None:
+        if not self.replicas or self.check_interval <= 0:
+            return
+        await self.check()
+        self._stopping = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.check_interval)
+            except asyncio.TimeoutError:
+                await self.check()
+
+    def dispose(self, close: bool = True) -> None:
+        for replica in self.replicas:
+            replica.bind.dispose(close=close)
+
+class RoutingSession(Session):
+    """
+    Session que envia as leituras a uma réplica quando aberta para leitura
+    (info["read_only"]) e todo o resto ao primário. A réplica é escolhida na
+    primeira leitura e mantida até o fim da sessão.
+
+    Assim que a sessão escreve (flush ou INSERT/UPDATE/DELETE), ou quando
+    pin_primary é chamado, ela passa a ler também do primário, para
+    enxergar as próprias escritas.
+    """
+
+    replicas: Optional[ReplicaSet] = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        info = self.info
+        if info.get("read_only") and self.replicas and not info.get("primary"):
+            if self._flushing or isinstance(clause, UpdateBase):
+                info["primary"] = True
+            else:
+                bind = info.get("replica")
+                if bind is None:
+                    bind = self.replicas.choose()
+                    if bind is None:
+                        _READ_PRIMARY.inc()
+                        info["primary"] = True
+                        return super().get_bind(mapper=mapper, clause=clause, **kw)
+                    _READ_REPLICA.inc()
+                    info["replica"] = bind
+                return bind
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
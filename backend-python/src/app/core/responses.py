@@ -0,0 +1,86 @@
+from typing import Callable, Mapping, Optional, Union
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+def model_response(model: BaseModel, status_code: int = 200,
+                   headers: Optional[Mapping[str, str]] = None) -> Response:
+    """
+    Serializa um modelo já validado direto para JSON com o pydantic-core,
+    sem a revalidação pelo response_model nem o jsonable_encoder.
+
+    Use apenas com objetos montados pela própria aplicação (ex.: usuário do
+    cache, tokens recém-emitidos). A rota mantém o response_model, que
+    continua documentando a resposta no OpenAPI.
+
+    Args:
+        model: Modelo a ser enviado
+        status_code: Status HTTP
+        headers: Cabeçalhos adicionais
+
+    Returns:
+        Response: Resposta com o corpo JSON já serializado
+    """
+    return Response(
+        content=model.__pydantic_serializer__.to_json(model),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+def entity_tag(*parts: object) -> str:
+    """
+    ETag fraco montado a partir de valores que identificam a versão do
+    recurso (ex.: id e versão do usuário).
+    """
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Compara o cabeçalho If-None-Match com o ETag atual (comparação fraca,
+    aceitando lista de ETags e "*").
+    """
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def conditional_response(request: Request, etag: str,
+                         model: Union[BaseModel, Callable[[], BaseModel]],
+                         headers: Optional[Mapping[str, str]] = None) -> Response:
+    """
+    Responde 304 Not Modified, sem corpo, se o cliente já tiver a versão
+    indicada pelo ETag; senão, serializa o modelo com model_response.
+
+    O cache fica privado e sempre revalidado (no-cache): o navegador repete
+    a requisição com If-None-Match e recebe 304 enquanto nada mudar.
+
+    Args:
+        request: Requisição atual
+        etag: ETag da versão atual (ver entity_tag)
+        model: Modelo, ou função que o monta, chamada só se não houver 304
+        headers: Cabeçalhos adicionais
+
+    Returns:
+        Response: 304 ou resposta completa, ambas com o ETag
+    """
+    response_headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Vary": "Authorization",
+    }
+    if headers:
+        response_headers.update(headers)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=response_headers)
+    if not isinstance(model, BaseModel):
+        model = model()
+    return model_response(model, headers=response_headers)
@@ -1,9 +1,29 @@
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-from jose import JWTError, jwt
+import hashlib
+import secrets
+import time
+from jose import JWTError
 from fastapi import HTTPException, status
+from app.core.cache import TTLCache
+from app.core.metrics import JWT_REVOKED, JWT_SECONDS, JWT_VERIFY_CACHE
+from app.core.security.jwt_backends import get_jwt_backend
+from app.core.security.keys import get_keyring
+from app.core.security.revocation import revocation_list
 from config.config import settings
 
+# Tokens já verificados, indexados pelo SHA-256 do token. Cada entrada
+# expira no máximo no "exp" do próprio token.
+verified_token_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+
+_JWT_ENCODE_SECONDS = JWT_SECONDS.labels("encode")
+_JWT_DECODE_SECONDS = JWT_SECONDS.labels("decode")
+_JWT_CACHE_HITS = JWT_VERIFY_CACHE.labels("hit")
+_JWT_CACHE_MISSES = JWT_VERIFY_CACHE.labels("miss")
+
 class SecurityBase:
     """
     Classe base para gerenciar autenticação e segurança.
@@ -14,10 +34,18 @@ class SecurityBase:
         self.secret_key = settings.SECRET_KEY
         self.algorithm = settings.ALGORITHM
         self.access_token_expire_minutes = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+        self.keyring = get_keyring()
+        self.jwt_backend = get_jwt_backend(settings.JWT_BACKEND, self.algorithm)
+        self.token_cache = verified_token_cache
+        self.revocations = revocation_list
 
     def create_access_token(self, data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
         """
         Cria um token JWT de acesso.
+
+        Todo token recebe um "jti" (para revogação individual) e um "iat" com
+        milissegundos, para que o corte por usuário de um reset de senha não
+        alcance os tokens emitidos logo em seguida.
         
         Args:
             data: Dados a serem codificados no token
@@ -31,31 +59,67 @@ class SecurityBase:
             expire = datetime.utcnow() + expires_delta
         else:
             expire = datetime.utcnow() + timedelta(minutes=self.access_token_expire_minutes)
-        to_encode.update({"exp": expire})
-        return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+        to_encode.update({"exp": expire, "iat": round(time.time(), 3), "jti": secrets.token_urlsafe(12)})
+        start = time.perf_counter()
+        token = self.jwt_backend.encode(
+            to_encode,
+            self.keyring.signing_secret,
+            algorithm=self.algorithm,
+            headers=self.keyring.signing_headers,
+        )
+        _JWT_ENCODE_SECONDS.observe(time.perf_counter() - start)
+        return token
 
-    def verify_token(self, token: str) -> Dict[str, Any]:
+    def verify_token(self, token: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         Verifica e decodifica um token JWT.
         
         Args:
             token: Token JWT a ser verificado
+            use_cache: Consulta e alimenta o cache de tokens verificados
+                (desligado para tokens de uso único, como o refresh)
             
         Returns:
             Dict[str, Any]: Dados decodificados do token
             
         Raises:
-            HTTPException: Se o token for inválido
+            HTTPException: Se o token for inválido ou tiver sido revogado
         """
+        if use_cache:
+            cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+            cached = self.token_cache.get(cache_key)
+            if cached is not None:
+                _JWT_CACHE_HITS.inc()
+                self._check_revoked(cached)
+                return dict(cached)
+            _JWT_CACHE_MISSES.inc()
+        start = time.perf_counter()
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            return payload
+            key = self.keyring.verification_key(token)
+            payload = self.jwt_backend.decode(token, key, algorithms=[self.algorithm])
         except JWTError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token inválido",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        finally:
+            _JWT_DECODE_SECONDS.observe(time.perf_counter() - start)
+        self._check_revoked(payload)
+        exp = payload.get("exp")
+        if use_cache and isinstance(exp, (int, float)):
+            self.token_cache.set(cache_key, dict(payload), ttl=exp - time.time())
+        return payload
+
+    def _check_revoked(self, payload: Dict[str, Any]) -> None:
+        # Consulta apenas a cópia em memória das revogações
+        if self.revocations.is_revoked(payload):
+            JWT_REVOKED.inc()
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token revogado",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
 
     def get_user_from_token(self, token: str) -> str:
         """
@@ -92,8 +156,8 @@ class SecurityBase:
             str: Token de atualização gerado
         """
         if expires_delta is None:
-            expires_delta = timedelta(days=7)  # Token de atualização expira em 7 dias
-        return self.create_access_token(data, expires_delta)
+            expires_delta = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        return self.create_access_token({**data, "typ": "refresh"}, expires_delta)
 
     def verify_refresh_token(self, token: str) -> Dict[str, Any]:
         """
@@ -106,6 +170,13 @@ class SecurityBase:
             Dict[str, Any]: Dados decodificados do token
             
         Raises:
-            HTTPException: Se o token for inválido
+            HTTPException: Se o token for inválido ou não for de atualização
         """
-        return self.verify_token(token) 
\ No newline at end of file
+        payload = self.verify_token(token, use_cache=False)
+        if payload.get("typ") != "refresh":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token de atualização inválido",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return payload
@@ -0,0 +1,129 @@
+"""
+Calibra o perfil de custo do hash de senhas para o hardware atual.
+
+    python -m app.core.security.calibrate [--target-ms 250] [--scheme argon2]
+
+Mede o tempo de um hash com custos crescentes e escolhe o maior custo cuja
+mediana fica dentro do alvo. Para o argon2id a memória é fixada em
+--max-memory-mb (reduzida pela metade se nem uma passagem couber no alvo) e
+o número de passagens é ajustado. Ao final imprime as variáveis PASSWORD_*
+para o .env.
+
+Rode na mesma máquina (ou tipo de instância) da API, sem outra carga: cada
+worker do executor de hash atende cerca de 1000 / alvo logins por segundo.
+"""
+import argparse
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.core.security.hashing import build_crypt_context
+
+PASSWORD = "Calibracao-Senha-123"
+
+# Mínimos recomendados (OWASP): bcrypt 10 e argon2id com 19 MiB
+MIN_BCRYPT_ROUNDS = 10
+MIN_ARGON2_MEMORY_KB = 19456
+
+def time_hash(samples: int, **profile) -> float:
+    """
+    Mediana, em segundos, do hash de uma senha com o perfil informado.
+    """
+    context = build_crypt_context(**profile)
+    context.hash(PASSWORD)
+    durations = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash(PASSWORD)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+def calibrate_bcrypt(target: float, samples: int) -> Tuple[Optional[int], List[Tuple[int, float]]]:
+    """
+    Returns:
+        Tuple: Rounds escolhidos (None se nem o mínimo couber) e as medições
+    """
+    measurements = []
+    chosen = None
+    for rounds in range(MIN_BCRYPT_ROUNDS - 2, 20):
+        elapsed = time_hash(samples, scheme="bcrypt", bcrypt_rounds=rounds)
+        measurements.append((rounds, elapsed))
+        if elapsed > target:
+            break
+        chosen = rounds
+    return chosen, measurements
+
+def calibrate_argon2(target: float, samples: int, memory_kb: int,
+                     parallelism: int) -> Tuple[Optional[Dict[str, int]], List[Tuple[int, int, float]]]:
+    """
+    Returns:
+        Tuple: Memória/passagens escolhidas (None se nada couber) e as medições
+    """
+    measurements = []
+    while memory_kb >= MIN_ARGON2_MEMORY_KB // 2:
+        chosen = None
+        for time_cost in range(1, 11):
+            elapsed = time_hash(
+                samples, scheme="argon2", argon2_memory_kb=memory_kb,
+                argon2_time_cost=time_cost, argon2_parallelism=parallelism,
+            )
+            measurements.append((memory_kb, time_cost, elapsed))
+            if elapsed > target:
+                break
+            chosen = {"memory_kb": memory_kb, "time_cost": time_cost}
+        if chosen is not None:
+            return chosen, measurements
+        memory_kb //= 2
+    return None, measurements
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Tempo alvo por hash")
+    parser.add_argument("--scheme", choices=("bcrypt", "argon2", "both"), default="both")
+    parser.add_argument("--max-memory-mb", type=int, default=64, help="Memória máxima por hash do argon2id")
+    parser.add_argument("--parallelism", type=int, default=1, help="Lanes do argon2id")
+    parser.add_argument("--samples", type=int, default=5, help="Medições por configuração")
+    args = parser.parse_args()
+    target = args.target_ms / 1000
+
+    settings_lines = []
+    if args.scheme in ("bcrypt", "both"):
+        rounds, measurements = calibrate_bcrypt(target, args.samples)
+        print("bcrypt")
+        for value, elapsed in measurements:
+            print(f"  rounds={value:<3} {elapsed * 1000:8.1f} ms")
+        if rounds is None:
+            print("  nenhum custo coube no alvo")
+        else:
+            if rounds < MIN_BCRYPT_ROUNDS:
+                print(f"  aviso: abaixo do mínimo recomendado ({MIN_BCRYPT_ROUNDS}); aumente o alvo")
+            settings_lines.append(("bcrypt", [f"PASSWORD_BCRYPT_ROUNDS={rounds}"]))
+
+    if args.scheme in ("argon2", "both"):
+        chosen, measurements = calibrate_argon2(target, args.samples, args.max_memory_mb * 1024, args.parallelism)
+        print("argon2id")
+        for memory_kb, time_cost, elapsed in measurements:
+            print(f"  m={memory_kb // 1024:>3} MiB t={time_cost:<2} {elapsed * 1000:8.1f} ms")
+        if chosen is None:
+            print("  nenhum custo coube no alvo")
+        else:
+            if chosen["memory_kb"] < MIN_ARGON2_MEMORY_KB:
+                print("  aviso: memória abaixo do mínimo recomendado (19 MiB); aumente o alvo")
+            settings_lines.append(("argon2", [
+                f"PASSWORD_ARGON2_MEMORY_KB={chosen['memory_kb']}",
+                f"PASSWORD_ARGON2_TIME_COST={chosen['time_cost']}",
+                f"PASSWORD_ARGON2_PARALLELISM={args.parallelism}",
+            ]))
+
+    if settings_lines:
+        # argon2id é preferido quando cabe no alvo
+        scheme = "argon2" if any(name == "argon2" for name, _ in settings_lines) else "bcrypt"
+        print(f"\n# Perfil para ~{args.target_ms:.0f} ms por hash "
+              f"(~{1000 / args.target_ms:.1f} logins/s por worker de hash)")
+        print(f"PASSWORD_HASH_SCHEME={scheme}")
+        for _, lines in settings_lines:
+            for line in lines:
+                print(line)
+
+if __name__ == "__main__":
+    main()
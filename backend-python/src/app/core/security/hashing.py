@@ -0,0 +1,212 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core.metrics import (
+    PASSWORD_HASH_IN_FLIGHT,
+    PASSWORD_HASH_QUEUE_DEPTH,
+    PASSWORD_HASH_REJECTED,
+    PASSWORD_HASH_SECONDS,
+    PASSWORD_HASH_WAIT_SECONDS,
+    PASSWORD_REHASH,
+)
+from app.core.workers import api_workers, available_cpus, per_worker_share
+from config.config import settings
+
+HASH_SCHEMES = ("bcrypt", "argon2")
+
+def build_crypt_context(
+    scheme: str = "bcrypt",
+    bcrypt_rounds: int = 12,
+    argon2_memory_kb: int = 65536,
+    argon2_time_cost: int = 3,
+    argon2_parallelism: int = 1,
+) -> CryptContext:
+    """
+    Monta o contexto de hash a partir de um perfil de custo.
+
+    O esquema escolhido gera os novos hashes; o outro continua aceito na
+    verificação e é marcado como obsoleto. Hashes do mesmo esquema com
+    parâmetros diferentes do perfil (ex.: rounds do bcrypt) também acusam
+    needs_update, o que permite subir ou baixar o custo pelo rehash no login.
+
+    Args:
+        scheme: "bcrypt" ou "argon2" (argon2id)
+        bcrypt_rounds: Fator de custo do bcrypt (log2 das iterações)
+        argon2_memory_kb: Memória por hash do argon2id, em KiB
+        argon2_time_cost: Passagens do argon2id sobre a memória
+        argon2_parallelism: Lanes do argon2id
+
+    Raises:
+        ValueError: Se o esquema não for suportado
+    """
+    if scheme not in HASH_SCHEMES:
+        raise ValueError(f"Esquema de hash inválido: {scheme}")
+    return CryptContext(
+        schemes=[scheme] + [other for other in HASH_SCHEMES if other != scheme],
+        default=scheme,
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__type="ID",
+        argon2__memory_cost=argon2_memory_kb,
+        argon2__rounds=argon2_time_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+pwd_context = build_crypt_context(
+    scheme=settings.PASSWORD_HASH_SCHEME,
+    bcrypt_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    argon2_memory_kb=settings.PASSWORD_ARGON2_MEMORY_KB,
+    argon2_time_cost=settings.PASSWORD_ARGON2_TIME_COST,
+    argon2_parallelism=settings.PASSWORD_ARGON2_PARALLELISM,
+)
+
+def _timed_hash(password: str) -> Tuple[str, float]:
+    start = time.perf_counter()
+    result = pwd_context.hash(password)
+    return result, time.perf_counter() - start
+
+def _timed_verify(plain_password: str, hashed_password: str) -> Tuple[bool, float]:
+    start = time.perf_counter()
+    result = pwd_context.verify(plain_password, hashed_password)
+    return result, time.perf_counter() - start
+
+def hash_password(password: str) -> str:
+    """
+    Gera o hash de uma senha na thread atual, registrando o tempo gasto.
+    """
+    result, elapsed = _timed_hash(password)
+    PASSWORD_HASH_SECONDS.labels("hash").observe(elapsed)
+    return result
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifica uma senha na thread atual, registrando o tempo gasto.
+    """
+    result, elapsed = _timed_verify(plain_password, hashed_password)
+    PASSWORD_HASH_SECONDS.labels("verify").observe(elapsed)
+    return result
+
+def password_needs_update(hashed_password: str) -> bool:
+    """
+    Indica se o hash foi gerado com outro esquema ou outro custo; não
+    calcula hash, então pode rodar no event loop.
+    """
+    return pwd_context.needs_update(hashed_password)
+
+def hash_many(passwords: List[str]) -> List[str]:
+    """
+    Gera os hashes de um lote de senhas; usada pela importação em massa,
+    que envia um lote por tarefa ao pool de processos.
+    """
+    return [pwd_context.hash(password) for password in passwords]
+
+class PasswordHasher:
+    """
+    Executor dedicado para hash e verificação de senhas.
+
+    As operações rodam em um pool de processos (fora do GIL e do threadpool
+    compartilhado). A admissão é limitada: com todos os workers ocupados e a
+    fila cheia, a requisição falha imediatamente com 503 em vez de acumular.
+    """
+
+    def __init__(self, workers: int = 0, queue_size: int = 64, use_processes: bool = True):
+        # 0: as CPUs divididas entre os workers da API, para que o servidor
+        # inteiro não tenha mais processos de hash do que CPUs
+        self.workers = workers or max(available_cpus() // api_workers(), 1)
+        self.queue_size = queue_size
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_size
+
+    def _get_executor(self) -> Executor:
+        # Criado sob demanda para que cada worker do servidor tenha o seu pool
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.use_processes:
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers,
+                            thread_name_prefix="password-hash",
+                        )
+        return self._executor
+
+    def _acquire(self, operation: str) -> None:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                PASSWORD_HASH_REJECTED.labels(operation).inc()
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Serviço temporariamente sobrecarregado, tente novamente",
+                    headers={"Retry-After": "1"},
+                )
+            self._in_flight += 1
+            self._publish()
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._publish()
+
+    def _publish(self) -> None:
+        PASSWORD_HASH_IN_FLIGHT.set(self._in_flight)
+        PASSWORD_HASH_QUEUE_DEPTH.set(max(self._in_flight - self.workers, 0))
+
+    async def _run(self, operation: str, fn: Callable[..., Tuple[Any, float]], *args: Any) -> Any:
+        self._acquire(operation)
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, elapsed = await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._release()
+        PASSWORD_HASH_SECONDS.labels(operation).observe(elapsed)
+        PASSWORD_HASH_WAIT_SECONDS.labels(operation).observe(max(time.perf_counter() - start - elapsed, 0.0))
+        return result
+
+    async def hash(self, password: str) -> str:
+        """
+        Gera o hash de uma senha no executor dedicado.
+
+        Raises:
+            HTTPException: 503 se a fila do executor estiver cheia
+        """
+        return await self._run("hash", _timed_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Verifica uma senha no executor dedicado.
+
+        Raises:
+            HTTPException: 503 se a fila do executor estiver cheia
+        """
+        return await self._run("verify", _timed_verify, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+# A fila é definida para o servidor inteiro e dividida entre os workers
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=per_worker_share(settings.PASSWORD_HASH_QUEUE_SIZE),
+    use_processes=settings.PASSWORD_HASH_EXECUTOR == "process",
+)
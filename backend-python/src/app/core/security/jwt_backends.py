@@ -0,0 +1,184 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+from calendar import timegm
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
+
+# jose.jwt e cryptography são importados no primeiro uso: carregam os
+# backends criptográficos e pesam no tempo de inicialização dos workers
+
+class JoseBackend:
+    """
+    Backend JWT padrão, baseado no python-jose.
+    """
+
+    name = "jose"
+
+    def encode(self, claims: Dict[str, Any], key: Any, algorithm: str, headers: Optional[Dict[str, Any]] = None) -> str:
+        from jose import jwt
+        return jwt.encode(claims, key, algorithm=algorithm, headers=headers)
+
+    def decode(self, token: str, key: Any, algorithms: List[str]) -> Dict[str, Any]:
+        from jose import jwt
+        return jwt.decode(token, key, algorithms=algorithms)
+
+class HMACBackend:
+    """
+    Backend JWT para HS256/HS384/HS512 implementado diretamente com hmac.
+
+    Evita a construção de chaves JWK e as camadas genéricas do python-jose,
+    mantendo as mesmas exceções (JWTError e subclasses) e a validação das
+    claims registradas (exp, nbf, iat, aud, sub, jti).
+    """
+
+    name = "hmac"
+
+    _digests = {
+        "HS256": hashlib.sha256,
+        "HS384": hashlib.sha384,
+        "HS512": hashlib.sha512,
+    }
+
+    @staticmethod
+    def _b64encode(data: bytes) -> bytes:
+        return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+    @staticmethod
+    def _b64decode(data: bytes) -> bytes:
+        return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+    @staticmethod
+    def _to_bytes(key: Any) -> bytes:
+        return key.encode("utf-8") if isinstance(key, str) else key
+
+    def _supports(self, algorithm: Optional[str]) -> bool:
+        return algorithm in self._digests
+
+    def _sign(self, signing_input: bytes, key: Any, algorithm: str) -> bytes:
+        return hmac.new(self._to_bytes(key), signing_input, self._digests[algorithm]).digest()
+
+    def _verify(self, signing_input: bytes, signature: bytes, key: Any, algorithm: str) -> bool:
+        return hmac.compare_digest(self._sign(signing_input, key, algorithm), signature)
+
+    def encode(self, claims: Dict[str, Any], key: Any, algorithm: str, headers: Optional[Dict[str, Any]] = None) -> str:
+        if not self._supports(algorithm):
+            raise JWTError("Algorithm not supported")
+        claims = dict(claims)
+        for claim in ("exp", "iat", "nbf"):
+            if isinstance(claims.get(claim), datetime):
+                claims[claim] = timegm(claims[claim].utctimetuple())
+        header = {"alg": algorithm, "typ": "JWT"}
+        if headers:
+            header.update(headers)
+        signing_input = b".".join((
+            self._b64encode(json.dumps(header, separators=(",", ":"), sort_keys=True).encode("utf-8")),
+            self._b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8")),
+        ))
+        signature = self._sign(signing_input, key, algorithm)
+        return (signing_input + b"." + self._b64encode(signature)).decode("ascii")
+
+    def decode(self, token: str, key: Any, algorithms: List[str]) -> Dict[str, Any]:
+        try:
+            raw = token.encode("ascii")
+            signing_input, crypto_segment = raw.rsplit(b".", 1)
+            header_segment, payload_segment = signing_input.split(b".", 1)
+            header = json.loads(self._b64decode(header_segment))
+            signature = self._b64decode(crypto_segment)
+        except (ValueError, TypeError, UnicodeError):
+            raise JWTError("Error decoding token headers.")
+        if not isinstance(header, dict):
+            raise JWTError("Invalid header string: must be a json object")
+
+        algorithm = header.get("alg")
+        if algorithm not in algorithms or not self._supports(algorithm):
+            raise JWTError("The specified alg value is not allowed")
+        if not self._verify(signing_input, signature, key, algorithm):
+            raise JWTError("Signature verification failed.")
+
+        try:
+            claims = json.loads(self._b64decode(payload_segment))
+        except ValueError as e:
+            raise JWTError("Invalid payload string: %s" % e)
+        if not isinstance(claims, dict):
+            raise JWTError("Invalid payload string: must be a json object")
+        self._validate_claims(claims)
+        return claims
+
+    @staticmethod
+    def _validate_claims(claims: Dict[str, Any]) -> None:
+        now = timegm(time.gmtime())
+        for claim in ("iat", "nbf", "exp"):
+            if claim in claims and not isinstance(claims[claim], int):
+                try:
+                    int(claims[claim])
+                except (TypeError, ValueError):
+                    raise JWTClaimsError(f"Invalid {claim} claim")
+        if "nbf" in claims and int(claims["nbf"]) > now:
+            raise JWTClaimsError("The token is not yet valid (nbf)")
+        if "exp" in claims and int(claims["exp"]) < now:
+            raise ExpiredSignatureError("Signature has expired.")
+        if "aud" in claims:
+            # Nenhuma audiência é esperada por esta aplicação
+            raise JWTClaimsError("Invalid audience")
+        if "sub" in claims and not isinstance(claims["sub"], str):
+            raise JWTClaimsError("Subject must be a string.")
+        if "jti" in claims and not isinstance(claims["jti"], str):
+            raise JWTClaimsError("JWT ID must be a string.")
+
+class EdDSABackend(HMACBackend):
+    """
+    Backend JWT para EdDSA (Ed25519), algoritmo não suportado pelo python-jose.
+    Reaproveita a serialização e a validação de claims do HMACBackend.
+    """
+
+    name = "eddsa"
+
+    def _supports(self, algorithm: Optional[str]) -> bool:
+        return algorithm == "EdDSA"
+
+    def _sign(self, signing_input: bytes, key: Any, algorithm: str) -> bytes:
+        return key.sign(signing_input)
+
+    def _verify(self, signing_input: bytes, signature: bytes, key: Any, algorithm: str) -> bool:
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+        if isinstance(key, Ed25519PrivateKey):
+            key = key.public_key()
+        try:
+            key.verify(signature, signing_input)
+        except InvalidSignature:
+            return False
+        return True
+
+JWT_BACKENDS = {
+    JoseBackend.name: JoseBackend,
+    HMACBackend.name: HMACBackend,
+    EdDSABackend.name: EdDSABackend,
+}
+
+def get_jwt_backend(name: str, algorithm: str):
+    """
+    Retorna o backend JWT configurado.
+
+    O backend "hmac" só atende algoritmos HS*; para os demais o python-jose
+    é usado. EdDSA sempre usa o EdDSABackend.
+
+    Args:
+        name: Nome do backend ("jose" ou "hmac")
+        algorithm: Algoritmo de assinatura configurado
+
+    Returns:
+        Instância do backend
+    """
+    if name not in JWT_BACKENDS:
+        raise ValueError(f"Backend JWT desconhecido: {name}")
+    if algorithm == "EdDSA":
+        return EdDSABackend()
+    if name == HMACBackend.name and algorithm not in HMACBackend._digests:
+        return JoseBackend()
+    return JWT_BACKENDS[name]()
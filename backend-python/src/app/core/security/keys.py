@@ -0,0 +1,164 @@
+import base64
+import glob
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from jose.exceptions import JWTError
+
+from config.config import settings
+
+ASYMMETRIC_PREFIXES = ("RS", "ES")
+
+def is_asymmetric(algorithm: str) -> bool:
+    return algorithm == "EdDSA" or algorithm.startswith(ASYMMETRIC_PREFIXES)
+
+def _b64uint(value: int) -> str:
+    data = value.to_bytes((value.bit_length() + 7) // 8 or 1, "big")
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64bytes(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def public_jwk(public_key: Any, kid: str, algorithm: str) -> Dict[str, str]:
+    """
+    Converte uma chave pública em JWK (RFC 7517).
+
+    Args:
+        public_key: Chave pública do cryptography (RSA, EC ou Ed25519)
+        kid: Identificador da chave
+        algorithm: Algoritmo de assinatura
+
+    Returns:
+        Dict[str, str]: JWK pública
+    """
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+    jwk: Dict[str, str] = {"kid": kid, "alg": algorithm, "use": "sig"}
+    if isinstance(public_key, rsa.RSAPublicKey):
+        numbers = public_key.public_numbers()
+        jwk.update({"kty": "RSA", "n": _b64uint(numbers.n), "e": _b64uint(numbers.e)})
+    elif isinstance(public_key, ec.EllipticCurvePublicKey):
+        numbers = public_key.public_numbers()
+        size = (public_key.curve.key_size + 7) // 8
+        crv = {"secp256r1": "P-256", "secp384r1": "P-384", "secp521r1": "P-521"}[public_key.curve.name]
+        jwk.update({
+            "kty": "EC",
+            "crv": crv,
+            "x": _b64bytes(numbers.x.to_bytes(size, "big")),
+            "y": _b64bytes(numbers.y.to_bytes(size, "big")),
+        })
+    elif isinstance(public_key, ed25519.Ed25519PublicKey):
+        raw = public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+        jwk.update({"kty": "OKP", "crv": "Ed25519", "x": _b64bytes(raw)})
+    else:
+        raise ValueError(f"Tipo de chave não suportado: {type(public_key).__name__}")
+    return jwk
+
+def load_pem_key(path: str) -> Any:
+    """
+    Carrega uma chave PEM, privada ou pública.
+    """
+    from cryptography.hazmat.primitives import serialization
+
+    with open(path, "rb") as f:
+        data = f.read()
+    if b"PRIVATE KEY" in data:
+        return serialization.load_pem_private_key(data, password=None)
+    return serialization.load_pem_public_key(data)
+
+class KeyRing:
+    """
+    Conjunto de chaves usado para assinar e verificar tokens JWT.
+
+    Com algoritmos HS* usa apenas o SECRET_KEY. Com algoritmos assimétricos
+    assina com a chave privada atual (identificada pelo "kid") e verifica com
+    qualquer chave pública ativa, permitindo a rotação sem invalidar tokens
+    já emitidos.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret_key: str,
+        signing_key: Any = None,
+        signing_kid: Optional[str] = None,
+        verification_keys: Optional[Dict[str, Any]] = None,
+    ):
+        self.algorithm = algorithm
+        self.asymmetric = is_asymmetric(algorithm)
+        self.secret_key = secret_key
+        self.signing_key = signing_key
+        self.signing_kid = signing_kid
+        self.verification_keys: Dict[str, Any] = dict(verification_keys or {})
+        if self.asymmetric:
+            if signing_key is None or not signing_kid:
+                raise ValueError(f"O algoritmo {algorithm} exige JWT_SIGNING_KEY_FILE e JWT_SIGNING_KEY_ID")
+            self.verification_keys.setdefault(signing_kid, signing_key.public_key())
+        self._jwks = json.dumps(self.jwks()).encode("utf-8")
+
+    @property
+    def signing_secret(self) -> Any:
+        return self.signing_key if self.asymmetric else self.secret_key
+
+    @property
+    def signing_headers(self) -> Optional[Dict[str, str]]:
+        return {"kid": self.signing_kid} if self.asymmetric else None
+
+    def verification_key(self, token: str) -> Any:
+        """
+        Escolhe a chave de verificação pelo "kid" do cabeçalho do token.
+
+        Raises:
+            JWTError: Se o "kid" não corresponder a nenhuma chave ativa
+        """
+        if not self.asymmetric:
+            return self.secret_key
+        from jose import jwt
+        kid = jwt.get_unverified_header(token).get("kid") or self.signing_kid
+        key = self.verification_keys.get(kid)
+        if key is None:
+            raise JWTError("Unknown key id")
+        return key
+
+    def jwks(self) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Documento JWKS com as chaves públicas ativas (vazio para HS*).
+        """
+        return {
+            "keys": [
+                public_jwk(key, kid, self.algorithm)
+                for kid, key in self.verification_keys.items()
+            ]
+        }
+
+    @property
+    def jwks_json(self) -> bytes:
+        return self._jwks
+
+@lru_cache()
+def get_keyring() -> KeyRing:
+    """
+    Monta o KeyRing a partir das configurações (uma vez por processo).
+
+    Chaves adicionais de verificação ficam em JWT_VERIFICATION_KEYS_DIR,
+    um arquivo "<kid>.pem" por chave.
+    """
+    signing_key = None
+    if settings.JWT_SIGNING_KEY_FILE:
+        signing_key = load_pem_key(settings.JWT_SIGNING_KEY_FILE)
+    verification_keys: Dict[str, Any] = {}
+    if settings.JWT_VERIFICATION_KEYS_DIR:
+        for path in sorted(glob.glob(os.path.join(settings.JWT_VERIFICATION_KEYS_DIR, "*.pem"))):
+            key = load_pem_key(path)
+            if hasattr(key, "public_key"):
+                key = key.public_key()
+            verification_keys[os.path.splitext(os.path.basename(path))[0]] = key
+    return KeyRing(
+        algorithm=settings.ALGORITHM,
+        secret_key=settings.SECRET_KEY,
+        signing_key=signing_key,
+        signing_kid=settings.JWT_SIGNING_KEY_ID,
+        verification_keys=verification_keys,
+    )
@@ -0,0 +1,94 @@
+import threading
+import time
+from typing import Any, Dict, Iterable, Mapping, Tuple
+
+class RevocationList:
+    """
+    Cópia em memória das revogações de tokens, consultada a cada
+    verificação sem nenhum I/O.
+
+    Guarda os "jti" revogados (até o "exp" de cada token) e, por usuário, o
+    instante antes do qual todos os tokens emitidos deixam de valer. Quem
+    mantém a cópia atualizada entre os workers é app.services.token_revocation.
+    """
+
+    def __init__(self):
+        # jti -> exp (epoch) do token revogado
+        self._jtis: Dict[str, float] = {}
+        # user_id -> tokens com iat anterior a este instante (epoch) são inválidos
+        self._watermarks: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def is_revoked(self, payload: Mapping[str, Any]) -> bool:
+        """
+        Indica se o token, já verificado, foi revogado.
+
+        Args:
+            payload: Claims decodificadas do token
+
+        Returns:
+            bool: True se o jti foi revogado ou o token é anterior ao corte
+            do usuário (tokens sem "iat" são considerados anteriores)
+        """
+        jti = payload.get("jti")
+        if jti is not None and jti in self._jtis:
+            return True
+        if not self._watermarks:
+            return False
+        try:
+            watermark = self._watermarks.get(int(payload.get("sub")))
+        except (TypeError, ValueError):
+            return False
+        if watermark is None:
+            return False
+        try:
+            return float(payload.get("iat", 0)) < watermark
+        except (TypeError, ValueError):
+            return True
+
+    def add_token(self, jti: str, expires_at: float) -> None:
+        if expires_at > time.time():
+            with self._lock:
+                self._jtis[jti] = expires_at
+
+    def add_user(self, user_id: int, revoked_before: float) -> None:
+        with self._lock:
+            if revoked_before > self._watermarks.get(user_id, 0.0):
+                self._watermarks[user_id] = revoked_before
+
+    def update(self, tokens: Iterable[Tuple[str, float]], users: Iterable[Tuple[int, float]]) -> None:
+        for jti, expires_at in tokens:
+            self.add_token(jti, expires_at)
+        for user_id, revoked_before in users:
+            self.add_user(user_id, revoked_before)
+
+    def replace(self, tokens: Iterable[Tuple[str, float]], users: Iterable[Tuple[int, float]]) -> None:
+        """
+        Substitui todo o conteúdo (carga inicial ou após reconectar).
+        """
+        now = time.time()
+        jtis = {jti: expires_at for jti, expires_at in tokens if expires_at > now}
+        watermarks: Dict[int, float] = {}
+        for user_id, revoked_before in users:
+            watermarks[user_id] = max(revoked_before, watermarks.get(user_id, 0.0))
+        with self._lock:
+            self._jtis = jtis
+            self._watermarks = watermarks
+
+    def prune(self, max_token_age: float) -> None:
+        """
+        Descarta jtis de tokens já expirados e cortes mais antigos que o
+        token de maior duração.
+        """
+        now = time.time()
+        with self._lock:
+            self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > now}
+            self._watermarks = {
+                user_id: before for user_id, before in self._watermarks.items()
+                if before > now - max_token_age
+            }
+
+    def __len__(self) -> int:
+        return len(self._jtis) + len(self._watermarks)
+
+revocation_list = RevocationList()
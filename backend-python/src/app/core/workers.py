@@ -0,0 +1,34 @@
+"""
+Dimensionamento dos recursos por processo da API.
+
+O app.serve exporta WEB_CONCURRENCY com o número de workers da API antes de
+importar a aplicação, para que cada worker divida entre os demais o que é
+definido para o servidor inteiro (ex.: o pool de hash de senhas). Fora
+dele (uvicorn direto, CLIs), o processo se considera o único worker.
+"""
+import os
+
+def available_cpus() -> int:
+    """
+    Número de CPUs disponíveis para o processo (respeita a afinidade
+    definida por containers e cgroups quando suportado).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def api_workers() -> int:
+    """
+    Workers da API rodando neste servidor (WEB_CONCURRENCY, padrão 1).
+    """
+    try:
+        return max(int(os.environ.get("WEB_CONCURRENCY", "1")), 1)
+    except ValueError:
+        return 1
+
+def per_worker_share(total: int) -> int:
+    """
+    Parte de um total do servidor que cabe a cada worker (arredondada para
+    cima, no mínimo 1).
+    """
+    return max(-(-total // api_workers()), 1)
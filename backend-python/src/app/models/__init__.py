@@ -1,4 +1,8 @@
 from app.models.base import BaseModel
 from app.models.user import User
+from app.models.email_outbox import EmailOutbox
+from app.models.refresh_token_family import RefreshTokenFamily
+from app.models.token_revocation import RevokedToken, UserTokenRevocation
+from app.models.password_reset_token import PasswordResetToken
 
-__all__ = ['BaseModel', 'User'] 
\ No newline at end of file
+__all__ = ['BaseModel', 'User', 'EmailOutbox', 'RefreshTokenFamily', 'RevokedToken', 'UserTokenRevocation', 'PasswordResetToken'] 
\ No newline at end of file
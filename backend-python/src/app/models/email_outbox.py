@@ -0,0 +1,31 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Index, Integer, JSON, String, Text
+
+from app.core.database import Base
+
+class EmailOutbox(Base):
+    """
+    E-mails pendentes de envio, gravados na mesma transação que os originou.
+    O dispatcher (app.services.outbox_dispatcher) consome esta tabela.
+    """
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    recipient = Column(String, nullable=False)
+    # Dados para montar a mensagem, cifrados (seal_payload); apagados após
+    # o envio ou a desistência
+    payload = Column(JSON(none_as_null=True), nullable=True)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Reserva do dispatcher que está enviando a linha; enquanto ela vale,
+    # next_attempt_at aponta para o fim da reserva
+    claimed_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary
+
+from app.core.database import Base
+
+class PasswordResetToken(Base):
+    """
+    Token de redefinição de senha. Apenas o SHA-256 do token é gravado
+    nesta tabela. Até o envio do e-mail, o token também fica no payload da
+    email_outbox, mas cifrado (ver app.services.outbox).
+    """
+    __tablename__ = "password_reset_tokens"
+
+    token_hash = Column(LargeBinary(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
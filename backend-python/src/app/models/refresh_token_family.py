@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+
+from app.core.database import Base
+
+class RefreshTokenFamily(Base):
+    """
+    Sessão de refresh criada em cada login. Guarda apenas a geração do
+    último refresh token emitido: um token de geração anterior indica
+    reuso, e a família inteira é revogada.
+    """
+    __tablename__ = "refresh_token_families"
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    generation = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_used_at = Column(DateTime, nullable=True)
+    # Limite absoluto da sessão; a rotação não o estende
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+
+from app.core.database import Base
+
+class RevokedToken(Base):
+    """
+    Token revogado individualmente pelo "jti". A linha só é necessária até o
+    "exp" do token; depois disso o próprio JWT já é recusado.
+    """
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class UserTokenRevocation(Base):
+    """
+    Corte por usuário: todo token emitido antes de revoked_before é inválido
+    (ex.: após um reset de senha).
+    """
+    __tablename__ = "user_token_revocations"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    revoked_before = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime
+from sqlalchemy import Boolean, Column, Integer, String
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -11,7 +11,11 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False)
-    reset_token = Column(String, unique=True, nullable=True)
-    reset_token_expires = Column(DateTime, nullable=True)
+    # Incrementada pelo ORM a cada UPDATE (version_id_col); base do ETag.
+    # UPDATEs fora do ORM não a incrementam: devem alterar só colunas fora
+    # da representação do usuário e invalidar o user_cache
+    version = Column(Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
     
     # Relacionamentos podem ser adicionados aqui posteriormente 
\ No newline at end of file
@@ -1,3 +1,4 @@
+from app.routes.admin import router as admin_router
 from app.routes.auth import router as auth_router
 
-__all__ = ["auth_router"] 
\ No newline at end of file
+__all__ = ["admin_router", "auth_router"] 
\ No newline at end of file
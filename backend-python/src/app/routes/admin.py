@@ -0,0 +1,78 @@
+import io
+import logging
+import tempfile
+import threading
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.schemas.user import UserInDBBase
+from app.services.auth import get_current_superuser
+from app.services.user_bulk import export_users, hash_workers, import_users
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Uma importação por vez em cada worker: o hash em massa é limitado por CPU
+_import_lock = threading.Lock()
+
+# Corpo acima deste tamanho vai para um arquivo temporário em disco
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "jsonl": "application/x-ndjson"}
+
+@router.post("/users/import")
+async def import_users_endpoint(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|jsonl)$"),
+    current_user: UserInDBBase = Depends(get_current_superuser),
+) -> Any:
+    """
+    Importa usuários em massa a partir do corpo da requisição (CSV com
+    cabeçalho ou JSON Lines, veja app.services.user_bulk).
+
+    O corpo é lido em fluxo para um arquivo temporário e importado em lotes;
+    a resposta traz as contagens e as linhas duplicadas ou inválidas.
+    """
+    if not _import_lock.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Já existe uma importação em andamento",
+        )
+    try:
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY) as spool:
+            async for chunk in request.stream():
+                # Acima de SPOOL_MAX_MEMORY a escrita vai ao disco: fora do
+                # event loop
+                await run_in_threadpool(spool.write, chunk)
+            spool.seek(0)
+            # utf-8-sig aceita o BOM de planilhas exportadas como CSV
+            stream = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+            logger.info(f"Importação de usuários iniciada por {current_user.email}")
+            report = await run_in_threadpool(
+                import_users, stream, format, workers=hash_workers(in_api=True)
+            )
+    finally:
+        _import_lock.release()
+    logger.info(
+        f"Importação concluída: {report.inserted} inseridos, "
+        f"{report.duplicates} duplicados, {report.invalid} inválidos"
+    )
+    return report.to_dict()
+
+@router.get("/users/export")
+async def export_users_endpoint(
+    format: str = Query("csv", pattern="^(csv|jsonl)$"),
+    include_hashes: bool = False,
+    current_user: UserInDBBase = Depends(get_current_superuser),
+) -> StreamingResponse:
+    """
+    Exporta os usuários em fluxo (CSV ou JSON Lines).
+    """
+    return StreamingResponse(
+        export_users(format, include_hashes),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
@@ -1,39 +1,69 @@
 from datetime import timedelta
-from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 import logging
 import os
 
-from app.core.database import get_db
+from app.core.database import DBSession, get_read_session, get_session
+from app.core.rate_limit import rate_limit
+from app.core.responses import conditional_response, model_response
 from app.core.security.base import SecurityBase
-from app.schemas.user import UserCreate, Token, UserInDBBase, ForgotPassword, ResetPassword, VerifyResetToken
-from app.models.user import User
+from app.schemas.user import (
+    UserCreate,
+    Token,
+    UserInDBBase,
+    ForgotPassword,
+    ResetPassword,
+    VerifyResetToken,
+    RefreshTokenRequest,
+    Message,
+)
 from app.services.auth import (
-    authenticate_user,
-    create_user,
+    authenticate_user_async,
+    create_user_async,
     get_current_active_user,
-    create_access_token,
-    get_user_by_email,
-    get_password_hash,
-    generate_reset_token,
-    verify_reset_token,
-    clear_reset_token
+    get_active_user_async,
+    create_tokens,
+    create_token_family_async,
+    rotate_token_family_async,
+    revoke_token_family_async,
+    oauth2_scheme,
+    user_token_claims,
+    user_etag,
+    get_user_by_email_async,
+    get_password_hash_async,
+    generate_reset_token_async,
+    request_password_reset_async,
+    verify_reset_token_async,
+    complete_password_reset_async,
 )
-from app.services.email import send_reset_password_email
+from app.services.email import queue_reset_password_email
+from app.services.token_revocation import revoke_token_async
+from config.config import settings
 
-# Configuração do logger
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 security_base = SecurityBase()
 
-@router.post("/register", response_model=UserInDBBase)
-def register(
+# Respostas fixas, montadas uma única vez
+RESET_REQUESTED = Message(message="Se o email existir, você receberá instruções para redefinir sua senha")
+PASSWORD_UPDATED = Message(message="Senha atualizada com sucesso")
+TOKEN_VALID = Message(message="Token válido")
+LOGGED_OUT = Message(message="Sessão encerrada")
+
+# Recusam o excesso antes de abrir sessão no banco ou calcular hash de senha
+login_rate_limit = rate_limit("login", settings.RATE_LIMIT_LOGIN_IP, settings.RATE_LIMIT_LOGIN_EMAIL)
+register_rate_limit = rate_limit("register", settings.RATE_LIMIT_REGISTER_IP)
+forgot_password_rate_limit = rate_limit(
+    "forgot_password", settings.RATE_LIMIT_FORGOT_PASSWORD_IP, settings.RATE_LIMIT_FORGOT_PASSWORD_EMAIL
+)
+
+@router.post("/register", response_model=UserInDBBase, dependencies=[Depends(register_rate_limit)])
+async def register(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
     user_in: UserCreate,
 ) -> Any:
     """
@@ -41,7 +71,7 @@ def register(
     """
     logger.info(f"Tentativa de registro para email: {user_in.email}")
     
-    user = get_user_by_email(db, user_in.email)
+    user = await get_user_by_email_async(db, user_in.email)
     if user:
         logger.warning(f"Email já registrado: {user_in.email}")
         raise HTTPException(
@@ -50,19 +80,19 @@ def register(
         )
     
     logger.info(f"Criando novo usuário: {user_in.email}")
-    user = create_user(db, user_in)
+    user = await create_user_async(db, user_in)
     logger.info(f"Usuário criado com sucesso: {user_in.email}")
     return user
 
-@router.post("/login", response_model=Token)
-def login(
-    db: Session = Depends(get_db),
+@router.post("/login", response_model=Token, dependencies=[Depends(login_rate_limit)])
+async def login(
+    db: DBSession = Depends(get_session),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     Login para obter token de acesso.
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -75,93 +105,153 @@ def login(
             detail="Usuário inativo",
         )
     
+    family = await create_token_family_async(db, user)
     access_token_expires = timedelta(minutes=security_base.access_token_expire_minutes)
-    return create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
+    return model_response(create_tokens(user_token_claims(user), family, expires_delta=access_token_expires))
+
+@router.post("/refresh", response_model=Token)
+async def refresh(
+    *,
+    db: DBSession = Depends(get_session),
+    refresh_in: RefreshTokenRequest,
+) -> Any:
+    """
+    Troca um refresh token válido por um novo par de tokens (rotação).
+
+    Custa a verificação da assinatura e um UPDATE pela chave primária da
+    família, sem hash de senha. Reapresentar um refresh token já trocado
+    revoga a sessão inteira.
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token de atualização inválido",
+        headers={"WWW-Authenticate": "Bearer"},
     )
+    payload = security_base.verify_refresh_token(refresh_in.refresh_token)
+    try:
+        user_id = int(payload["sub"])
+        family_id = str(payload["fam"])
+        generation = int(payload["gen"])
+    except (KeyError, TypeError, ValueError):
+        raise invalid
+    family = await rotate_token_family_async(db, family_id, generation)
+    if family is None or family.user_id != user_id:
+        raise invalid
+    user = await get_active_user_async(db, user_id)
+    if user is None:
+        raise invalid
+    access_token_expires = timedelta(minutes=security_base.access_token_expire_minutes)
+    return model_response(create_tokens(user_token_claims(user), family, expires_delta=access_token_expires))
+
+@router.post("/logout", response_model=Message)
+async def logout(
+    *,
+    db: DBSession = Depends(get_session),
+    token: str = Depends(oauth2_scheme),
+    refresh_in: Optional[RefreshTokenRequest] = None,
+) -> Any:
+    """
+    Revoga o access token apresentado e, se enviado, encerra a sessão do
+    refresh token.
+    """
+    payload = security_base.verify_token(token)
+    await revoke_token_async(db, payload)
+    if refresh_in is not None:
+        refresh_payload = security_base.verify_refresh_token(refresh_in.refresh_token)
+        if refresh_payload.get("sub") == payload.get("sub") and refresh_payload.get("fam"):
+            await revoke_token_family_async(db, str(refresh_payload["fam"]))
+    return model_response(LOGGED_OUT)
 
 @router.get("/me", response_model=UserInDBBase)
-def read_users_me(
-    current_user: User = Depends(get_current_active_user),
+async def read_users_me(
+    request: Request,
+    current_user: UserInDBBase = Depends(get_current_active_user),
 ) -> Any:
     """
     Obtém informações do usuário atual.
+
+    Responde 304 sem corpo quando o If-None-Match traz o ETag da versão
+    atual do usuário; com o usuário em cache, não há acesso ao banco.
     """
-    return current_user
+    return conditional_response(request, user_etag(current_user), current_user)
 
-@router.post("/forgot-password")
+@router.post("/forgot-password", response_model=Message, dependencies=[Depends(forgot_password_rate_limit)])
 async def forgot_password(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
     forgot_password_in: ForgotPassword,
 ) -> Any:
     """
     Inicia o processo de recuperação de senha.
     """
-    user = get_user_by_email(db, forgot_password_in.email)
+    user = await get_user_by_email_async(db, forgot_password_in.email)
     if not user:
         # Por segurança, não informamos se o email existe ou não
-        return {
-            "message": "Se o email existir, você receberá instruções para redefinir sua senha"
-        }
+        return model_response(RESET_REQUESTED)
     
+    frontend_url = os.getenv("FRONTEND_URL", "http://localhost:4200")
+    if settings.EMAIL_DELIVERY == "outbox":
+        # Token e e-mail gravados na mesma transação; o dispatcher faz o envio
+        await request_password_reset_async(db, user, frontend_url)
+        logger.info(f"E-mail de reset registrado na outbox para {user.email}")
+        return model_response(RESET_REQUESTED)
+
     # Gera o token de reset
-    reset_token = generate_reset_token(db, user)
+    reset_token = await generate_reset_token_async(db, user)
     
-    # Envia o e-mail com o link de reset
-    frontend_url = os.getenv("FRONTEND_URL", "http://localhost:4200")
-    email_sent = await send_reset_password_email(user.email, reset_token, frontend_url)
+    # Enfileira o e-mail com o link de reset; o envio ocorre em segundo plano
+    email_queued = queue_reset_password_email(user.email, reset_token, frontend_url)
     
-    if not email_sent:
-        logger.error(f"Falha ao enviar e-mail de reset para {user.email}")
+    if not email_queued:
+        logger.error(f"Falha ao enfileirar e-mail de reset para {user.email}")
         # Não informamos o erro ao usuário por segurança
-        return {
-            "message": "Se o email existir, você receberá instruções para redefinir sua senha"
-        }
+        return model_response(RESET_REQUESTED)
     
-    logger.info(f"E-mail de reset enviado com sucesso para {user.email}")
-    return {
-        "message": "Se o email existir, você receberá instruções para redefinir sua senha"
-    }
+    logger.info(f"E-mail de reset enfileirado para {user.email}")
+    return model_response(RESET_REQUESTED)
 
-@router.post("/reset-password")
-def reset_password(
+@router.post("/reset-password", response_model=Message)
+async def reset_password(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
     reset_password_in: ResetPassword,
 ) -> Any:
     """
     Redefine a senha do usuário usando o token de reset.
     """
-    user = verify_reset_token(db, reset_password_in.token)
+    user = await verify_reset_token_async(db, reset_password_in.token)
     if not user:
         raise HTTPException(
             status_code=400,
             detail="Token inválido ou expirado",
         )
     
-    # Atualiza a senha
-    user.hashed_password = get_password_hash(reset_password_in.new_password)
-    
-    # Limpa o token após a senha ser alterada
-    clear_reset_token(db, user)
+    hashed_password = await get_password_hash_async(reset_password_in.new_password)
+    # Nova senha, token de reset apagado e tokens/sessões anteriores
+    # revogados em todos os workers, tudo em um único commit
+    if not await complete_password_reset_async(db, user, hashed_password):
+        # Outra requisição alterou o usuário (e consumiu o token) antes
+        raise HTTPException(
+            status_code=400,
+            detail="Token inválido ou expirado",
+        )
     
-    return {"message": "Senha atualizada com sucesso"}
+    return model_response(PASSWORD_UPDATED)
 
-@router.post("/verify-reset-token")
-def verify_reset_token_endpoint(
+@router.post("/verify-reset-token", response_model=Message)
+async def verify_reset_token_endpoint(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_read_session),
     token_data: VerifyResetToken,
 ) -> Any:
     """
     Verifica se um token de reset é válido.
     """
-    user = verify_reset_token(db, token_data.token)
+    user = await verify_reset_token_async(db, token_data.token)
     if not user:
         raise HTTPException(
             status_code=400,
             detail="Token inválido ou expirado",
         )
     
-    return {"message": "Token válido"} 
\ No newline at end of file
+    return model_response(TOKEN_VALID) 
\ No newline at end of file
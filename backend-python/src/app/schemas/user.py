@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 
 class UserBase(BaseModel):
@@ -11,6 +11,16 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
 
+class UserImport(UserBase):
+    """
+    Linha da importação em massa: senha em texto (será transformada em hash)
+    ou hash já gerado em um formato suportado pelo passlib.
+    """
+    password: Optional[str] = None
+    hashed_password: Optional[str] = None
+    is_active: bool = True
+    is_superuser: bool = False
+
 class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     username: Optional[str] = None
@@ -24,6 +34,8 @@ class UserInDBBase(UserBase):
     id: Optional[int] = None
     is_active: bool = True
     is_superuser: bool = False
+    # Usada apenas no ETag; fora do corpo das respostas
+    version: int = Field(default=0, exclude=True)
 
     class Config:
         from_attributes = True
@@ -39,6 +51,9 @@ class Token(BaseModel):
     token_type: str
     refresh_token: str
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
 class TokenPayload(BaseModel):
     sub: Optional[int] = None
 
@@ -50,4 +65,7 @@ class ResetPassword(BaseModel):
     new_password: str
 
 class VerifyResetToken(BaseModel):
-    token: str 
\ No newline at end of file
+    token: str
+
+class Message(BaseModel):
+    message: str 
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Servidor de produção da API.
+
+    python -m app.serve
+
+Usa o gunicorn como gerenciador de processos com workers uvicorn (uvloop e
+httptools quando instalados). A aplicação é importada uma vez no processo
+mestre (preload) e os workers são criados por fork, compartilhando os
+módulos já importados por copy-on-write. No SIGTERM o gunicorn para de
+aceitar conexões e aguarda as requisições em andamento por até
+SERVER_GRACEFUL_TIMEOUT segundos antes de encerrar os workers.
+
+Sem o gunicorn (ex.: Windows) o próprio uvicorn gerencia os workers.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Optional
+
+from app.core.workers import available_cpus
+from config.config import settings
+
+APP = "app.services.main:app"
+
+def worker_count() -> int:
+    return settings.SERVER_WORKERS or available_cpus()
+
+def uvicorn_options() -> Dict[str, Any]:
+    """
+    Opções do uvicorn comuns ao worker do gunicorn e ao modo sem gunicorn.
+    """
+    return {
+        "loop": "auto",
+        "http": "auto",
+        "limit_concurrency": settings.SERVER_LIMIT_CONCURRENCY,
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_TIMEOUT,
+        "proxy_headers": True,
+        "server_header": False,
+    }
+
+try:
+    from gunicorn.app.base import BaseApplication
+    from uvicorn_worker import UvicornWorker
+except ImportError:
+    BaseApplication = None
+else:
+    class ProductionWorker(UvicornWorker):
+        """
+        Worker uvicorn com as opções de Settings que o gunicorn não repassa.
+        """
+
+        CONFIG_KWARGS = {
+            key: value
+            for key, value in uvicorn_options().items()
+            if key != "timeout_graceful_shutdown"
+        }
+
+    class ProductionServer(BaseApplication):
+        """
+        Aplicação gunicorn configurada a partir de Settings, sem arquivo de
+        configuração.
+        """
+
+        def __init__(self, options: Dict[str, Any]):
+            self.options = options
+            super().__init__()
+
+        def load_config(self) -> None:
+            for key, value in self.options.items():
+                if value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            from app.services.main import app
+            return app
+
+    def child_exit(server, worker) -> None:
+        # Remove os gauges do worker encerrado (métricas em modo multiprocesso)
+        from app.core.metrics import mark_process_dead
+        mark_process_dead(worker.pid)
+
+def gunicorn_options() -> Dict[str, Any]:
+    return {
+        "bind": f"{settings.SERVER_HOST}:{settings.SERVER_PORT}",
+        "workers": worker_count(),
+        "worker_class": "app.serve.ProductionWorker",
+        "preload_app": settings.SERVER_PRELOAD,
+        "keepalive": settings.SERVER_KEEPALIVE,
+        "backlog": settings.SERVER_BACKLOG,
+        "timeout": settings.SERVER_TIMEOUT,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+        "forwarded_allow_ips": settings.SERVER_FORWARDED_ALLOW_IPS,
+        "child_exit": child_exit,
+        "accesslog": None,
+        "errorlog": "-",
+        "loglevel": settings.LOG_LEVEL.lower(),
+    }
+
+def run_uvicorn(workers: Optional[int] = None, reload: bool = False) -> None:
+    import uvicorn
+    uvicorn.run(
+        APP,
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=None if reload else workers,
+        reload=reload,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE,
+        limit_max_requests=settings.SERVER_MAX_REQUESTS or None,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+        access_log=False,
+        **uvicorn_options(),
+    )
+
+def prepare_metrics_dir(workers: int) -> None:
+    """
+    Prepara o diretório das métricas multiprocesso antes de a aplicação (e o
+    prometheus_client) ser importada.
+
+    Um PROMETHEUS_MULTIPROC_DIR informado é esvaziado, pois arquivos de uma
+    execução anterior seriam somados aos atuais. Sem ele e com mais de um
+    worker, é criado um diretório temporário, apagado ao encerrar; sem
+    isso o /metrics mostraria apenas o worker que atendeu o scrape.
+    """
+    if not settings.METRICS_ENABLED:
+        return
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.endswith(".db"):
+                os.remove(os.path.join(directory, name))
+    elif workers > 1:
+        directory = tempfile.mkdtemp(prefix="prometheus-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+        atexit.register(shutil.rmtree, directory, ignore_errors=True)
+
+def main() -> None:
+    """
+    Inicia o servidor; com SERVER_RELOAD sobe um único processo com
+    recarga automática, apenas para desenvolvimento.
+    """
+    # Lido pela aplicação (app.core.workers) para dividir entre os workers
+    # os limites definidos para o servidor inteiro
+    workers = 1 if settings.SERVER_RELOAD else worker_count()
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    prepare_metrics_dir(workers)
+    if settings.SERVER_RELOAD:
+        run_uvicorn(reload=True)
+    elif BaseApplication is None:
+        run_uvicorn(workers=workers)
+    else:
+        ProductionServer(gunicorn_options()).run()
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,153 @@
+import asyncio
 from datetime import datetime, timedelta
-from typing import Optional
-from fastapi import Depends, HTTPException, status
+from typing import Optional, Set
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from jose import JWTError
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.exc import StaleDataError
 import logging
-import secrets
+import time
 
+from app.core.cache import TTLCache
+from app.core.metrics import PASSWORD_REHASH
+from app.core.responses import entity_tag
 from app.core.security.base import SecurityBase
-from app.core.database import get_db
+from app.core.security.hashing import (
+    check_password,
+    hash_password,
+    password_hasher,
+    password_needs_update,
+)
+from app.core.database import (
+    AsyncSessionLocal,
+    DBSession,
+    SessionLocal,
+    get_read_session,
+    pin_primary,
+    run_db,
+    run_read,
+    run_read_your_writes,
+)
 from app.models.user import User
-from app.schemas.user import UserCreate, Token, TokenPayload
+from app.services.outbox import RESET_PASSWORD, add_to_outbox
+from app.services.password_reset_tokens import add_reset_token, delete_user_reset_tokens, find_reset_token_user
+from app.services.token_families import (
+    FamilyState,
+    create_family,
+    mark_user_families_revoked,
+    revoke_family,
+    rotate_family,
+)
+from app.services.token_revocation import (
+    add_user_revocation,
+    notify_user_changed,
+    revocation_sync,
+    user_revocation_committed,
+)
+from app.schemas.user import UserCreate, UserInDBBase, Token, TokenPayload
+from config.config import settings
 
-# Configuração do logger
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 security_base = SecurityBase()
 
+# Dados do usuário autenticado por id, para evitar uma consulta por requisição
+user_cache: TTLCache[UserInDBBase] = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+
+def invalidate_user_cache(user_id: int) -> None:
+    """
+    Remove o usuário do cache local (cadastro, reset de senha, desativação).
+    """
+    user_cache.delete(user_id)
+
+# Alterações vindas dos demais workers (LISTEN/NOTIFY no Postgres)
+revocation_sync.on_user_changed(invalidate_user_cache)
+
+# Chave em Session.info com os ids de usuários alterados na transação
+_CHANGED_USERS = "changed_user_ids"
+
+def _user_changed(db: Session, connection, user_id: int) -> None:
+    """
+    Registra a alteração do usuário na transação corrente. O cache local é
+    invalidado só no commit: invalidar no flush deixaria outra requisição
+    recarregar os dados antigos antes de a transação terminar.
+    """
+    db.info.setdefault(_CHANGED_USERS, set()).add(user_id)
+    notify_user_changed(connection, user_id)
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_user_change(mapper, connection, target: User) -> None:
+    db = object_session(target)
+    if db is not None and target.id is not None:
+        _user_changed(db, connection, target.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(db: Session) -> None:
+    for user_id in db.info.pop(_CHANGED_USERS, ()):
+        invalidate_user_cache(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_changes(db: Session) -> None:
+    db.info.pop(_CHANGED_USERS, None)
+
+def user_token_claims(user: User) -> dict:
+    """
+    Monta as claims do token; com AUTH_TOKEN_USER_CLAIMS inclui os dados
+    necessários para autenticar sem consultar o banco.
+    """
+    claims = {"sub": str(user.id)}
+    if settings.AUTH_TOKEN_USER_CLAIMS:
+        claims.update({
+            "email": user.email,
+            "username": user.username,
+            "is_active": bool(user.is_active),
+            "is_superuser": bool(user.is_superuser),
+            "ver": user.version,
+        })
+    return claims
+
+def user_from_claims(payload: dict) -> Optional[UserInDBBase]:
+    """
+    Reconstrói o usuário a partir das claims do token, se estiverem presentes.
+    """
+    if "email" not in payload or "is_active" not in payload:
+        return None
+    return UserInDBBase(
+        id=int(payload["sub"]),
+        email=payload["email"],
+        username=payload["username"],
+        is_active=payload["is_active"],
+        is_superuser=payload.get("is_superuser", False),
+        version=payload.get("ver", 0),
+    )
+
+def user_etag(user: UserInDBBase) -> str:
+    """
+    ETag da representação do usuário: muda sempre que a linha é alterada.
+    """
+    return entity_tag("u", user.id, user.version)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return check_password(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return hash_password(password)
+
+# O bcrypt consome CPU por centenas de ms: roda no executor dedicado,
+# que recusa com 503 quando a fila está cheia
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.hash(password)
 
 def get_user(db: Session, user_id: int) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
@@ -33,16 +155,94 @@ def get_user(db: Session, user_id: int) -> Optional[User]:
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    user = get_user_by_email(db, email)
+async def get_user_async(db: DBSession, user_id: int) -> Optional[User]:
+    # Chamada só com o id de um token válido: o usuário deve existir
+    return await run_read_your_writes(db, get_user, user_id)
+
+async def get_user_by_email_async(db: DBSession, email: str) -> Optional[User]:
+    return await run_read(db, get_user_by_email, email)
+
+def replace_password_hash(db: Session, user_id: int, old_hash: str, new_hash: str) -> bool:
+    """
+    Troca o hash da senha apenas se ele ainda for o mesmo lido no login,
+    para não sobrescrever uma troca de senha concorrente.
+
+    Não incrementa users.version: o hash não faz parte da representação do
+    usuário (o ETag não muda), e um incremento fora do ORM faria uma troca
+    de senha concorrente falhar com StaleDataError.
+
+    Returns:
+        bool: True se o hash foi atualizado
+    """
+    result = db.execute(
+        update(User)
+        .where(User.id == user_id, User.hashed_password == old_hash)
+        .values(hashed_password=new_hash)
+    )
+    # UPDATE fora do ORM: os eventos de after_update não disparam
+    if result.rowcount == 1:
+        _user_changed(db, db.connection(), user_id)
+    db.commit()
+    return result.rowcount == 1
+
+# Rehashes agendados após o login; a referência evita que a task seja coletada
+_rehash_tasks: Set[asyncio.Task] = set()
+
+async def _rehash_password(user_id: int, old_hash: str, password: str) -> None:
+    try:
+        new_hash = await password_hasher.hash(password)
+        if AsyncSessionLocal is not None:
+            async with AsyncSessionLocal() as db:
+                updated = await run_db(db, replace_password_hash, user_id, old_hash, new_hash)
+        else:
+            db = SessionLocal()
+            try:
+                updated = await run_db(db, replace_password_hash, user_id, old_hash, new_hash)
+            finally:
+                db.close()
+    except Exception as e:
+        # Executor cheio ou banco indisponível: tenta de novo no próximo login
+        PASSWORD_REHASH.labels("failed").inc()
+        logger.warning(f"Falha ao atualizar o hash da senha do usuário {user_id}: {e}")
+        return
+    PASSWORD_REHASH.labels("updated" if updated else "skipped").inc()
+
+def schedule_rehash(user: User, password: str) -> None:
+    """
+    Agenda a atualização do hash da senha para o perfil atual, fora do
+    caminho da requisição: o login responde sem esperar o novo hash.
+    """
+    task = asyncio.get_running_loop().create_task(
+        _rehash_password(user.id, user.hashed_password, password)
+    )
+    _rehash_tasks.add(task)
+    task.add_done_callback(_rehash_tasks.discard)
+
+async def wait_for_rehashes(timeout: float = 5.0) -> None:
+    """
+    Aguarda os rehashes pendentes no encerramento do worker.
+    """
+    if _rehash_tasks:
+        await asyncio.wait(set(_rehash_tasks), timeout=timeout)
+
+async def authenticate_user_async(db: DBSession, email: str, password: str) -> Optional[User]:
+    user = await get_user_by_email_async(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None
+    if settings.PASSWORD_REHASH_ON_LOGIN and password_needs_update(user.hashed_password):
+        schedule_rehash(user, password)
     return user
 
 def create_user(db: Session, user_in: UserCreate) -> User:
     hashed_password = get_password_hash(user_in.password)
+    return add_user(db, user_in, hashed_password)
+
+def add_user(db: Session, user_in: UserCreate, hashed_password: str) -> User:
+    """
+    Persiste um novo usuário com a senha já transformada em hash.
+    """
     db_user = User(
         email=user_in.email,
         username=user_in.username,
@@ -53,42 +253,102 @@ def create_user(db: Session, user_in: UserCreate) -> User:
     db.refresh(db_user)
     return db_user
 
+async def create_user_async(db: DBSession, user_in: UserCreate) -> User:
+    hashed_password = await get_password_hash_async(user_in.password)
+    return await run_db(db, add_user, user_in, hashed_password)
+
+async def create_token_family_async(db: DBSession, user: User) -> FamilyState:
+    return await run_db(db, create_family, user.id)
+
+async def rotate_token_family_async(db: DBSession, family_id: str, generation: int) -> Optional[FamilyState]:
+    return await run_db(db, rotate_family, family_id, generation)
+
+async def revoke_token_family_async(db: DBSession, family_id: str) -> None:
+    await run_db(db, revoke_family, family_id)
+
+async def get_active_user_async(db: DBSession, user_id: int) -> Optional[UserInDBBase]:
+    """
+    Dados do usuário pelo cache ou por uma consulta pela chave primária;
+    None se não existir ou estiver inativo.
+    """
+    user = user_cache.get(user_id)
+    if user is None:
+        db_user = await get_user_async(db, user_id)
+        if db_user is None:
+            return None
+        user = UserInDBBase.model_validate(db_user)
+        user_cache.set(user_id, user)
+    return user if user.is_active else None
+
 def generate_reset_token(db: Session, user: User) -> str:
     """
-    Gera um token único para reset de senha e o salva no banco de dados.
+    Gera um token único para reset de senha e salva o seu hash no banco de dados.
+    """
+    token = add_reset_token(db, user.id)
+    db.commit()
+    return token
+
+async def generate_reset_token_async(db: DBSession, user: User) -> str:
+    return await run_db(db, generate_reset_token, user)
+
+def request_password_reset(db: Session, user: User, frontend_url: str) -> str:
+    """
+    Gera o token de reset e registra o e-mail na outbox em um único commit.
     """
-    token = secrets.token_urlsafe(32)
-    user.reset_token = token
-    user.reset_token_expires = datetime.utcnow() + timedelta(hours=24)
+    token = add_reset_token(db, user.id)
+    add_to_outbox(db, RESET_PASSWORD, user.email, {"token": token, "frontend_url": frontend_url})
     db.commit()
     return token
 
+async def request_password_reset_async(db: DBSession, user: User, frontend_url: str) -> str:
+    return await run_db(db, request_password_reset, user, frontend_url)
+
 def verify_reset_token(db: Session, token: str) -> Optional[User]:
     """
     Verifica se um token de reset é válido e retorna o usuário associado.
     """
-    user = db.query(User).filter(
-        User.reset_token == token,
-        User.reset_token_expires > datetime.utcnow()
-    ).first()
-    
-    if not user:
-        return None
-    
-    return user
+    return find_reset_token_user(db, token)
 
-def clear_reset_token(db: Session, user: User) -> None:
+async def verify_reset_token_async(db: DBSession, token: str) -> Optional[User]:
+    # Sem nova tentativa no primário: o token vem do cliente. Um token
+    # recém-criado ainda não replicado é recusado, mas o link chega por
+    # e-mail, bem depois do atraso típico de replicação
+    return await run_read(db, verify_reset_token, token)
+
+def complete_password_reset(db: Session, user: User, hashed_password: str) -> bool:
     """
-    Limpa o token de reset após a senha ser alterada.
+    Troca a senha e invalida o acesso anterior em uma única transação:
+    novo hash, remoção dos tokens de reset, corte dos tokens JWT emitidos
+    até agora e revogação das sessões de refresh. Se algo falhar, nada é
+    gravado e o mesmo token de reset pode ser usado de novo.
+
+    A notificação aos demais workers sai no commit, e a cópia em memória
+    deste worker só é atualizada depois dele.
+
+    Returns:
+        bool: False se o usuário foi alterado por outra transação desde a
+        leitura (users.version); nesse caso nada é gravado
     """
-    user.reset_token = None
-    user.reset_token_expires = None
-    db.commit()
+    user.hashed_password = hashed_password
+    delete_user_reset_tokens(db, user.id)
+    before = add_user_revocation(db, user.id)
+    mark_user_families_revoked(db, user.id)
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        return False
+    user_revocation_committed(user.id, before)
+    return True
+
+async def complete_password_reset_async(db: DBSession, user: User, hashed_password: str) -> bool:
+    return await run_db(db, complete_password_reset, user, hashed_password)
 
 async def get_current_user(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: DBSession = Depends(get_read_session),
     token: str = Depends(oauth2_scheme)
-) -> User:
+) -> UserInDBBase:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Credenciais inválidas",
@@ -96,35 +356,70 @@ async def get_current_user(
     )
     try:
         payload = security_base.verify_token(token)
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+        user_id = int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
         raise credentials_exception
-    
-    user = get_user(db, user_id)
-    if user is None:
+    if payload.get("typ") == "refresh":
+        # Refresh tokens só valem em /auth/refresh
         raise credentials_exception
+    # Disponível para o log de acesso
+    request.state.user_id = user_id
+
+    if settings.AUTH_TOKEN_USER_CLAIMS:
+        user = user_from_claims(payload)
+        if user is not None:
+            return user
+
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    iat = payload.get("iat")
+    if isinstance(iat, (int, float)) and time.time() - iat < settings.DB_REPLICA_STICKY_SECONDS:
+        # Heurística: a idade do token é usada como aproximação do atraso de
+        # replicação. Um token recém-emitido (ex.: logo após cadastro ou
+        # reset) pode preceder a chegada das escritas à réplica, então lê do
+        # primário por DB_REPLICA_STICKY_SECONDS. Não mede o atraso real; se
+        # a réplica atrasar mais que isso, a busca pelo id ainda recorre ao
+        # primário quando não encontra o usuário (run_read_your_writes), mas
+        # outras colunas podem vir desatualizadas até a replicação alcançar
+        pin_primary(db)
+    db_user = await get_user_async(db, user_id)
+    if db_user is None:
+        raise credentials_exception
+    user = UserInDBBase.model_validate(db_user)
+    user_cache.set(user_id, user)
     return user
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: UserInDBBase = Depends(get_current_user),
+) -> UserInDBBase:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Usuário inativo")
     return current_user
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> Token:
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    access_token = security_base.create_access_token(to_encode)
-    refresh_token = security_base.create_refresh_token(to_encode)
+async def get_current_superuser(
+    current_user: UserInDBBase = Depends(get_current_active_user),
+) -> UserInDBBase:
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso restrito a administradores")
+    return current_user
+
+def create_tokens(data: dict, family: FamilyState, expires_delta: Optional[timedelta] = None) -> Token:
+    """
+    Emite o par de tokens: o access token com as claims do usuário e o
+    refresh token apontando para a família e a geração atual. O refresh
+    token nunca passa do limite da família.
+    """
+    access_token = security_base.create_access_token({**data, "typ": "access"}, expires_delta)
+    now = datetime.utcnow()
+    refresh_expires = min(now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS), family.expires_at)
+    refresh_token = security_base.create_refresh_token(
+        {"sub": data["sub"], "fam": family.id, "gen": family.generation},
+        refresh_expires - now,
+    )
     return Token(
         access_token=access_token,
         token_type="bearer",
         refresh_token=refresh_token
-    ) 
\ No newline at end of file
+    )
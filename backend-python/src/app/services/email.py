@@ -1,16 +1,25 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
+import logging
+from email.message import Message
+from functools import lru_cache
 from pydantic import EmailStr
-from typing import List
-import os
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING, Optional
 
-# Carrega as variáveis de ambiente do arquivo .env
-load_dotenv()
+from app.services.email_templates import build_email_message, get_email_templates
+from app.services.mailer import mail_queue
+from config.config import settings
 
-def get_email_config() -> ConnectionConfig:
+if TYPE_CHECKING:
+    from fastapi_mail import ConnectionConfig
+
+logger = logging.getLogger(__name__)
+
+def get_email_config() -> "ConnectionConfig":
     """
-    Obtém a configuração do e-mail a partir das variáveis de ambiente.
+    Obtém a configuração do e-mail a partir das configurações (MAIL_*).
     """
+    # O fastapi_mail é pesado de importar; só é carregado quando há envio
+    from fastapi_mail import ConnectionConfig
+
     # Validação das variáveis de ambiente
     required_vars = [
         "MAIL_USERNAME",
@@ -19,71 +28,65 @@ def get_email_config() -> ConnectionConfig:
         "MAIL_SERVER"
     ]
     
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
+    missing_vars = [var for var in required_vars if not getattr(settings, var)]
     if missing_vars:
         raise ValueError(f"Variáveis de ambiente faltando: {', '.join(missing_vars)}")
     
     return ConnectionConfig(
-        MAIL_USERNAME=os.getenv("MAIL_USERNAME"),
-        MAIL_PASSWORD=os.getenv("MAIL_PASSWORD"),
-        MAIL_FROM=os.getenv("MAIL_FROM"),
-        MAIL_PORT=int(os.getenv("MAIL_PORT", "587")),
-        MAIL_SERVER=os.getenv("MAIL_SERVER"),
-        MAIL_STARTTLS=True,
+        MAIL_USERNAME=settings.MAIL_USERNAME,
+        MAIL_PASSWORD=settings.MAIL_PASSWORD,
+        MAIL_FROM=settings.MAIL_FROM,
+        MAIL_PORT=settings.MAIL_PORT,
+        MAIL_SERVER=settings.MAIL_SERVER,
+        MAIL_STARTTLS=settings.MAIL_STARTTLS,
         MAIL_SSL_TLS=False,
-        USE_CREDENTIALS=True,
+        USE_CREDENTIALS=settings.MAIL_USE_CREDENTIALS,
         VALIDATE_CERTS=True
     )
 
-# Configuração do FastMail
-try:
-    conf = get_email_config()
-except ValueError as e:
-    print(f"Erro na configuração de e-mail: {str(e)}")
-    conf = None
+@lru_cache()
+def get_mail_conf() -> Optional["ConnectionConfig"]:
+    """
+    Configuração do FastMail, montada no primeiro uso.
 
-async def send_reset_password_email(email: EmailStr, token: str, frontend_url: str) -> bool:
+    Returns:
+        Optional[ConnectionConfig]: None se o e-mail não estiver configurado
     """
-    Envia um e-mail com o link para reset de senha.
-    
+    try:
+        return get_email_config()
+    except ValueError as e:
+        logger.error(f"Erro na configuração de e-mail: {e}")
+        return None
+
+def build_reset_password_message(email: EmailStr, token: str, frontend_url: str, locale: Optional[str] = None) -> Message:
+    """
+    Monta a mensagem com o link para reset de senha.
+
     Args:
         email: Email do usuário
         token: Token de reset de senha
         frontend_url: URL base do frontend
-        
+        locale: Idioma do template; usa EMAIL_DEFAULT_LOCALE se ausente
+
     Returns:
-        bool: True se o e-mail foi enviado com sucesso, False caso contrário
+        Message: Mensagem pronta para envio
+    """
+    rendered = get_email_templates().render(
+        "reset_password",
+        locale,
+        reset_link=f"{frontend_url}/reset-password?token={token}",
+        expires_hours=24,
+    )
+    return build_email_message(get_mail_conf().MAIL_FROM, email, rendered)
+
+def queue_reset_password_email(email: EmailStr, token: str, frontend_url: str) -> bool:
     """
-    if not conf:
-        print("Configuração de e-mail não disponível")
+    Enfileira o e-mail de reset de senha para envio em segundo plano.
+
+    Returns:
+        bool: True se a mensagem foi aceita pela fila, False caso contrário
+    """
+    if not get_mail_conf():
+        logger.warning("Configuração de e-mail não disponível")
         return False
-        
-    try:
-        reset_link = f"{frontend_url}/reset-password?token={token}"
-        
-        message = MessageSchema(
-            subject="Recuperação de Senha",
-            recipients=[email],
-            body=f"""
-            <html>
-                <body>
-                    <h2>Recuperação de Senha</h2>
-                    <p>Olá,</p>
-                    <p>Você solicitou a recuperação de senha da sua conta. Clique no link abaixo para redefinir sua senha:</p>
-                    <p><a href="{reset_link}">Redefinir Senha</a></p>
-                    <p>Se você não solicitou esta recuperação de senha, por favor ignore este e-mail.</p>
-                    <p>Este link expira em 24 horas.</p>
-                    <p>Atenciosamente,<br>Equipe do Sistema</p>
-                </body>
-            </html>
-            """,
-            subtype="html"
-        )
-        
-        fm = FastMail(conf)
-        await fm.send_message(message)
-        return True
-        
-    except Exception as e:
-        print(f"Erro ao enviar e-mail: {str(e)}")
-        return False 
\ No newline at end of file
+    return mail_queue.enqueue(build_reset_password_message(email, token, frontend_url))
@@ -0,0 +1,133 @@
+import os
+from email.header import Header
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, NamedTuple, Optional, Tuple, Union
+
+from config.config import settings
+
+if TYPE_CHECKING:
+    from jinja2 import Template
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "email")
+
+class RenderedEmail(NamedTuple):
+    subject: str
+    html: str
+    text: str
+
+# Partes sem variáveis são renderizadas uma vez e guardadas como texto
+TemplatePart = Union["Template", str]
+
+class EmailTemplate(NamedTuple):
+    subject: TemplatePart
+    html: TemplatePart
+    text: TemplatePart
+
+class EmailTemplates:
+    """
+    Templates de e-mail compilados uma única vez por processo.
+
+    Os arquivos ficam em templates/email/<locale>/<nome>.{subject,html,txt}.
+    O Jinja2 compila cada template para código Python em que as partes
+    estáticas são constantes, então renderizar custa apenas a interpolação
+    das variáveis; partes sem nenhuma variável (como o assunto) são
+    renderizadas já no carregamento. Locales sem a variante pedida usam
+    EMAIL_DEFAULT_LOCALE.
+    """
+
+    def __init__(self, directory: str = TEMPLATES_DIR, default_locale: str = "pt_BR"):
+        from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+
+        self.default_locale = default_locale
+        self.environment = Environment(
+            loader=FileSystemLoader(directory),
+            autoescape=select_autoescape(enabled_extensions=("html",), default_for_string=False),
+            undefined=StrictUndefined,
+            auto_reload=False,
+            keep_trailing_newline=False,
+        )
+        self._templates: Dict[Tuple[str, str], EmailTemplate] = {}
+        self.preload()
+
+    def preload(self) -> None:
+        """
+        Compila todos os templates encontrados no diretório.
+        """
+        for name in self.environment.list_templates(extensions=["subject"]):
+            locale, filename = name.split("/", 1)
+            kind = filename[: -len(".subject")]
+            self._templates[(kind, locale)] = EmailTemplate(
+                subject=self._load(f"{locale}/{kind}.subject"),
+                html=self._load(f"{locale}/{kind}.html"),
+                text=self._load(f"{locale}/{kind}.txt"),
+            )
+
+    def _load(self, name: str) -> TemplatePart:
+        from jinja2 import meta
+
+        source = self.environment.loader.get_source(self.environment, name)[0]
+        template = self.environment.get_template(name)
+        if not meta.find_undeclared_variables(self.environment.parse(source)):
+            return template.render()
+        return template
+
+    def get(self, kind: str, locale: Optional[str] = None) -> EmailTemplate:
+        template = self._templates.get((kind, locale or self.default_locale))
+        if template is None:
+            template = self._templates[(kind, self.default_locale)]
+        return template
+
+    def render(self, kind: str, locale: Optional[str] = None, **context: Any) -> RenderedEmail:
+        """
+        Renderiza assunto, HTML e texto puro de um e-mail.
+
+        Args:
+            kind: Nome do template (ex.: "reset_password")
+            locale: Locale desejado; usa o padrão se ausente
+            **context: Variáveis do template
+
+        Returns:
+            RenderedEmail: Assunto, corpo HTML e corpo em texto puro
+        """
+        template = self.get(kind, locale)
+        return RenderedEmail(
+            subject=_render(template.subject, context).strip(),
+            html=_render(template.html, context),
+            text=_render(template.text, context),
+        )
+
+def _render(part: TemplatePart, context: Dict[str, Any]) -> str:
+    return part if isinstance(part, str) else part.render(context)
+
+@lru_cache(maxsize=256)
+def _encoded_subject(subject: str) -> str:
+    # O assunto costuma ser o mesmo para todas as mensagens de um template
+    return Header(subject, "utf-8").encode()
+
+def build_email_message(sender: str, recipient: str, rendered: RenderedEmail) -> MIMEMultipart:
+    """
+    Monta uma mensagem multipart/alternative (texto puro + HTML).
+
+    Usa as classes MIME com a policy compat32, bem mais baratas de construir
+    que EmailMessage com a policy padrão, o que importa em envios em massa.
+    """
+    message = MIMEMultipart("alternative")
+    message["Subject"] = _encoded_subject(rendered.subject)
+    message["From"] = sender
+    message["To"] = recipient
+    message.attach(MIMEText(rendered.text, "plain", "utf-8"))
+    message.attach(MIMEText(rendered.html, "html", "utf-8"))
+    return message
+
+_email_templates: Optional[EmailTemplates] = None
+
+def get_email_templates() -> EmailTemplates:
+    """
+    Retorna os templates compilados, carregando-os na primeira chamada.
+    """
+    global _email_templates
+    if _email_templates is None:
+        _email_templates = EmailTemplates(default_locale=settings.EMAIL_DEFAULT_LOCALE)
+    return _email_templates
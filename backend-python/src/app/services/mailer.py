@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import time
+from email.message import Message
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from app.core.metrics import (
+    EMAIL_CONNECT_SECONDS,
+    EMAIL_QUEUE_DEPTH,
+    EMAIL_SEND_SECONDS,
+    EMAIL_SENT,
+)
+from config.config import settings
+
+if TYPE_CHECKING:
+    import aiosmtplib
+
+logger = logging.getLogger(__name__)
+
+class SMTPConnection:
+    """
+    Conexão SMTP persistente, aberta sob demanda e reaproveitada entre envios.
+    É reaberta após erros ou depois de ficar ociosa por tempo demais.
+    """
+
+    def __init__(self, conf):
+        self.conf = conf
+        self._client: Optional["aiosmtplib.SMTP"] = None
+        self._last_used = 0.0
+
+    def _build_client(self) -> "aiosmtplib.SMTP":
+        import aiosmtplib
+
+        conf = self.conf
+        return aiosmtplib.SMTP(
+            hostname=conf.MAIL_SERVER,
+            port=conf.MAIL_PORT,
+            username=conf.MAIL_USERNAME if conf.USE_CREDENTIALS else None,
+            password=conf.MAIL_PASSWORD.get_secret_value() if conf.USE_CREDENTIALS else None,
+            use_tls=conf.MAIL_SSL_TLS,
+            start_tls=conf.MAIL_STARTTLS,
+            validate_certs=conf.VALIDATE_CERTS,
+            timeout=conf.TIMEOUT,
+        )
+
+    async def _ensure_connected(self) -> "aiosmtplib.SMTP":
+        idle = time.monotonic() - self._last_used
+        if self._client is not None and (
+            not self._client.is_connected or idle > settings.EMAIL_SMTP_IDLE_SECONDS
+        ):
+            await self.close()
+        if self._client is None:
+            start = time.perf_counter()
+            client = self._build_client()
+            await client.connect()
+            EMAIL_CONNECT_SECONDS.observe(time.perf_counter() - start)
+            self._client = client
+        return self._client
+
+    async def send(self, message: Message) -> None:
+        client = await self._ensure_connected()
+        start = time.perf_counter()
+        try:
+            await client.send_message(message)
+        except Exception:
+            await self.close()
+            raise
+        self._last_used = time.monotonic()
+        EMAIL_SEND_SECONDS.observe(time.perf_counter() - start)
+
+    async def close(self) -> None:
+        client, self._client = self._client, None
+        if client is not None and client.is_connected:
+            try:
+                await client.quit()
+            except Exception:
+                client.close()
+
+class MailQueue:
+    """
+    Fila de e-mails em memória com workers assíncronos.
+
+    Cada worker mantém sua própria conexão SMTP persistente e envia as
+    mensagens em lotes; falhas são reenfileiradas com backoff exponencial
+    até EMAIL_MAX_RETRIES tentativas. No encerramento, as retentativas
+    agendadas voltam para a fila antes do esvaziamento, e o que não for
+    enviado a tempo é registrado no log mensagem a mensagem.
+    """
+
+    def __init__(self, workers: int = 2, max_size: int = 10000, batch_size: int = 20):
+        self.workers = workers
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.conf = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Retentativas agendadas (call_later), por id da mensagem
+        self._retries: Dict[int, Tuple[asyncio.TimerHandle, Message, int]] = {}
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self, conf) -> None:
+        """
+        Inicia os workers; sem configuração de e-mail a fila fica desligada.
+        """
+        if conf is None or self.running:
+            return
+        self.conf = conf
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"mail-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Fila de e-mails iniciada com {self.workers} workers")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Envia as retentativas agendadas sem esperar o backoff, aguarda o
+        esvaziamento da fila (até timeout) e encerra os workers.
+        """
+        if not self.running:
+            return
+        self._stopping = True
+        for handle, message, attempt in list(self._retries.values()):
+            handle.cancel()
+            self._retry_due(message, attempt)
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Fila de e-mails encerrada com {self.depth()} mensagens pendentes")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while not self._queue.empty():
+            message, _ = self._queue.get_nowait()
+            self._drop(message, "fila encerrada")
+        EMAIL_QUEUE_DEPTH.set(0)
+        self._stopping = False
+
+    def enqueue(self, message: Message, attempt: int = 0) -> bool:
+        """
+        Enfileira uma mensagem sem esperar pelo envio.
+
+        Returns:
+            bool: False se a fila estiver desligada ou cheia
+        """
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait((message, attempt))
+        except asyncio.QueueFull:
+            self._drop(message, "fila cheia")
+            return False
+        EMAIL_QUEUE_DEPTH.set(self.depth())
+        return True
+
+    def _drop(self, message: Message, reason: str) -> None:
+        EMAIL_SENT.labels("dropped").inc()
+        logger.error(f"E-mail para {message['To']} descartado ({reason})")
+
+    def _schedule_retry(self, message: Message, attempt: int) -> None:
+        if self._stopping:
+            # Durante o encerramento não há backoff: a mensagem ainda entra
+            # no esvaziamento da fila
+            self._retry_due(message, attempt)
+            return
+        delay = min(
+            settings.EMAIL_RETRY_BASE_SECONDS * (2 ** (attempt - 1)),
+            settings.EMAIL_RETRY_MAX_SECONDS,
+        )
+        loop = asyncio.get_running_loop()
+        handle = loop.call_later(delay, self._retry_due, message, attempt)
+        self._retries[id(message)] = (handle, message, attempt)
+
+    def _retry_due(self, message: Message, attempt: int) -> None:
+        self._retries.pop(id(message), None)
+        self.enqueue(message, attempt)
+
+    async def _worker(self, index: int) -> None:
+        connection = SMTPConnection(self.conf)
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+                EMAIL_QUEUE_DEPTH.set(self.depth())
+                for message, attempt in batch:
+                    try:
+                        await connection.send(message)
+                        EMAIL_SENT.labels("sent").inc()
+                    except Exception as e:
+                        attempt += 1
+                        if attempt > settings.EMAIL_MAX_RETRIES:
+                            EMAIL_SENT.labels("failed").inc()
+                            logger.error(f"Falha definitiva ao enviar e-mail para {message['To']}: {e}")
+                        else:
+                            EMAIL_SENT.labels("retried").inc()
+                            logger.warning(f"Falha ao enviar e-mail para {message['To']} (tentativa {attempt}): {e}")
+                            self._schedule_retry(message, attempt)
+                    finally:
+                        self._queue.task_done()
+        finally:
+            await connection.close()
+
+mail_queue = MailQueue(
+    workers=settings.EMAIL_WORKERS,
+    max_size=settings.EMAIL_QUEUE_MAX_SIZE,
+    batch_size=settings.EMAIL_BATCH_SIZE,
+)
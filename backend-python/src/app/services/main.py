@@ -1,23 +1,72 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import auth_router
+from app.routes import admin_router, auth_router
 import logging
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 import os
-from app.core.init_db import init_db
+from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
+from app.core.database import replicas
+from app.core.init_db import prepare_database, warm_pool
+from app.core.logs import RequestLoggingMiddleware, setup_logging, stop_logging
+from app.core.instrumentation import MetricsMiddleware
+from app.core.metrics import mark_process_dead, metrics_response
+from app.core.profiling import install_profiling
+from app.core.rate_limit import rate_limiter
+from app.core.security.hashing import password_hasher
+from app.core.security.keys import get_keyring
+from app.services.auth import wait_for_rehashes
+from app.services.email import get_mail_conf
+from app.services.email_templates import get_email_templates
+from app.services.mailer import mail_queue
+from app.services.password_reset_tokens import reset_token_sweeper
+from app.services.token_revocation import revocation_sync
+from config.config import settings
 
-# Configuração de logging
-logging.basicConfig(level=logging.DEBUG)
+# Configuração de logging (escrita em uma thread separada do event loop)
+setup_logging()
 logger = logging.getLogger(__name__)
 
-# Inicializa o banco de dados
-init_db()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Inicialização e encerramento de cada worker.
+
+    O esquema é verificado aqui, e não na importação do módulo, para não
+    segurar o lock de import nem repetir DDL em cada worker; o pool de
+    conexões é aquecido e o schema OpenAPI gerado antes da primeira
+    requisição.
+    """
+    await run_in_threadpool(prepare_database)
+    await warm_pool(settings.DB_POOL_WARMUP)
+    await replicas.start()
+    # Revogações de tokens em memória antes da primeira requisição
+    await revocation_sync.start()
+    await reset_token_sweeper.start()
+    app.openapi()
+    if settings.EMAIL_DELIVERY == "queue":
+        # Só a fila em memória renderiza e envia e-mails neste processo
+        get_email_templates()
+        await mail_queue.start(get_mail_conf())
+    try:
+        yield
+    finally:
+        await wait_for_rehashes()
+        await revocation_sync.stop()
+        await reset_token_sweeper.stop()
+        await replicas.stop()
+        await mail_queue.stop()
+        await rate_limiter.close()
+        password_hasher.shutdown()
+        mark_process_dead(os.getpid())
+        stop_logging()
 
 app = FastAPI(
     title="API do Modelo",
     description="API para o sistema Modelo",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configuração do CORS
@@ -40,29 +89,16 @@ app.add_middleware(
     max_age=3600
 )
 
-# Middleware para log de requisições
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    logger.debug(f"Recebida requisição: {request.method} {request.url}")
-    logger.debug(f"Headers: {request.headers}")
-    logger.debug(f"Origin: {request.headers.get('origin')}")
-    
-    response = await call_next(request)
-    
-    # Adiciona headers CORS manualmente
-    origin = request.headers.get("origin")
-    if origin in origins:
-        response.headers["Access-Control-Allow-Origin"] = origin
-    else:
-        response.headers["Access-Control-Allow-Origin"] = "*"
-    
-    response.headers["Access-Control-Allow-Credentials"] = "true"
-    response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
-    response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, X-Requested-With"
-    
-    logger.debug(f"Resposta enviada: {response.status_code}")
-    logger.debug(f"Headers da resposta: {response.headers}")
-    return response
+# Log estruturado por requisição; sem overhead quando desabilitado
+if settings.ACCESS_LOG_SAMPLE_RATE > 0:
+    app.add_middleware(RequestLoggingMiddleware, sample_rate=settings.ACCESS_LOG_SAMPLE_RATE)
+
+# Latência por rota, requisições em andamento, SQL por requisição e threadpool
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Perfilamento sob demanda; por último para cobrir toda a pilha
+install_profiling(app)
 
 # Rota de teste CORS
 @app.options("/auth/login")
@@ -79,11 +115,27 @@ async def options_login(request: Request):
 
 # Inclusão das rotas
 app.include_router(auth_router, prefix="/auth", tags=["autenticação"])
+app.include_router(admin_router, prefix="/admin", tags=["administração"])
 
 @app.get("/")
 async def root():
     return {"message": "Bem-vindo à API do Modelo"}
 
+@app.get("/.well-known/jwks.json", include_in_schema=False)
+async def jwks():
+    """
+    Chaves públicas para que outros serviços verifiquem os tokens localmente.
+    """
+    return Response(
+        content=get_keyring().jwks_json,
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE}"},
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run("app.services.main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    from app.serve import main
+    main() 
\ No newline at end of file
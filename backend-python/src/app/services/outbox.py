@@ -0,0 +1,170 @@
+"""
+Outbox de e-mails: a mensagem é registrada na transação que a originou e
+enviada depois pelo dispatcher (app.services.outbox_dispatcher).
+
+O payload pode conter segredos (o token de reset em texto, necessário para
+montar o link), então é gravado cifrado com Fernet (EMAIL_OUTBOX_KEY ou uma
+chave derivada da SECRET_KEY): quem lê o banco não obtém o token. O texto
+cifrado fica na linha só até o envio ou a desistência (mark_sent /
+mark_failed apagam o payload), no máximo enquanto o token não expira.
+"""
+import base64
+import hashlib
+import json
+from datetime import datetime, timedelta
+from email.message import Message
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, List
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.email_outbox import EmailOutbox
+from app.services.email import build_reset_password_message
+from config.config import settings
+
+if TYPE_CHECKING:
+    from cryptography.fernet import Fernet
+
+RESET_PASSWORD = "reset_password"
+
+# Monta a mensagem de cada tipo a partir do destinatário e do payload
+MESSAGE_BUILDERS: Dict[str, Callable[[str, Dict[str, Any]], Message]] = {
+    RESET_PASSWORD: lambda recipient, payload: build_reset_password_message(
+        recipient, payload["token"], payload["frontend_url"], payload.get("locale")
+    ),
+}
+
+@lru_cache()
+def get_outbox_cipher() -> "Fernet":
+    # O cryptography só é carregado quando há e-mail na outbox
+    from cryptography.fernet import Fernet
+
+    key = settings.EMAIL_OUTBOX_KEY
+    if not key:
+        digest = hashlib.sha256(b"email-outbox:" + settings.SECRET_KEY.encode("utf-8")).digest()
+        key = base64.urlsafe_b64encode(digest).decode("ascii")
+    return Fernet(key)
+
+def seal_payload(payload: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Cifra o payload inteiro para gravação na outbox.
+    """
+    data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return {"sealed": get_outbox_cipher().encrypt(data).decode("ascii")}
+
+def open_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Decifra o payload gravado por seal_payload. Payloads em texto (gravados
+    antes da cifragem) são devolvidos como estão.
+
+    Raises:
+        cryptography.fernet.InvalidToken: Se a chave não for a usada na gravação
+    """
+    if "sealed" not in payload:
+        return payload
+    return json.loads(get_outbox_cipher().decrypt(payload["sealed"].encode("ascii")))
+
+def add_to_outbox(db: Session, kind: str, recipient: str, payload: Dict[str, Any]) -> EmailOutbox:
+    """
+    Registra um e-mail na outbox, com o payload cifrado, sem fazer commit,
+    para que seja gravado na mesma transação que o originou.
+    """
+    entry = EmailOutbox(kind=kind, recipient=recipient, payload=seal_payload(payload))
+    db.add(entry)
+    return entry
+
+def build_outbox_message(entry: EmailOutbox) -> Message:
+    return MESSAGE_BUILDERS[entry.kind](entry.recipient, open_payload(entry.payload or {}))
+
+def claim_outbox_batch(db: Session, limit: int, lease_seconds: float) -> List[EmailOutbox]:
+    """
+    Reserva um lote de e-mails prontos para envio e faz commit.
+
+    A seleção usa SELECT ... FOR UPDATE SKIP LOCKED, para que dispatchers em
+    paralelo não peguem as mesmas linhas, mas os bloqueios duram só esta
+    transação: a reserva é gravada em claimed_at, e next_attempt_at passa
+    para o fim dela. O envio acontece sem transação aberta; um dispatcher
+    que morrer devolve o lote à fila quando a reserva vence.
+
+    Use uma sessão com expire_on_commit=False: as linhas são lidas depois
+    do commit.
+
+    Args:
+        db: Sessão do banco
+        limit: Tamanho máximo do lote
+        lease_seconds: Duração da reserva
+
+    Returns:
+        List[EmailOutbox]: Linhas reservadas
+    """
+    now = datetime.utcnow()
+    entries = (
+        db.query(EmailOutbox)
+        .filter(
+            EmailOutbox.status == "pending",
+            EmailOutbox.next_attempt_at <= now,
+        )
+        .order_by(EmailOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for entry in entries:
+        entry.claimed_at = now
+        entry.next_attempt_at = now + timedelta(seconds=lease_seconds)
+    db.commit()
+    return entries
+
+def save_outbox_results(db: Session, entries: List[EmailOutbox]) -> int:
+    """
+    Grava o resultado do envio (mark_sent / mark_failed) das linhas
+    reservadas por claim_outbox_batch e libera a reserva.
+
+    Só atualiza as linhas cuja reserva ainda é a mesma: se ela venceu e
+    outro dispatcher pegou a linha, o resultado dele prevalece.
+
+    Returns:
+        int: Linhas atualizadas
+    """
+    saved = 0
+    for entry in entries:
+        result = db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == entry.id, EmailOutbox.claimed_at == entry.claimed_at)
+            .values(
+                status=entry.status,
+                attempts=entry.attempts,
+                next_attempt_at=entry.next_attempt_at,
+                last_error=entry.last_error,
+                sent_at=entry.sent_at,
+                payload=entry.payload,
+                claimed_at=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        saved += result.rowcount
+    db.commit()
+    return saved
+
+def mark_sent(entry: EmailOutbox) -> None:
+    entry.status = "sent"
+    entry.sent_at = datetime.utcnow()
+    entry.payload = None
+    entry.last_error = None
+
+def mark_failed(entry: EmailOutbox, error: str) -> None:
+    """
+    Agenda uma nova tentativa com backoff exponencial ou desiste após
+    EMAIL_MAX_RETRIES tentativas.
+    """
+    entry.attempts += 1
+    entry.last_error = error[:1000]
+    if entry.attempts > settings.EMAIL_MAX_RETRIES:
+        entry.status = "failed"
+        entry.payload = None
+        return
+    delay = min(
+        settings.EMAIL_RETRY_BASE_SECONDS * (2 ** (entry.attempts - 1)),
+        settings.EMAIL_RETRY_MAX_SECONDS,
+    )
+    entry.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
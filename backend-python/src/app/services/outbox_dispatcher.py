@@ -0,0 +1,156 @@
+"""
+Dispatcher da outbox de e-mails.
+
+Processo independente da API que consome a tabela email_outbox em lotes e
+envia as mensagens por conexões SMTP persistentes. Cada lote é reservado
+numa transação curta e o resultado é gravado em outra, depois do envio:
+nenhuma transação nem bloqueio fica aberto durante o SMTP. Várias
+instâncias podem rodar em paralelo:
+
+    python -m app.services.outbox_dispatcher [--metrics-port 9101]
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import time
+from typing import List
+from prometheus_client import start_http_server
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import SessionLocal
+from app.core.metrics import (
+    OUTBOX_BATCH_SECONDS,
+    OUTBOX_DISPATCHED,
+)
+from app.core.logs import setup_logging
+from app.services.email import get_mail_conf
+from app.services.mailer import SMTPConnection
+from app.models.email_outbox import EmailOutbox
+from app.services.outbox import (
+    build_outbox_message,
+    claim_outbox_batch,
+    mark_failed,
+    mark_sent,
+    save_outbox_results,
+)
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+class OutboxDispatcher:
+    """
+    Consome a outbox: reserva um lote (SKIP LOCKED e commit), envia as
+    mensagens em paralelo pelas conexões SMTP e grava o resultado numa
+    segunda transação. As chamadas ao banco rodam no threadpool, fora do
+    event loop.
+    """
+
+    def __init__(self, connections: int, batch_size: int, poll_interval: float, lease_seconds: float):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.connections: List[SMTPConnection] = [SMTPConnection(get_mail_conf()) for _ in range(connections)]
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def _send_slice(self, connection: SMTPConnection, entries) -> None:
+        for entry in entries:
+            try:
+                await connection.send(build_outbox_message(entry))
+                mark_sent(entry)
+                OUTBOX_DISPATCHED.labels("sent").inc()
+            except Exception as e:
+                mark_failed(entry, str(e))
+                OUTBOX_DISPATCHED.labels(entry.status == "failed" and "failed" or "retried").inc()
+                logger.warning(f"Falha ao enviar e-mail {entry.id} para {entry.recipient}: {e}")
+
+    def _claim(self) -> List[EmailOutbox]:
+        # As linhas são usadas depois do commit da reserva
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            return claim_outbox_batch(db, self.batch_size, self.lease_seconds)
+        finally:
+            db.close()
+
+    def _save(self, entries: List[EmailOutbox]) -> None:
+        db = SessionLocal()
+        try:
+            saved = save_outbox_results(db, entries)
+        finally:
+            db.close()
+        if saved < len(entries):
+            logger.warning(f"{len(entries) - saved} e-mails da outbox tiveram a reserva vencida durante o envio")
+
+    async def dispatch_batch(self) -> int:
+        """
+        Processa um lote.
+
+        Returns:
+            int: Quantidade de e-mails processados
+        """
+        start = time.perf_counter()
+        entries = await run_in_threadpool(self._claim)
+        if not entries:
+            return 0
+        slices = [entries[i::len(self.connections)] for i in range(len(self.connections))]
+        await asyncio.gather(*(
+            self._send_slice(connection, part)
+            for connection, part in zip(self.connections, slices)
+            if part
+        ))
+        await run_in_threadpool(self._save, entries)
+        OUTBOX_BATCH_SECONDS.observe(time.perf_counter() - start)
+        return len(entries)
+
+    async def run(self) -> None:
+        logger.info("Dispatcher da outbox iniciado")
+        try:
+            while not self._stopping.is_set():
+                try:
+                    processed = await self.dispatch_batch()
+                except Exception as e:
+                    logger.error(f"Erro ao processar a outbox: {e}")
+                    processed = 0
+                if processed < self.batch_size:
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            for connection in self.connections:
+                await connection.close()
+            logger.info("Dispatcher da outbox encerrado")
+
+async def main_async(args) -> None:
+    dispatcher = OutboxDispatcher(
+        connections=args.connections,
+        batch_size=args.batch_size,
+        poll_interval=args.poll_interval,
+        lease_seconds=args.lease_seconds,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, dispatcher.stop)
+    await dispatcher.run()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=settings.EMAIL_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=settings.EMAIL_BATCH_SIZE)
+    parser.add_argument("--poll-interval", type=float, default=settings.EMAIL_OUTBOX_POLL_SECONDS)
+    parser.add_argument("--lease-seconds", type=float, default=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+    parser.add_argument("--metrics-port", type=int, default=0, help="Porta para expor /metrics (0 desabilita)")
+    args = parser.parse_args()
+
+    setup_logging()
+    if get_mail_conf() is None:
+        raise SystemExit("Configuração de e-mail não disponível")
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Tokens de redefinição de senha (tabela password_reset_tokens).
+
+O token enviado por e-mail é buscado pelo seu SHA-256, e cada pedido de
+reset grava uma linha estreita em vez de atualizar a linha do usuário.
+Tokens expirados são apagados em lotes pequenos por um sweeper em segundo
+plano (um por worker; lotes concorrentes se ignoram com SKIP LOCKED no
+Postgres), ou sob demanda:
+
+    python -m app.services.password_reset_tokens sweep
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import secrets
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import SessionLocal
+from app.core.metrics import (
+    RESET_TOKENS,
+    RESET_TOKENS_SWEPT,
+    RESET_TOKEN_SWEEP_SECONDS,
+)
+from app.models.password_reset_token import PasswordResetToken
+from app.models.user import User
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+RESET_TOKEN_TTL = timedelta(hours=24)
+
+def hash_reset_token(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+def add_reset_token(db: Session, user_id: int) -> str:
+    """
+    Cria um token de reset para o usuário, invalidando os anteriores. Não
+    faz commit, para que o chamador grave o token junto com o e-mail.
+
+    Returns:
+        str: Token a ser enviado ao usuário
+    """
+    token = secrets.token_urlsafe(32)
+    db.execute(delete(PasswordResetToken).where(PasswordResetToken.user_id == user_id))
+    db.add(PasswordResetToken(
+        token_hash=hash_reset_token(token),
+        user_id=user_id,
+        expires_at=datetime.utcnow() + RESET_TOKEN_TTL,
+    ))
+    return token
+
+def find_reset_token_user(db: Session, token: str) -> Optional[User]:
+    """
+    Usuário dono do token, se ele existir e não tiver expirado.
+    """
+    return db.execute(
+        select(User)
+        .join(PasswordResetToken, PasswordResetToken.user_id == User.id)
+        .where(
+            PasswordResetToken.token_hash == hash_reset_token(token),
+            PasswordResetToken.expires_at > datetime.utcnow(),
+        )
+    ).scalar_one_or_none()
+
+def delete_user_reset_tokens(db: Session, user_id: int) -> None:
+    db.execute(delete(PasswordResetToken).where(PasswordResetToken.user_id == user_id))
+
+def sweep_batch(db: Session, batch_size: int) -> int:
+    """
+    Apaga um lote de tokens expirados em uma transação curta.
+
+    Returns:
+        int: Tokens apagados
+    """
+    expired = (
+        select(PasswordResetToken.token_hash)
+        .where(PasswordResetToken.expires_at <= datetime.utcnow())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    deleted = db.execute(
+        delete(PasswordResetToken).where(PasswordResetToken.token_hash.in_(expired))
+    ).rowcount
+    db.commit()
+    return deleted
+
+def count_reset_tokens(db: Session) -> int:
+    return db.execute(select(func.count()).select_from(PasswordResetToken)).scalar_one()
+
+def sweep_expired(batch_size: int, pause: float = 0.0) -> int:
+    """
+    Apaga todos os tokens expirados, um lote por transação, e atualiza as
+    métricas.
+
+    Args:
+        batch_size: Linhas por lote
+        pause: Espera entre lotes, em segundos
+
+    Returns:
+        int: Tokens apagados
+    """
+    start = time.perf_counter()
+    total = 0
+    db = SessionLocal()
+    try:
+        while True:
+            deleted = sweep_batch(db, batch_size)
+            total += deleted
+            if deleted < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+        RESET_TOKENS.set(count_reset_tokens(db))
+    finally:
+        db.close()
+    RESET_TOKENS_SWEPT.inc(total)
+    RESET_TOKEN_SWEEP_SECONDS.observe(time.perf_counter() - start)
+    return total
+
+class ResetTokenSweeper:
+    """
+    Varredura periódica dos tokens expirados em segundo plano.
+    """
+
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    async def start(self) -> None:
+        if self.interval <= 0:
+            return
+        self._stopping = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                deleted = await run_in_threadpool(sweep_expired, self.batch_size)
+                if deleted:
+                    logger.info(f"{deleted} tokens de reset expirados apagados")
+            except Exception as e:
+                logger.warning(f"Falha ao apagar tokens de reset expirados: {e}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+reset_token_sweeper = ResetTokenSweeper(
+    settings.RESET_TOKEN_SWEEP_INTERVAL_SECONDS,
+    settings.RESET_TOKEN_SWEEP_BATCH_SIZE,
+)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    sweep_parser = commands.add_parser("sweep", help="Apaga os tokens de reset expirados")
+    sweep_parser.add_argument("--batch-size", type=int, default=settings.RESET_TOKEN_SWEEP_BATCH_SIZE)
+    sweep_parser.add_argument("--pause", type=float, default=0.0, help="Espera entre lotes, em segundos")
+    args = parser.parse_args()
+    print(f"{sweep_expired(args.batch_size, args.pause)} tokens de reset apagados")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Famílias de refresh tokens (rotação com detecção de reuso).
+
+Cada login cria uma família; o refresh token carrega o id da família
+("fam") e a geração ("gen"). Um refresh válido avança a geração com um
+único UPDATE pela chave primária, condicionado à geração apresentada, e
+emite um novo par de tokens. Reapresentar um token de geração anterior
+indica que ele vazou: a família é revogada e o próximo refresh de qualquer
+um dos lados falha.
+
+    python -m app.services.token_families purge
+"""
+import argparse
+import logging
+import secrets
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.metrics import REFRESH_TOKENS
+from app.models.refresh_token_family import RefreshTokenFamily
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+_ROTATED = REFRESH_TOKENS.labels("rotated")
+_REUSED = REFRESH_TOKENS.labels("reused")
+_REPLAYED = REFRESH_TOKENS.labels("replayed")
+_INVALID = REFRESH_TOKENS.labels("invalid")
+
+class FamilyState(NamedTuple):
+    """
+    Estado da família após o login ou o refresh, usado para emitir os tokens.
+    """
+    id: str
+    user_id: int
+    generation: int
+    expires_at: datetime
+
+def create_family(db: Session, user_id: int) -> FamilyState:
+    """
+    Cria a família de refresh tokens de um novo login.
+    """
+    now = datetime.utcnow()
+    state = FamilyState(
+        id=secrets.token_hex(16),
+        user_id=user_id,
+        generation=0,
+        expires_at=now + timedelta(days=settings.REFRESH_TOKEN_FAMILY_MAX_DAYS),
+    )
+    db.add(RefreshTokenFamily(created_at=now, **state._asdict()))
+    db.commit()
+    return state
+
+def rotate_family(db: Session, family_id: str, generation: int) -> Optional[FamilyState]:
+    """
+    Avança a geração da família se o token apresentado for o mais recente.
+
+    Args:
+        db: Sessão do banco
+        family_id: Claim "fam" do refresh token
+        generation: Claim "gen" do refresh token
+
+    Returns:
+        Optional[FamilyState]: Família com a nova geração, ou None se o token não
+        puder ser usado (família revogada/expirada ou token já trocado)
+    """
+    now = datetime.utcnow()
+    table = RefreshTokenFamily.__table__
+    row = db.execute(
+        update(table)
+        .where(
+            table.c.id == family_id,
+            table.c.generation == generation,
+            table.c.revoked_at.is_(None),
+            table.c.expires_at > now,
+        )
+        .values(generation=table.c.generation + 1, last_used_at=now)
+        .returning(table.c.user_id, table.c.generation, table.c.expires_at)
+    ).first()
+    if row is not None:
+        db.commit()
+        _ROTATED.inc()
+        return FamilyState(family_id, *row)
+
+    # Caminho de falha: identifica reuso de um token já trocado
+    family = db.execute(
+        select(table.c.generation, table.c.last_used_at, table.c.revoked_at, table.c.expires_at)
+        .where(table.c.id == family_id)
+    ).first()
+    if (family is None or family.revoked_at is not None or family.expires_at <= now
+            or family.generation <= generation):
+        db.rollback()
+        _INVALID.inc()
+        return None
+    grace = timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS)
+    if family.generation == generation + 1 and family.last_used_at and now - family.last_used_at <= grace:
+        # Refresh concorrente do mesmo cliente: recusa sem derrubar a sessão
+        db.rollback()
+        _REPLAYED.inc()
+        return None
+    db.execute(update(table).where(table.c.id == family_id).values(revoked_at=now))
+    db.commit()
+    _REUSED.inc()
+    logger.warning(f"Reuso de refresh token detectado; família {family_id} revogada")
+    return None
+
+def revoke_family(db: Session, family_id: str) -> None:
+    table = RefreshTokenFamily.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == family_id, table.c.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    db.commit()
+
+def revoke_user_families(db: Session, user_id: int) -> int:
+    """
+    Revoga todas as sessões de refresh do usuário (ex.: após trocar a senha).
+
+    Returns:
+        int: Famílias revogadas
+    """
+    revoked = mark_user_families_revoked(db, user_id)
+    db.commit()
+    return revoked
+
+def mark_user_families_revoked(db: Session, user_id: int) -> int:
+    """
+    Como revoke_user_families, mas sem commit.
+    """
+    table = RefreshTokenFamily.__table__
+    return db.execute(
+        update(table)
+        .where(table.c.user_id == user_id, table.c.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    ).rowcount
+
+def purge_families(db: Session, retention_days: int = 1, batch_size: int = 1000) -> int:
+    """
+    Apaga, em lotes, famílias expiradas ou revogadas há mais de
+    retention_days dias.
+
+    Returns:
+        int: Famílias apagadas
+    """
+    table = RefreshTokenFamily.__table__
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    total = 0
+    while True:
+        ids = select(table.c.id).where(
+            or_(table.c.expires_at < cutoff, table.c.revoked_at < cutoff)
+        ).limit(batch_size)
+        deleted = db.execute(delete(table).where(table.c.id.in_(ids))).rowcount
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    purge_parser = commands.add_parser("purge", help="Apaga famílias expiradas ou revogadas")
+    purge_parser.add_argument("--retention-days", type=int, default=1)
+    purge_parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    from app.core.database import SessionLocal
+    db = SessionLocal()
+    try:
+        print(f"{purge_families(db, args.retention_days, args.batch_size)} famílias apagadas")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Revogação de tokens JWT, por "jti" ou por usuário.
+
+As revogações ficam nas tabelas revoked_tokens e user_token_revocations.
+Cada worker mantém uma cópia em memória (app.core.security.revocation),
+consultada em toda verificação de token sem I/O, e atualizada:
+
+- no próprio worker, assim que a revogação é gravada;
+- nos demais, por LISTEN/NOTIFY no Postgres (a notificação sai no commit
+  da revogação);
+- por uma consulta incremental a cada TOKEN_REVOCATION_POLL_SECONDS, que
+  cobre notificações perdidas numa reconexão e bancos sem NOTIFY (SQLite).
+
+O mesmo canal avisa os demais workers de alterações em usuários, para que
+descartem a cópia em cache (app.services.auth.user_cache).
+
+    python -m app.services.token_revocation purge
+    python -m app.services.token_revocation revoke-user <user_id>
+"""
+import argparse
+import asyncio
+import calendar
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import Connection, Table, delete, func, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import DBSession, SessionLocal, engine, run_db
+from app.core.metrics import (
+    REVOCATION_SYNC,
+    TOKEN_REVOCATIONS,
+)
+from app.core.security.revocation import revocation_list
+from app.models.token_revocation import RevokedToken, UserTokenRevocation
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Canal do LISTEN/NOTIFY no Postgres
+CHANNEL = "token_revocations"
+
+_SYNC_NOTIFY = REVOCATION_SYNC.labels("notify")
+_SYNC_POLL = REVOCATION_SYNC.labels("poll")
+_SYNC_FULL = REVOCATION_SYNC.labels("full")
+_SYNC_ERROR = REVOCATION_SYNC.labels("error")
+
+Revocations = Tuple[List[Tuple[str, float]], List[Tuple[int, float]]]
+
+def max_token_age() -> timedelta:
+    """
+    Duração do token mais longo emitido; cortes por usuário mais antigos que
+    isso não alcançam mais nenhum token válido.
+    """
+    return max(
+        timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+
+def _epoch(value: datetime) -> float:
+    return calendar.timegm(value.utctimetuple()) + value.microsecond / 1_000_000
+
+def _upsert(db: Session, table: Table):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Revogação de tokens não suportada para o banco {dialect}")
+    return insert(table)
+
+def _notify(db: Session, message: Dict[str, Any]) -> None:
+    # Enviada pelo Postgres apenas no commit da transação
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(func.pg_notify(CHANNEL, json.dumps(message))))
+
+def notify_user_changed(connection: Connection, user_id: int) -> None:
+    """
+    Avisa os demais workers de que os dados do usuário mudaram. Como as
+    revogações, a notificação só é entregue no commit da transação.
+
+    Args:
+        connection: Conexão da transação que alterou o usuário
+        user_id: Id do usuário alterado
+    """
+    if connection.dialect.name == "postgresql":
+        connection.execute(select(func.pg_notify(CHANNEL, json.dumps({"user_changed": user_id}))))
+
+def revoke_token(db: Session, jti: str, expires_at: datetime, user_id: Optional[int] = None) -> None:
+    """
+    Revoga um único token até o seu "exp".
+
+    Args:
+        db: Sessão do banco
+        jti: Claim "jti" do token
+        expires_at: Claim "exp" do token (UTC)
+        user_id: Dono do token, se conhecido
+    """
+    table = RevokedToken.__table__
+    db.execute(
+        _upsert(db, table)
+        .values(jti=jti, user_id=user_id, expires_at=expires_at, revoked_at=datetime.utcnow())
+        .on_conflict_do_nothing()
+    )
+    _notify(db, {"jti": jti, "exp": _epoch(expires_at)})
+    db.commit()
+    revocation_list.add_token(jti, _epoch(expires_at))
+    TOKEN_REVOCATIONS.labels("token").inc()
+
+def add_user_revocation(db: Session, user_id: int) -> float:
+    """
+    Grava o corte por usuário sem fazer commit, para que entre na mesma
+    transação que o originou (ex.: troca de senha). O NOTIFY só é entregue
+    pelo Postgres no commit; depois dele, o chamador deve chamar
+    user_revocation_committed para atualizar este worker.
+
+    Returns:
+        float: Corte gravado, em epoch
+    """
+    now = datetime.utcnow()
+    table = UserTokenRevocation.__table__
+    statement = _upsert(db, table).values(user_id=user_id, revoked_before=now, updated_at=now)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={"revoked_before": statement.excluded.revoked_before, "updated_at": statement.excluded.updated_at},
+    ))
+    _notify(db, {"user_id": user_id, "before": _epoch(now)})
+    return _epoch(now)
+
+def user_revocation_committed(user_id: int, before: float) -> None:
+    revocation_list.add_user(user_id, before)
+    TOKEN_REVOCATIONS.labels("user").inc()
+
+def revoke_user_tokens(db: Session, user_id: int) -> None:
+    """
+    Revoga todos os tokens (de acesso e de atualização) emitidos até agora
+    para o usuário.
+    """
+    before = add_user_revocation(db, user_id)
+    db.commit()
+    user_revocation_committed(user_id, before)
+
+async def revoke_token_async(db: DBSession, payload: Dict[str, Any]) -> None:
+    """
+    Revoga o token a partir das claims já verificadas. Tokens sem "jti"
+    (emitidos antes da revogação existir) expiram sozinhos.
+    """
+    jti = payload.get("jti")
+    if not jti or not isinstance(payload.get("exp"), (int, float)):
+        return
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
+        user_id = None
+    await run_db(db, revoke_token, jti, datetime.utcfromtimestamp(payload["exp"]), user_id)
+
+def load_revocations(db: Session, since: Optional[datetime] = None) -> Revocations:
+    """
+    Lê as revogações ainda relevantes (todas ou as gravadas desde "since").
+
+    Returns:
+        Revocations: Pares (jti, exp) e (user_id, revoked_before) em epoch
+    """
+    now = datetime.utcnow()
+    tokens = select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > now)
+    users = select(UserTokenRevocation.user_id, UserTokenRevocation.revoked_before).where(
+        UserTokenRevocation.revoked_before > now - max_token_age()
+    )
+    if since is not None:
+        tokens = tokens.where(RevokedToken.revoked_at >= since)
+        users = users.where(UserTokenRevocation.updated_at >= since)
+    return (
+        [(jti, _epoch(expires_at)) for jti, expires_at in db.execute(tokens)],
+        [(user_id, _epoch(before)) for user_id, before in db.execute(users)],
+    )
+
+def purge_revocations(db: Session) -> int:
+    """
+    Apaga revogações que não alcançam mais nenhum token válido.
+
+    Returns:
+        int: Linhas apagadas
+    """
+    now = datetime.utcnow()
+    deleted = db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now)).rowcount
+    deleted += db.execute(
+        delete(UserTokenRevocation).where(UserTokenRevocation.revoked_before <= now - max_token_age())
+    ).rowcount
+    db.commit()
+    return deleted
+
+class RevocationSync:
+    """
+    Mantém a cópia em memória das revogações do worker atualizada.
+
+    Com Postgres (psycopg2) uma conexão dedicada, fora do pool, fica em
+    LISTEN e é lida pelo event loop (add_reader) só quando chega uma
+    notificação. A consulta incremental periódica roda em todos os bancos.
+    """
+
+    def __init__(self, poll_interval: float):
+        self.poll_interval = poll_interval
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._listener = None
+        self._last_poll: Optional[datetime] = None
+        self._user_changed_handlers: List[Callable[[int], None]] = []
+
+    def on_user_changed(self, handler: Callable[[int], None]) -> None:
+        """
+        Registra uma função chamada com o id do usuário a cada notificação
+        de alteração vinda de outro worker.
+        """
+        self._user_changed_handlers.append(handler)
+
+    @property
+    def listen_supported(self) -> bool:
+        return engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+
+    async def start(self) -> None:
+        """
+        Carrega as revogações antes da primeira requisição e inicia a
+        atualização em segundo plano.
+        """
+        await run_in_threadpool(self._load, None)
+        self._stopping = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+
+    def _load(self, since: Optional[datetime]) -> None:
+        started = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            tokens, users = load_revocations(db, since)
+        finally:
+            db.close()
+        if since is None:
+            revocation_list.replace(tokens, users)
+            _SYNC_FULL.inc()
+        else:
+            revocation_list.update(tokens, users)
+            revocation_list.prune(max_token_age().total_seconds())
+            _SYNC_POLL.inc()
+        self._last_poll = started
+
+    def _poll(self) -> None:
+        # A janela se sobrepõe à consulta anterior para não perder revogações
+        # gravadas por transações que terminaram depois dela
+        self._load(self._last_poll - timedelta(seconds=self.poll_interval))
+
+    def _connect_listener(self):
+        raw = engine.raw_connection()
+        raw.detach()
+        connection = raw.driver_connection
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        return connection
+
+    async def _listen(self) -> None:
+        self._listener = await run_in_threadpool(self._connect_listener)
+        asyncio.get_running_loop().add_reader(self._listener.fileno(), self._on_notify)
+        # Revogações gravadas enquanto não havia LISTEN
+        await run_in_threadpool(self._load, None)
+        logger.info(f"Revogações de tokens sincronizadas por LISTEN {CHANNEL}")
+
+    def _close_listener(self) -> None:
+        if self._listener is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(self._listener.fileno())
+            self._listener.close()
+        except Exception:
+            pass
+        self._listener = None
+
+    def _on_notify(self) -> None:
+        try:
+            self._listener.poll()
+        except Exception as e:
+            # Reconecta na próxima volta do laço
+            _SYNC_ERROR.inc()
+            logger.warning(f"Conexão do LISTEN de revogações perdida: {e}")
+            self._close_listener()
+            return
+        while self._listener.notifies:
+            notify = self._listener.notifies.pop(0)
+            try:
+                message = json.loads(notify.payload)
+                if "user_changed" in message:
+                    for handler in self._user_changed_handlers:
+                        handler(int(message["user_changed"]))
+                elif "jti" in message:
+                    revocation_list.add_token(message["jti"], float(message["exp"]))
+                else:
+                    revocation_list.add_user(int(message["user_id"]), float(message["before"]))
+                _SYNC_NOTIFY.inc()
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"Notificação de revogação inválida: {notify.payload!r}")
+
+    async def _run(self) -> None:
+        try:
+            while not self._stopping.is_set():
+                try:
+                    if self._listener is None and self.listen_supported:
+                        await self._listen()
+                    await run_in_threadpool(self._poll)
+                except Exception as e:
+                    _SYNC_ERROR.inc()
+                    logger.warning(f"Falha ao sincronizar revogações de tokens: {e}")
+                    self._close_listener()
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._close_listener()
+
+revocation_sync = RevocationSync(settings.TOKEN_REVOCATION_POLL_SECONDS)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("purge", help="Apaga revogações que não alcançam mais nenhum token")
+    revoke_parser = commands.add_parser("revoke-user", help="Revoga todos os tokens de um usuário")
+    revoke_parser.add_argument("user_id", type=int)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "purge":
+            print(f"{purge_revocations(db)} revogações apagadas")
+        else:
+            revoke_user_tokens(db, args.user_id)
+            print(f"Tokens do usuário {args.user_id} revogados")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
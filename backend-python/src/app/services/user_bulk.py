@@ -0,0 +1,384 @@
+"""
+Importação e exportação de usuários em massa.
+
+    python -m app.services.user_bulk import usuarios.csv [--report relatorio.json]
+    python -m app.services.user_bulk export -o usuarios.jsonl [--include-hashes]
+
+A entrada (CSV com cabeçalho ou JSON Lines) é lida em fluxo e processada em
+lotes de BULK_IMPORT_BATCH_SIZE linhas. Cada linha traz email e username e
+uma senha em texto ("password") ou um hash já gerado ("hashed_password") em
+um formato aceito pelo passlib; opcionalmente is_active e is_superuser.
+
+Para cada lote, os e-mails e usernames já cadastrados são descartados antes
+do hash, as senhas restantes são transformadas em hash em um pool de
+processos (enquanto o lote anterior é gravado) e as linhas entram com um
+único INSERT ... ON CONFLICT DO NOTHING de várias linhas, com commit por
+lote. Duplicados e linhas inválidas vão para o relatório sem interromper a
+importação; reexecutar a mesma entrada é seguro.
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+from pydantic import ValidationError
+from sqlalchemy import or_, select
+from sqlalchemy.engine import Connection
+
+from app.core.database import engine
+from app.core.security.hashing import hash_many, pwd_context
+from app.core.workers import api_workers, available_cpus
+from app.models.user import User
+from app.schemas.user import UserImport
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl")
+IMPORT_FIELDS = ("email", "username", "password", "hashed_password", "is_active", "is_superuser")
+EXPORT_FIELDS = ("id", "email", "username", "is_active", "is_superuser")
+
+class ImportReport:
+    """
+    Resultado de uma importação. Apenas as primeiras max_errors linhas com
+    problema são detalhadas; as contagens são sempre completas.
+    """
+
+    def __init__(self, max_errors: int = 1000):
+        self.max_errors = max_errors
+        self.total = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def reject(self, line: int, reason: str, email: Optional[str] = None, duplicate: bool = False) -> None:
+        if duplicate:
+            self.duplicates += 1
+        else:
+            self.invalid += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "email": email, "reason": reason})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "errors": self.errors,
+            "errors_truncated": self.duplicates + self.invalid > len(self.errors),
+        }
+
+def detect_format(filename: str) -> str:
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Lê a entrada linha a linha.
+
+    Yields:
+        Tuple[int, Any]: Número da linha e o registro (dict), ou uma
+        mensagem de erro (str) se a linha não puder ser lida
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield line_number, "JSON inválido"
+                continue
+            yield line_number, record if isinstance(record, dict) else "A linha deve ser um objeto JSON"
+    else:
+        raise ValueError(f"Formato inválido: {fmt}")
+
+def parse_record(record: Any) -> UserImport:
+    """
+    Valida um registro da entrada.
+
+    Raises:
+        ValueError: Se o registro for inválido
+    """
+    if isinstance(record, str):
+        raise ValueError(record)
+    # Campos vazios do CSV equivalem a ausentes
+    data = {key: value for key, value in record.items() if key in IMPORT_FIELDS and value not in ("", None)}
+    try:
+        user = UserImport(**data)
+    except ValidationError as e:
+        raise ValueError("; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())) from None
+    if (user.password is None) == (user.hashed_password is None):
+        raise ValueError("Informe password ou hashed_password (apenas um)")
+    if user.hashed_password is not None and pwd_context.identify(user.hashed_password, required=False) is None:
+        raise ValueError("Formato de hash não suportado")
+    return user
+
+def _batches(records: Iterable[Tuple[int, Any]], size: int) -> Iterator[List[Tuple[int, Any]]]:
+    batch: List[Tuple[int, Any]] = []
+    for item in records:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _insert_statement(connection: Connection):
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Importação em massa não suportada para o banco {dialect}")
+    return insert(User.__table__).on_conflict_do_nothing().returning(User.__table__.c.email)
+
+class UserImporter:
+    """
+    Executa a importação sobre uma conexão própria, com commit por lote.
+
+    Args:
+        executor: Pool usado para o hash das senhas em texto
+        workers: Número de workers do pool (define em quantas partes cada
+            lote é dividido)
+        batch_size: Linhas por lote (um INSERT e um commit por lote)
+        max_errors: Linhas com problema detalhadas no relatório
+    """
+
+    def __init__(self, executor: Executor, workers: int, batch_size: int = 1000, max_errors: int = 1000):
+        self.executor = executor
+        self.workers = workers
+        self.batch_size = batch_size
+        self.report = ImportReport(max_errors)
+
+    def _prepare(self, connection: Connection, batch: List[Tuple[int, Any]]) -> List[Tuple[int, UserImport]]:
+        """
+        Valida o lote e descarta duplicados, no próprio lote ou já gravados,
+        antes de gastar CPU com o hash.
+        """
+        rows: List[Tuple[int, UserImport]] = []
+        emails: Set[str] = set()
+        usernames: Set[str] = set()
+        for line, record in batch:
+            self.report.total += 1
+            try:
+                user = parse_record(record)
+            except ValueError as e:
+                email = record.get("email") if isinstance(record, dict) else None
+                self.report.reject(line, str(e), email)
+                continue
+            if user.email in emails or user.username in usernames:
+                self.report.reject(line, "Email ou username repetido na entrada", user.email, duplicate=True)
+                continue
+            emails.add(user.email)
+            usernames.add(user.username)
+            rows.append((line, user))
+        if not rows:
+            return rows
+
+        table = User.__table__
+        existing = connection.execute(
+            select(table.c.email, table.c.username).where(
+                or_(table.c.email.in_(emails), table.c.username.in_(usernames))
+            )
+        ).all()
+        if not existing:
+            return rows
+        taken_emails = {email for email, _ in existing}
+        taken_usernames = {username for _, username in existing}
+        kept = []
+        for line, user in rows:
+            if user.email in taken_emails or user.username in taken_usernames:
+                self.report.reject(line, "Email ou username já cadastrado", user.email, duplicate=True)
+            else:
+                kept.append((line, user))
+        return kept
+
+    def _submit_hashes(self, rows: List[Tuple[int, UserImport]]) -> List[Tuple[List[UserImport], Future]]:
+        pending = [user for _, user in rows if user.hashed_password is None]
+        if not pending:
+            return []
+        # Algumas partes por worker para equilibrar a carga entre processos
+        parts = min(len(pending), self.workers * 2)
+        chunks = [pending[i::parts] for i in range(parts)]
+        return [
+            (chunk, self.executor.submit(hash_many, [user.password for user in chunk]))
+            for chunk in chunks
+        ]
+
+    def _insert(self, connection: Connection, rows: List[Tuple[int, UserImport]],
+                hashes: List[Tuple[List[UserImport], Future]]) -> None:
+        for chunk, future in hashes:
+            for user, hashed in zip(chunk, future.result()):
+                user.hashed_password = hashed
+        values = [
+            {
+                "email": user.email,
+                "username": user.username,
+                "hashed_password": user.hashed_password,
+                "is_active": user.is_active,
+                "is_superuser": user.is_superuser,
+            }
+            for _, user in rows
+        ]
+        inserted = set(connection.execute(_insert_statement(connection), values).scalars())
+        connection.commit()
+        self.report.inserted += len(inserted)
+        # Conflitos com linhas gravadas por outra transação depois da consulta
+        for line, user in rows:
+            if user.email not in inserted:
+                self.report.reject(line, "Email ou username já cadastrado", user.email, duplicate=True)
+
+    def run(self, records: Iterable[Tuple[int, Any]]) -> ImportReport:
+        """
+        Importa os registros. O hash do lote seguinte roda no pool enquanto
+        o lote atual é gravado.
+        """
+        with engine.connect() as connection:
+            previous = None
+            for batch in _batches(records, self.batch_size):
+                rows = self._prepare(connection, batch)
+                connection.commit()
+                current = (rows, self._submit_hashes(rows)) if rows else None
+                if previous is not None:
+                    self._insert(connection, *previous)
+                previous = current
+                logger.info(
+                    f"Importação: {self.report.total} linhas lidas, {self.report.inserted} inseridas"
+                )
+            if previous is not None:
+                self._insert(connection, *previous)
+        return self.report
+
+def hash_workers(in_api: bool = False) -> int:
+    """
+    Processos de hash da importação: BULK_IMPORT_HASH_WORKERS ou, se 0, as
+    CPUs da máquina na CLI. Dentro da API, só a parte das CPUs que cabe a
+    este worker (como o pool do login), para não disputar CPU com o login
+    dos demais workers.
+    """
+    if settings.BULK_IMPORT_HASH_WORKERS:
+        return settings.BULK_IMPORT_HASH_WORKERS
+    if in_api:
+        return max(available_cpus() // api_workers(), 1)
+    return os.cpu_count() or 1
+
+def import_users(stream: TextIO, fmt: str, batch_size: Optional[int] = None,
+                 workers: Optional[int] = None) -> ImportReport:
+    """
+    Importa usuários de um arquivo de texto em fluxo.
+
+    Args:
+        stream: Entrada em CSV ou JSON Lines
+        fmt: "csv" ou "jsonl"
+        batch_size: Linhas por lote (padrão BULK_IMPORT_BATCH_SIZE)
+        workers: Processos para o hash (padrão BULK_IMPORT_HASH_WORKERS)
+
+    Returns:
+        ImportReport: Contagens e linhas com problema
+    """
+    workers = workers or hash_workers()
+    # Pool próprio: a importação não disputa a fila do executor do login
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        importer = UserImporter(
+            executor,
+            workers,
+            batch_size=batch_size or settings.BULK_IMPORT_BATCH_SIZE,
+            max_errors=settings.BULK_IMPORT_MAX_ERRORS,
+        )
+        return importer.run(read_records(stream, fmt))
+
+def export_users(fmt: str, include_hashes: bool = False) -> Iterator[str]:
+    """
+    Exporta a tabela users em fluxo, sem carregá-la inteira na memória.
+
+    As linhas são lidas com um cursor do lado do servidor (stream_results)
+    em blocos de BULK_EXPORT_CHUNK_SIZE; cada bloco vira um trecho de texto.
+
+    Args:
+        fmt: "csv" ou "jsonl"
+        include_hashes: Inclui hashed_password (reimportável sem novo hash)
+
+    Yields:
+        str: Trechos da saída
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato inválido: {fmt}")
+    fields = EXPORT_FIELDS + (("hashed_password",) if include_hashes else ())
+    table = User.__table__
+    query = select(*(table.c[name] for name in fields)).order_by(table.c.id)
+    with engine.connect() as connection:
+        result = connection.execution_options(
+            stream_results=True, yield_per=settings.BULK_EXPORT_CHUNK_SIZE
+        ).execute(query)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if fmt == "csv":
+            writer.writerow(fields)
+        for partition in result.partitions():
+            if fmt == "csv":
+                writer.writerows(partition)
+            else:
+                for row in partition:
+                    buffer.write(json.dumps(dict(zip(fields, row)), ensure_ascii=False))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="Importa usuários de um arquivo CSV ou JSON Lines")
+    import_parser.add_argument("file", help="Arquivo de entrada ('-' lê da entrada padrão)")
+    import_parser.add_argument("--format", choices=FORMATS, help="Padrão: pela extensão do arquivo")
+    import_parser.add_argument("--batch-size", type=int, default=settings.BULK_IMPORT_BATCH_SIZE)
+    import_parser.add_argument("--workers", type=int, default=0, help="Processos para o hash (0 = BULK_IMPORT_HASH_WORKERS)")
+    import_parser.add_argument("--report", help="Grava o relatório completo em JSON")
+
+    export_parser = commands.add_parser("export", help="Exporta os usuários em CSV ou JSON Lines")
+    export_parser.add_argument("-o", "--output", default="-", help="Arquivo de saída ('-' para a saída padrão)")
+    export_parser.add_argument("--format", choices=FORMATS, help="Padrão: pela extensão do arquivo")
+    export_parser.add_argument("--include-hashes", action="store_true", help="Inclui hashed_password")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.command == "import":
+        fmt = args.format or detect_format(args.file)
+        if args.file == "-":
+            report = import_users(sys.stdin, fmt, args.batch_size, args.workers)
+        else:
+            with open(args.file, newline="", encoding="utf-8-sig") as stream:
+                report = import_users(stream, fmt, args.batch_size, args.workers)
+        result = report.to_dict()
+        if args.report:
+            with open(args.report, "w") as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+        summary = {key: value for key, value in result.items() if key != "errors"}
+        print(json.dumps(summary, ensure_ascii=False))
+    else:
+        fmt = args.format or detect_format(args.output)
+        output = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+        try:
+            for chunk in export_users(fmt, args.include_hashes):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+if __name__ == "__main__":
+    main()
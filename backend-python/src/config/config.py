@@ -1,5 +1,36 @@
+from functools import lru_cache
+from typing import List, Optional
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
+# Algoritmos de assinatura aceitos em ALGORITHM: HS* (python-jose ou o
+# backend "hmac"), RS*/ES* (python-jose) e EdDSA (EdDSABackend). O
+# python-jose não implementa PS*
+JWT_ALGORITHMS = (
+    "HS256", "HS384", "HS512",
+    "RS256", "RS384", "RS512",
+    "ES256", "ES384", "ES512",
+    "EdDSA",
+)
+
+# Teto do USER_CACHE_TTL_SECONDS: sem NOTIFY, é por quanto tempo os demais
+# workers podem servir dados antigos de um usuário
+USER_CACHE_MAX_TTL_SECONDS = 300.0
+
+def to_async_url(url: str) -> str:
+    """
+    Troca o driver da URL pelo assíncrono correspondente (asyncpg/aiosqlite).
+    """
+    for prefix, async_prefix in (
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("postgres://", "postgresql+asyncpg://"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+    ):
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
 class Settings(BaseSettings):
     PROJECT_NAME: str
     PROJECT_VERSION: str
@@ -7,7 +38,106 @@ class Settings(BaseSettings):
     
     # Configurações do banco de dados
     DATABASE_URL: str
+    # Usa AsyncEngine/AsyncSession em vez do engine síncrono
+    DATABASE_ASYNC: bool = False
+    # URL do driver assíncrono; se vazia, é derivada de DATABASE_URL
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Pool de conexões (por processo/worker)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # statement_timeout do Postgres em milissegundos (0 desabilita)
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    # Réplicas de leitura (URLs separadas por vírgula, com o mesmo driver de
+    # DATABASE_URL). Dependências somente leitura usam uma réplica por sessão,
+    # em round-robin entre as saudáveis; escritas vão sempre ao primário
+    DATABASE_REPLICA_URLS: Optional[str] = None
+    # Intervalo da verificação de saúde das réplicas (SELECT 1)
+    DB_REPLICA_HEALTH_CHECK_SECONDS: float = 5.0
+    # Requisições com tokens emitidos há menos que isso leem do primário,
+    # para enxergar as escritas recentes (ex.: cadastro seguido de login).
+    # Heurística: deve cobrir o atraso de replicação máximo esperado
+    DB_REPLICA_STICKY_SECONDS: float = 10.0
     
+    # Servidor SMTP (sem MAIL_USERNAME/MAIL_PASSWORD/MAIL_FROM/MAIL_SERVER
+    # o envio de e-mails fica desabilitado)
+    MAIL_USERNAME: Optional[str] = None
+    MAIL_PASSWORD: Optional[str] = None
+    MAIL_FROM: Optional[str] = None
+    MAIL_SERVER: Optional[str] = None
+    MAIL_PORT: int = 587
+    MAIL_STARTTLS: bool = True
+    MAIL_USE_CREDENTIALS: bool = True
+
+    # Entrega de e-mails: "outbox" (tabela + dispatcher separado) ou
+    # "queue" (fila em memória no próprio processo da API)
+    EMAIL_DELIVERY: str = "outbox"
+    # Intervalo de polling do dispatcher quando a outbox está vazia
+    EMAIL_OUTBOX_POLL_SECONDS: float = 1.0
+    # Reserva das linhas de um lote da outbox durante o envio; um dispatcher
+    # que morrer devolve o lote à fila quando ela vence. Deve ser maior que o
+    # tempo de envio de um lote, senão outro dispatcher pode reenviá-lo
+    EMAIL_OUTBOX_LEASE_SECONDS: float = 300.0
+    # Chave Fernet que cifra o payload da outbox (que contém o token de
+    # reset em texto até o envio); sem ela, é derivada da SECRET_KEY
+    EMAIL_OUTBOX_KEY: Optional[str] = None
+    # Idioma padrão dos templates de e-mail (app/templates/email/<locale>)
+    EMAIL_DEFAULT_LOCALE: str = "pt_BR"
+    # Fila de e-mails em memória (workers com conexão SMTP persistente)
+    EMAIL_WORKERS: int = 2
+    EMAIL_QUEUE_MAX_SIZE: int = 10000
+    EMAIL_BATCH_SIZE: int = 20
+    EMAIL_MAX_RETRIES: int = 5
+    EMAIL_RETRY_BASE_SECONDS: float = 1.0
+    EMAIL_RETRY_MAX_SECONDS: float = 60.0
+    # Conexões ociosas por mais tempo que isso são reabertas
+    EMAIL_SMTP_IDLE_SECONDS: float = 60.0
+
+    # Logging: nível, formato ("json" ou "text") e fração das requisições
+    # registradas no log de acesso (0 remove o middleware)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+
+    # Métricas por requisição (rota, SQL, threadpool); o /metrics continua
+    # disponível mesmo desabilitado
+    METRICS_ENABLED: bool = True
+
+    # Inicialização: "alembic" confere se o banco está no head das migrações,
+    # "create_all" cria as tabelas (desenvolvimento) e "none" não verifica
+    DB_SCHEMA_CHECK: str = "alembic"
+    ALEMBIC_SCRIPT_LOCATION: Optional[str] = None
+    # Conexões abertas no startup de cada worker (até DB_POOL_SIZE)
+    DB_POOL_WARMUP: int = 1
+
+    # Servidor de produção (python -m app.serve). SERVER_WORKERS=0 usa um
+    # worker por CPU disponível; SERVER_LIMIT_CONCURRENCY responde 503 acima
+    # do limite de conexões/tarefas simultâneas por worker
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_PRELOAD: bool = True
+    SERVER_RELOAD: bool = False
+    SERVER_KEEPALIVE: int = 5
+    SERVER_BACKLOG: int = 2048
+    SERVER_LIMIT_CONCURRENCY: Optional[int] = None
+    SERVER_TIMEOUT: int = 60
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    SERVER_MAX_REQUESTS: int = 0
+    SERVER_MAX_REQUESTS_JITTER: int = 0
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
+    # Perfilamento sob demanda (pyinstrument): requisições com cabeçalho
+    # X-Profile assinado com PROFILING_SECRET ou 1 a cada PROFILING_SAMPLE_RATE
+    PROFILING_ENABLED: bool = False
+    PROFILING_SECRET: Optional[str] = None
+    PROFILING_SAMPLE_RATE: int = 0
+    PROFILING_INTERVAL: float = 0.001
+    PROFILING_DIR: str = "profiles"
+    PROFILING_MAX_FILES: int = 200
+
     # URL do frontend
     FRONTEND_URL: str
     
@@ -15,8 +145,152 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Refresh tokens: validade de cada token, duração máxima da sessão (a
+    # rotação não a estende) e janela em que reapresentar o token recém
+    # trocado (ex.: duas abas) é recusado sem revogar a sessão
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    REFRESH_TOKEN_FAMILY_MAX_DAYS: int = 30
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: float = 10.0
+    # Revogação de tokens: intervalo da consulta incremental que complementa o
+    # LISTEN/NOTIFY (Postgres) ou o substitui (outros bancos)
+    TOKEN_REVOCATION_POLL_SECONDS: float = 5.0
+    # Varredura dos tokens de reset de senha expirados em cada worker:
+    # intervalo (0 desabilita; use o comando "sweep" via cron) e linhas por lote
+    RESET_TOKEN_SWEEP_INTERVAL_SECONDS: float = 300.0
+    RESET_TOKEN_SWEEP_BATCH_SIZE: int = 500
+    # Chaves para algoritmos assimétricos (RS*/ES*/EdDSA): chave privada
+    # de assinatura em PEM, seu "kid" e um diretório com "<kid>.pem" das
+    # chaves públicas ainda aceitas (rotação)
+    JWT_SIGNING_KEY_FILE: Optional[str] = None
+    JWT_SIGNING_KEY_ID: Optional[str] = None
+    JWT_VERIFICATION_KEYS_DIR: Optional[str] = None
+    # max-age do /.well-known/jwks.json em segundos
+    JWKS_CACHE_MAX_AGE: int = 3600
+    # Backend JWT: "jose" ou "hmac" (implementação direta para HS256/384/512)
+    JWT_BACKEND: str = "jose"
+    # Cache de tokens já verificados (TTL máximo; nunca passa do "exp")
+    TOKEN_CACHE_TTL_SECONDS: float = 300.0
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    # Cache em memória dos dados do usuário autenticado (TTL 0 desabilita).
+    # Cada worker invalida o próprio cache no commit da alteração; os demais
+    # são avisados por NOTIFY (Postgres com psycopg2). Sem NOTIFY, os outros
+    # workers podem servir dados antigos (ex.: usuário desativado) por até
+    # USER_CACHE_TTL_SECONDS (no máximo USER_CACHE_MAX_TTL_SECONDS)
+    USER_CACHE_TTL_SECONDS: float = 30.0
+    USER_CACHE_MAX_SIZE: int = 10000
+    # Inclui os dados do usuário no access token e dispensa o banco em
+    # get_current_user; desativações só valem quando o token expirar
+    AUTH_TOKEN_USER_CLAIMS: bool = False
+    # Executor de hash de senhas: "process" (pool de processos) ou "thread"
+    PASSWORD_HASH_EXECUTOR: str = "process"
+    # Workers do executor de hash em cada worker da API. 0 divide as CPUs
+    # entre os workers da API (SERVER_WORKERS), no mínimo 1 cada: o servidor
+    # inteiro fica com ~1 processo de hash por CPU
+    PASSWORD_HASH_WORKERS: int = 0
+    # Operações que podem aguardar na fila antes de responder 503, somadas
+    # em todos os workers da API (cada um recebe a sua parte)
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+    # Perfil de custo do hash de senhas ("bcrypt" ou "argon2"); valores
+    # para o hardware atual: python -m app.core.security.calibrate
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_ARGON2_MEMORY_KB: int = 65536
+    PASSWORD_ARGON2_TIME_COST: int = 3
+    PASSWORD_ARGON2_PARALLELISM: int = 1
+    # Refaz o hash no login quando o perfil muda (gravado em segundo plano)
+    PASSWORD_REHASH_ON_LOGIN: bool = True
+
+    # Importação/exportação de usuários em massa (python -m app.services.user_bulk
+    # e /admin/users/*): linhas por lote, processos de hash (0 = número de
+    # CPUs na CLI e CPUs / workers da API no /admin/users/import), linhas
+    # com erro detalhadas no relatório e linhas por bloco da exportação
+    BULK_IMPORT_BATCH_SIZE: int = 1000
+    BULK_IMPORT_HASH_WORKERS: int = 0
+    BULK_IMPORT_MAX_ERRORS: int = 1000
+    BULK_EXPORT_CHUNK_SIZE: int = 1000
+
+    # Limite de tentativas por IP/e-mail ("<quantidade>/<período>", vazio
+    # desabilita). Backend "memory" vale por worker; "redis" é compartilhado
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    RATE_LIMIT_LOGIN_IP: str = "30/minute"
+    RATE_LIMIT_LOGIN_EMAIL: str = "10/minute"
+    RATE_LIMIT_REGISTER_IP: str = "10/minute"
+    RATE_LIMIT_FORGOT_PASSWORD_IP: str = "10/minute"
+    RATE_LIMIT_FORGOT_PASSWORD_EMAIL: str = "3/hour"
+
+    @field_validator("ALGORITHM")
+    @classmethod
+    def _check_algorithm(cls, value: str) -> str:
+        """
+        Recusa algoritmos que nenhum backend JWT implementa.
+
+        Args:
+            value: Algoritmo configurado
+
+        Returns:
+            str: O próprio algoritmo
+
+        Raises:
+            ValueError: Se o algoritmo não for suportado
+        """
+        if value not in JWT_ALGORITHMS:
+            raise ValueError(
+                f"Algoritmo JWT não suportado: {value} (use um de: {', '.join(JWT_ALGORITHMS)})"
+            )
+        return value
+
+    @field_validator("USER_CACHE_TTL_SECONDS")
+    @classmethod
+    def _check_user_cache_ttl(cls, value: float) -> float:
+        """
+        Limita o TTL do cache de usuários, que define a defasagem máxima
+        entre workers quando não há NOTIFY.
+
+        Args:
+            value: TTL configurado, em segundos
+
+        Returns:
+            float: O próprio TTL
+
+        Raises:
+            ValueError: Se o TTL for negativo ou passar do teto
+        """
+        if not 0 <= value <= USER_CACHE_MAX_TTL_SECONDS:
+            raise ValueError(
+                f"USER_CACHE_TTL_SECONDS deve estar entre 0 e {USER_CACHE_MAX_TTL_SECONDS:g}"
+            )
+        return value
+
+    @property
+    def async_database_url(self) -> str:
+        """
+        Retorna a URL do banco com o driver assíncrono correspondente.
+        """
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        return to_async_url(self.DATABASE_URL)
+
+    @property
+    def replica_urls(self) -> List[str]:
+        """
+        URLs das réplicas de leitura; com DATABASE_ASYNC, já com o driver
+        assíncrono.
+        """
+        urls = [url.strip() for url in (self.DATABASE_REPLICA_URLS or "").split(",") if url.strip()]
+        if self.DATABASE_ASYNC:
+            return [to_async_url(url) for url in urls]
+        return urls
 
     class Config:
         env_file = ".env"
 
-settings = Settings() 
\ No newline at end of file
+@lru_cache()
+def get_settings() -> Settings:
+    """
+    Retorna as configurações da aplicação, lidas uma única vez por processo.
+    """
+    return Settings()
+
+settings = get_settings() 
\ No newline at end of file
@@ -0,0 +1,21 @@
+"""
+Testes do backend.
+
+Executar a partir de backend-python/:
+    pip install -r requirements.txt -r tests/requirements.txt
+    python -m pytest tests
+"""
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+# Valores padrão para que as configurações carreguem sem um .env
+os.environ.setdefault("PROJECT_NAME", "API")
+os.environ.setdefault("PROJECT_VERSION", "1.0.0")
+os.environ.setdefault("PROJECT_DESCRIPTION", "Testes")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("FRONTEND_URL", "http://localhost:4200")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
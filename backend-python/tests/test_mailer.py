@@ -0,0 +1,203 @@
+"""
+MailQueue e SMTPConnection contra um servidor SMTP local (aiosmtpd).
+"""
+import asyncio
+import logging
+import socket
+from email.message import EmailMessage
+from types import SimpleNamespace
+from typing import List, Set, Tuple
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.services.mailer import MailQueue, SMTPConnection
+from config.config import settings
+
+class RecordingHandler:
+    """
+    Registra as mensagens recebidas e a porta de origem de cada uma (uma
+    porta nova indica uma nova conexão); as primeiras "fail" entregas são
+    recusadas com 451.
+    """
+
+    def __init__(self, fail: int = 0, delay: float = 0.0):
+        self.fail = fail
+        self.delay = delay
+        self.attempts = 0
+        self.received: List[str] = []
+        self.peers: Set[Tuple[str, int]] = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.attempts += 1
+        self.peers.add(session.peer)
+        if self.attempts <= self.fail:
+            return "451 Tente novamente"
+        self.received.extend(envelope.rcpt_tos)
+        return "250 OK"
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@pytest.fixture
+def smtp_server():
+    servers = []
+
+    def start(**kwargs) -> Tuple[RecordingHandler, SimpleNamespace]:
+        handler = RecordingHandler(**kwargs)
+        controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+        controller.start()
+        servers.append(controller)
+        conf = SimpleNamespace(
+            MAIL_SERVER=controller.hostname, MAIL_PORT=controller.port,
+            MAIL_USERNAME=None, MAIL_PASSWORD=None, USE_CREDENTIALS=False,
+            MAIL_SSL_TLS=False, MAIL_STARTTLS=False, VALIDATE_CERTS=False, TIMEOUT=5,
+        )
+        return handler, conf
+
+    yield start
+    for controller in servers:
+        controller.stop()
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_RETRY_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "EMAIL_RETRY_MAX_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "EMAIL_MAX_RETRIES", 3)
+
+def message(to: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "api@example.com"
+    msg["To"] = to
+    msg["Subject"] = "Teste"
+    msg.set_content("corpo")
+    return msg
+
+async def wait_until(predicate, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "tempo esgotado"
+        await asyncio.sleep(0.01)
+
+def test_connection_is_reused_between_sends(smtp_server):
+    handler, conf = smtp_server()
+
+    async def run():
+        connection = SMTPConnection(conf)
+        for i in range(3):
+            await connection.send(message(f"u{i}@example.com"))
+        await connection.close()
+
+    asyncio.run(run())
+    assert handler.received == ["u0@example.com", "u1@example.com", "u2@example.com"]
+    assert len(handler.peers) == 1
+
+def test_connection_reopens_after_idle(smtp_server, monkeypatch):
+    handler, conf = smtp_server()
+    monkeypatch.setattr(settings, "EMAIL_SMTP_IDLE_SECONDS", 0.05)
+
+    async def run():
+        connection = SMTPConnection(conf)
+        await connection.send(message("a@example.com"))
+        await asyncio.sleep(0.1)
+        await connection.send(message("b@example.com"))
+        await connection.close()
+
+    asyncio.run(run())
+    assert handler.received == ["a@example.com", "b@example.com"]
+    assert len(handler.peers) == 2
+
+def test_connection_reopens_after_error(smtp_server):
+    handler, conf = smtp_server(fail=1)
+
+    async def run():
+        connection = SMTPConnection(conf)
+        with pytest.raises(Exception):
+            await connection.send(message("a@example.com"))
+        await connection.send(message("a@example.com"))
+        await connection.close()
+
+    asyncio.run(run())
+    assert handler.received == ["a@example.com"]
+    assert len(handler.peers) == 2
+
+def test_queue_sends_batch(smtp_server):
+    handler, conf = smtp_server()
+    queue = MailQueue(workers=2, batch_size=5)
+
+    async def run():
+        await queue.start(conf)
+        for i in range(10):
+            assert queue.enqueue(message(f"u{i}@example.com"))
+        await queue.stop()
+
+    asyncio.run(run())
+    assert sorted(handler.received) == sorted(f"u{i}@example.com" for i in range(10))
+    assert not queue.running
+
+def test_queue_retries_with_backoff(smtp_server, fast_retries):
+    handler, conf = smtp_server(fail=2)
+    queue = MailQueue(workers=1)
+
+    async def run():
+        await queue.start(conf)
+        queue.enqueue(message("a@example.com"))
+        await wait_until(lambda: handler.received)
+        await queue.stop()
+
+    asyncio.run(run())
+    assert handler.attempts == 3
+    assert handler.received == ["a@example.com"]
+
+def test_queue_gives_up_after_max_retries(smtp_server, fast_retries, caplog):
+    handler, conf = smtp_server(fail=100)
+    queue = MailQueue(workers=1)
+
+    async def run():
+        await queue.start(conf)
+        queue.enqueue(message("a@example.com"))
+        await wait_until(lambda: handler.attempts == settings.EMAIL_MAX_RETRIES + 1)
+        await queue.stop()
+
+    with caplog.at_level(logging.ERROR, logger="app.services.mailer"):
+        asyncio.run(run())
+    assert handler.received == []
+    assert "Falha definitiva ao enviar e-mail para a@example.com" in caplog.text
+
+def test_stop_flushes_scheduled_retries(smtp_server, monkeypatch):
+    handler, conf = smtp_server(fail=1)
+    # Backoff longo: sem o flush, a retentativa só sairia depois do stop
+    monkeypatch.setattr(settings, "EMAIL_RETRY_BASE_SECONDS", 60.0)
+    queue = MailQueue(workers=1)
+
+    async def run():
+        await queue.start(conf)
+        queue.enqueue(message("a@example.com"))
+        await wait_until(lambda: queue._retries)
+        await queue.stop(timeout=5.0)
+
+    asyncio.run(run())
+    assert handler.received == ["a@example.com"]
+    assert not queue._retries
+
+def test_stop_logs_each_undelivered_message(smtp_server, caplog):
+    handler, conf = smtp_server(delay=0.5)
+    queue = MailQueue(workers=1, batch_size=1)
+
+    async def run():
+        await queue.start(conf)
+        for i in range(3):
+            queue.enqueue(message(f"u{i}@example.com"))
+        await asyncio.sleep(0.1)
+        await queue.stop(timeout=0.1)
+
+    with caplog.at_level(logging.ERROR, logger="app.services.mailer"):
+        asyncio.run(run())
+    # u0 estava em envio quando o worker foi cancelado; as demais seguiam na fila
+    assert "E-mail para u1@example.com descartado" in caplog.text
+    assert "E-mail para u2@example.com descartado" in caplog.text
+    assert queue.depth() == 0
@@ -0,0 +1,118 @@
+"""
+Limitador de requisições com o backend Redis (fakeredis).
+"""
+import asyncio
+
+import fakeredis
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from pydantic import BaseModel
+
+from app.core.rate_limit import (
+    Rate,
+    RateLimiter,
+    RedisRateLimitBackend,
+    rate_limit,
+)
+from config.config import settings
+
+class Clock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+class EmailBody(BaseModel):
+    email: str
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+@pytest.fixture
+def clock():
+    return Clock(6000.0)
+
+@pytest.fixture
+def limiter(server, clock):
+    return RateLimiter(RedisRateLimitBackend(client=fakeredis.FakeAsyncRedis(server=server)), clock=clock)
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+
+def hits(limiter: RateLimiter, count: int, rate: Rate, identifier: str = "1.2.3.4"):
+    async def run():
+        return [await limiter.hit("login:ip", identifier, rate) for _ in range(count)]
+
+    return asyncio.run(run())
+
+def test_backend_counts_windows_and_sets_expiry(server):
+    redis = fakeredis.FakeAsyncRedis(server=server)
+    backend = RedisRateLimitBackend(client=redis)
+
+    async def run():
+        assert await backend.hit("k", 10, 60) == (0, 1)
+        assert await backend.hit("k", 10, 60) == (0, 2)
+        assert await backend.hit("k", 11, 60) == (2, 1)
+        assert await redis.ttl("rl:k:11") == 120
+        await backend.close()
+
+    asyncio.run(run())
+
+def test_limit_within_window(limiter):
+    results = hits(limiter, 4, Rate(3, 60))
+    assert [r.allowed for r in results] == [True, True, True, False]
+    # 4 tentativas na janela anterior: a próxima só cabe na metade da seguinte
+    assert results[-1].retry_after == pytest.approx(90.0)
+
+def test_window_edges(limiter, clock):
+    rate = Rate(3, 60)
+    hits(limiter, 4, rate)
+    # Virada da janela: a anterior ainda pesa inteira
+    clock.now = 6060.0
+    assert not hits(limiter, 1, rate)[0].allowed
+    # Peso 0,5 da anterior (4 tentativas) + 1 da atual já recusada + esta
+    clock.now = 6089.9
+    assert not hits(limiter, 1, rate)[0].allowed
+    # Duas janelas depois, a contagem recomeça
+    clock.now = 6180.0
+    assert [r.allowed for r in hits(limiter, 4, rate)] == [True, True, True, False]
+
+def test_keys_are_independent(limiter):
+    rate = Rate(1, 60)
+    assert hits(limiter, 1, rate, "1.1.1.1")[0].allowed
+    assert hits(limiter, 1, rate, "2.2.2.2")[0].allowed
+    assert not hits(limiter, 1, rate, "1.1.1.1")[0].allowed
+
+def build_app(limiter: RateLimiter) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login", dependencies=[Depends(rate_limit("test_login", "5/minute", "2/minute", limiter=limiter))])
+    async def login(body: EmailBody):
+        return {"ok": True}
+
+    return app
+
+def test_rejects_with_429_and_retry_after(limiter):
+    client = TestClient(build_app(limiter))
+    for _ in range(2):
+        assert client.post("/login", json={"email": "A@example.com"}).status_code == 200
+    response = client.post("/login", json={"email": "a@example.com "})
+    assert response.status_code == 429
+    # 3 tentativas no início da janela: a próxima cabe quando o peso da
+    # janela anterior cair para 1/3 (60 s até a virada + 40 s)
+    assert response.headers["Retry-After"] == "100"
+    # Outro e-mail do mesmo IP ainda passa (limite por IP é 5)
+    assert client.post("/login", json={"email": "b@example.com"}).status_code == 200
+
+def test_fails_open_when_redis_is_down(limiter, server):
+    server.connected = False
+    client = TestClient(build_app(limiter))
+    for _ in range(3):
+        assert client.post("/login", json={"email": "a@example.com"}).status_code == 200
+    labels = {"route": "test_login", "key": "ip", "result": "error"}
+    assert REGISTRY.get_sample_value("rate_limit_decisions_total", labels) == 3